@@ -7,12 +7,24 @@ Main entry point for the spectrophotometer operating system
 from components.monitor import Monitor
 from components.SplashScreen import SplashScreen
 from components.SpectralEngine import SpectralEngine
+from components.ScanStore import ScanStore
+from components.SessionJournal import SessionJournal
+from components.MeasurementLog import MeasurementLog
 from components.SystemManager import SystemManager
 from components.CommandInterface import CommandInterface
 from components.SpectrophotometerKeyboard import SpectrophotometerKeyboard
+import asyncio
+import os
+import signal
+import sys
+import threading
 import time
 
 class Kernel:
+    SCAN_STORE_DIR = 'scan_store'  # Persistent scan history
+    SESSION_DIR = 'sessions'       # Autosave journals, one per session
+    AUTOSAVE_INTERVAL = 2          # Seconds between incremental autosaves
+    
     def __init__(self):
         self.monitor = Monitor()
         self.splash_screen = SplashScreen()
@@ -20,6 +32,10 @@ class Kernel:
         self.system_manager = SystemManager()
         self.keyboard = None
         self.command_interface = None
+        self.journal = None
+        self.measurement_log = None
+        self._shown_display = None  # Screen contents last printed
+        self._exiting = False       # Waiting for a running command before exiting
         
     def initialize_hardware(self):
         """Initialize all hardware components"""
@@ -33,6 +49,10 @@ class Kernel:
         if not engine_initialized:
             print("WARNING: Spectral engine initialization failed")
         
+        # Keep every scan in the persistent store
+        self.spectral_engine.attach_store(ScanStore(self.SCAN_STORE_DIR))
+        print(f"Kernel: Scan store '{self.SCAN_STORE_DIR}' ({len(self.spectral_engine.scan_store)} scans)")
+        
         # Initialize keyboard
         self.keyboard = SpectrophotometerKeyboard(enable_turtle=False)  # Disable turtle for CLI
         
@@ -41,6 +61,22 @@ class Kernel:
         self.system_manager.register_component('spectral_engine', self.spectral_engine)
         self.system_manager.register_component('keyboard', self.keyboard)
         
+        # Autosave new scans, kinetic points and calibration changes
+        session = os.path.join(self.SESSION_DIR, time.strftime("session-%Y%m%d-%H%M%S"))
+        journal_path = session + '.journal'
+        self.journal = SessionJournal(self.spectral_engine, journal_path, log=self.system_manager.log)
+        self.journal.schedule(self.system_manager, self.AUTOSAVE_INTERVAL)
+        self.system_manager.register_component('journal', self.journal)
+        print(f"Kernel: Autosaving to {journal_path} every {self.AUTOSAVE_INTERVAL}s")
+        
+        # Every measurement also goes to a write-ahead log, committed in groups
+        self.measurement_log = MeasurementLog(session + '.wal', log=self.system_manager.log)
+        self.spectral_engine.attach_measurement_log(self.measurement_log)
+        print(f"Kernel: Logging measurements to {session}.wal")
+        
+        # Background jobs share the spectral engine, its state survives preemption
+        self.system_manager.jobs.instrument = self.spectral_engine
+        
         # Initialize command interface
         self.command_interface = CommandInterface(
             self.monitor, 
@@ -54,67 +90,163 @@ class Kernel:
     def run(self):
         """Main kernel execution loop"""
         try:
-            # Display splash screen
-            self.splash_screen.display(self.monitor)
-            
-            self._refresh_display()
-            
-            # Start system manager
-            self.system_manager.start()
-            
-            # Display welcome message
-            self.monitor.clear()
-            welcome_text = [
-                "=" * 80,
-                "Spectrophotometer OS Kernel - Ready",
-                "Type 'help' for available commands",
-                "=" * 80,
-                "",
-                f"Wavelength Range: {self.spectral_engine.MIN_WAVELENGTH}-{self.spectral_engine.MAX_WAVELENGTH}nm",
-                f"Current Wavelength: {self.spectral_engine.current_wavelength}nm",
-                f"Lamp Status: {'ON' if self.spectral_engine.is_lamp_on else 'OFF'}",
-                f"Calibrated: {'YES' if self.spectral_engine.is_calibrated else 'NO'}",
-                "",
-                "spectro> "
-            ]
-            
-            for line in welcome_text:
-                self.monitor.write(line + "\n")
+            asyncio.run(self._run_async())
+        except SystemExit:
+            pass
+        finally:
+            self.shutdown()
             
+    async def _run_async(self):
+        """Kernel loop on the event loop
+        
+        Command input is read in a daemon thread, so background commands,
+        scheduler ticks and display refreshes keep running while waiting for it
+        and a pending read never holds up shutdown. Ctrl-C at the prompt is
+        handled on the loop and does not end the kernel. On exit (or end of
+        input) a running command is allowed to finish so its results are kept.
+        """
+        # Display splash screen
+        self.splash_screen.display(self.monitor)
+        
+        self._refresh_display()
+        
+        # Start system manager, its scheduler ticks on this event loop
+        self.system_manager.start(threaded=False)
+        background = [
+            asyncio.ensure_future(self.system_manager.run_async()),
+            asyncio.ensure_future(self._display_loop())
+        ]
+        
+        # Display welcome message
+        self.monitor.clear()
+        welcome_text = [
+            "=" * 80,
+            "Spectrophotometer OS Kernel - Ready",
+            "Type 'help' for available commands",
+            "=" * 80,
+            "",
+            f"Wavelength Range: {self.spectral_engine.MIN_WAVELENGTH}-{self.spectral_engine.MAX_WAVELENGTH}nm",
+            f"Current Wavelength: {self.spectral_engine.current_wavelength}nm",
+            f"Lamp Status: {'ON' if self.spectral_engine.is_lamp_on else 'OFF'}",
+            f"Calibrated: {'YES' if self.spectral_engine.is_calibrated else 'NO'}",
+            "",
+            "spectro> "
+        ]
+        
+        for line in welcome_text:
+            self.monitor.write(line + "\n")
+        
+        loop = asyncio.get_running_loop()
+        lines = self._start_input_reader(loop)
+        try:
+            loop.add_signal_handler(signal.SIGINT, self._interrupted)
+        except (NotImplementedError, RuntimeError):
+            pass  # No loop signal handlers on this platform
+        
+        try:
             # Main command loop
             while True:
                 # Display monitor contents
                 self._refresh_display()
                 
                 # Get command input
-                try:
-                    command = input().strip()
-                    if command.lower() == 'exit':
-                        break
-                    self.command_interface.process_command(command)
-                    self.monitor.write("spectro> ")
-                    
-                except EOFError:
+                command = await lines.get()
+                if command is None or command.strip().lower() == 'exit':  # Or end of input
+                    await self._finish_command()
                     break
-                except KeyboardInterrupt:
-                    self.monitor.write("\nInterrupted. Type 'exit' to quit.\n")
-                    self.monitor.write("spectro> ")
-                    
-        except SystemExit:
-            pass
+                await self.command_interface.process_command_async(command.strip())
+                self.monitor.write("spectro> ")
+                
+                # Queued input lines must not starve a running command
+                await asyncio.sleep(0)
         finally:
-            self.shutdown()
-            
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, RuntimeError):
+                pass
+            if self.command_interface.is_busy():
+                self.command_interface.task.cancel()
+            for task in background:
+                task.cancel()
+                
+    def _start_input_reader(self, loop):
+        """Read command lines in a daemon thread, returns the queue they arrive on (None at EOF)
+        
+        The thread reads the stdin file descriptor directly: a daemon thread
+        blocked inside the buffered sys.stdin would abort interpreter shutdown.
+        """
+        lines = asyncio.Queue()
+        
+        def deliver(line):
+            try:
+                loop.call_soon_threadsafe(lines.put_nowait, line)
+            except RuntimeError:
+                pass  # Event loop already closed
+                
+        def read_lines():
+            fd = sys.stdin.fileno()
+            pending = b''
+            while True:
+                try:
+                    data = os.read(fd, 4096)
+                except OSError:
+                    data = b''
+                pending += data
+                *complete, pending = pending.split(b'\n')
+                if not data and pending:
+                    complete.append(pending)
+                for line in complete:
+                    deliver(line.decode('utf-8', errors='replace'))
+                if not data:
+                    deliver(None)
+                    return
+                    
+        threading.Thread(target=read_lines, daemon=True).start()
+        return lines
+        
+    async def _finish_command(self):
+        """Wait for the running command (if any) before exiting, Ctrl-C stops it"""
+        interface = self.command_interface
+        if not interface.is_busy():
+            return
+        self.monitor.write(f"Waiting for '{interface.task_name}' to finish before exiting (Ctrl-C stops it)...\n")
+        self._refresh_display()
+        self._exiting = True
+        await asyncio.wait([interface.task])
+        self._refresh_display()
+        
+    def _interrupted(self):
+        """SIGINT (Ctrl-C) at the prompt"""
+        if self._exiting and self.command_interface.is_busy():
+            self.command_interface.cmd_stop([])
+            self._refresh_display()
+            return
+        self.monitor.write("\nInterrupted. Type 'exit' to quit.\n")
+        self.monitor.write("spectro> ")
+        self._refresh_display()
+                
+    async def _display_loop(self):
+        """Refresh the display when background output changed it"""
+        while True:
+            await asyncio.sleep(0.2)
+            if self.monitor.get_display() != self._shown_display:
+                self._refresh_display()
+                
     def _refresh_display(self):
         """Refresh the display output"""
         print("\033c", end="")  # Clear screen
-        for line in self.monitor.get_display():
+        self._shown_display = self.monitor.get_display()
+        for line in self._shown_display:
             print(line)
             
     def shutdown(self):
         """Clean shutdown of the system"""
         print("\nKernel: Shutting down...")
         self.system_manager.stop()
+        if self.journal is not None:
+            self.journal.close()
+        if self.measurement_log is not None:
+            self.measurement_log.close()
         self.spectral_engine.is_lamp_on = False
         print("Kernel: Shutdown complete")
 
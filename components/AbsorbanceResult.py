@@ -0,0 +1,92 @@
+import numpy as np
+
+
+class AbsorbanceResult:
+    """Columnar absorbance data computed from a sample and a reference spectrum
+
+    All columns are float64 arrays of equal length. Transmittance is in percent.
+    Indexing with an int or slice returns the legacy per-point dicts.
+    """
+    __slots__ = (
+        'wavelengths', 'absorbance', 'transmittance',
+        'reference_intensities', 'sample_intensities', 'resampled'
+    )
+
+    def __init__(self, wavelengths, absorbance, transmittance,
+                 reference_intensities, sample_intensities, resampled=False):
+        self.wavelengths = wavelengths
+        self.absorbance = absorbance
+        self.transmittance = transmittance
+        self.reference_intensities = reference_intensities
+        self.sample_intensities = sample_intensities
+        self.resampled = resampled  # True if the reference was interpolated onto the sample axis
+
+    @classmethod
+    def compute(cls, wavelengths, sample_intensities, reference_intensities, resampled=False):
+        """Compute transmittance and absorbance for aligned sample/reference arrays
+
+        Points with a zero, negative or missing reference (or a missing sample)
+        are masked out. Zero transmittance gives infinite absorbance.
+        """
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        sample_intensities = np.asarray(sample_intensities, dtype=np.float64)
+        reference_intensities = np.asarray(reference_intensities, dtype=np.float64)
+
+        # NaN compares false, so missing points are masked too
+        valid = (reference_intensities > 0) & ~np.isnan(sample_intensities)
+        if not valid.all():
+            wavelengths = wavelengths[valid]
+            sample_intensities = sample_intensities[valid]
+            reference_intensities = reference_intensities[valid]
+
+        transmittance = sample_intensities / reference_intensities
+        with np.errstate(divide='ignore', invalid='ignore'):
+            absorbance = np.where(transmittance > 0, -np.log10(transmittance), np.inf)
+
+        return cls(
+            wavelengths, absorbance, transmittance * 100,
+            reference_intensities, sample_intensities, resampled
+        )
+
+    def __len__(self):
+        return len(self.wavelengths)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.point(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.point(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("absorbance index out of range")
+        return self.point(index)
+
+    def point(self, index):
+        """Return a single point as a dict in the legacy format"""
+        return {
+            'wavelength': float(self.wavelengths[index]),
+            'absorbance': float(self.absorbance[index]),
+            'transmittance': float(self.transmittance[index]),
+            'reference_intensity': float(self.reference_intensities[index]),
+            'sample_intensity': float(self.sample_intensities[index])
+        }
+
+    def at(self, wavelength):
+        """Absorbance at the point nearest to `wavelength`"""
+        if not len(self):
+            raise ValueError("No absorbance data")
+        return float(self.absorbance[np.argmin(np.abs(self.wavelengths - wavelength))])
+
+    def to_dict(self):
+        """Convert to a JSON-serializable columnar dict"""
+        return {
+            'wavelengths': self.wavelengths.tolist(),
+            'absorbance': [None if np.isinf(a) else a for a in self.absorbance.tolist()],
+            'transmittance': self.transmittance.tolist(),
+            'reference_intensities': self.reference_intensities.tolist(),
+            'sample_intensities': self.sample_intensities.tolist(),
+            'resampled': self.resampled
+        }
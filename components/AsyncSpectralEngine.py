@@ -0,0 +1,81 @@
+
+
+class AsyncSpectralEngine:
+    """asyncio front end for a SpectralEngine
+
+    Every delay is awaited through the instrument clock instead of blocking, so
+    long operations can run as tasks next to the command loop. Operations can be
+    stopped cooperatively with stop() (a stopped scan keeps the points acquired
+    so far, like the blocking API) or cancelled with Task.cancel() (nothing is
+    stored). Optional `progress` callbacks receive a fraction between 0 and 1;
+    optional `checkpoint` callbacks are called like the engine's, as
+    checkpoint(progress, partial) at every block or point boundary.
+
+    Scan, kinetic and calibrate run the engine's own step generators (see
+    SpectralEngine._run_steps), only awaiting their waits instead of sleeping.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.clock = engine.clock
+
+    def stop(self):
+        """Ask the running scan or kinetic measurement to stop"""
+        self.engine.is_scanning = False
+
+    async def set_wavelength(self, wavelength, verbose=True):
+        """Coroutine version of SpectralEngine.set_wavelength"""
+        delay = self.engine._start_move(wavelength, verbose)
+        await self.clock.sleep_async(delay)
+
+        self.engine.current_wavelength = wavelength
+        return self.engine.current_wavelength
+
+    async def measure(self):
+        """Coroutine version of SpectralEngine.measure_single"""
+        measurement = self.engine.measure_single()
+        await self.clock.sleep_async(self.engine.integration_time)
+        return measurement
+
+    async def scan(self, start_wl=None, end_wl=None, progress=None, sample_name=None, checkpoint=None):
+        """Coroutine version of SpectralEngine.scan_full_range (vectorized)"""
+        return await self._run(self.engine._scan_steps(
+            start_wl, end_wl, self._checkpoint(progress, checkpoint), sample_name
+        ))
+
+    async def kinetic(self, duration=60, interval=1, progress=None, checkpoint=None):
+        """Coroutine version of SpectralEngine.kinetic_scan"""
+        return await self._run(self.engine._kinetic_steps(
+            duration, interval, self._checkpoint(progress, checkpoint)
+        ))
+
+    async def calibrate(self, progress=None, start_wl=None, end_wl=None, use_cache=True, checkpoint=None):
+        """Coroutine version of SpectralEngine.calibrate_reference"""
+        return await self._run(self.engine._calibration_steps(
+            start_wl, end_wl, self._checkpoint(progress, checkpoint), use_cache
+        ))
+
+    async def _run(self, steps):
+        """Run an engine step generator, awaiting the deadlines it yields (see SpectralEngine._run_steps)"""
+        try:
+            while True:
+                try:
+                    deadline = next(steps)
+                except StopIteration as stop:
+                    return stop.value
+                await self.clock.sleep_until_async(deadline)
+        finally:
+            # Runs the operation's cleanup (is_scanning, logs, lamp) if the task was cancelled
+            steps.close()
+
+    @staticmethod
+    def _checkpoint(progress, checkpoint=None):
+        """Engine checkpoint reporting to a `progress` callback, then calling `checkpoint`"""
+        if progress is None:
+            return checkpoint
+
+        def report(fraction, partial):
+            progress(fraction)
+            if checkpoint is not None:
+                checkpoint(fraction, partial)
+        return report
@@ -0,0 +1,45 @@
+class CellMotor:
+    """Simulated cell changer (autosampler) bringing sample positions into the beam
+
+    Positions are numbered 0 to positions - 1. Like the monochromator model,
+    a move takes the distance (in positions) divided by the motor speed, plus a
+    settle time once the carriage stops. Delays are slept on the instrument
+    clock.
+    """
+
+    def __init__(self, clock, positions=8, speed=2.0, settle_time=0.2):
+        if positions < 1:
+            raise ValueError("Cell motor needs at least one position")
+        if speed <= 0:
+            raise ValueError("Speed must be positive")
+        self.clock = clock
+        self.positions = positions
+        self.speed = speed              # positions/sec
+        self.settle_time = settle_time  # seconds after every move
+        self.position = 0
+
+    def reset(self):
+        """Home the carriage to position 0"""
+        print("Cell Motor Reset")
+        self.move_to(0)
+
+    def move_time(self, position):
+        """Modelled time to move from the current position to `position`"""
+        if position == self.position:
+            return 0.0
+        return abs(position - self.position) / self.speed + self.settle_time
+
+    def start_move(self, position):
+        """Check a position and return the simulated move delay"""
+        if not 0 <= position < self.positions:
+            raise ValueError(
+                f"Cell position {position} out of range. Valid positions: 0-{self.positions - 1}"
+            )
+        return self.move_time(position)
+
+    def move_to(self, position):
+        """Move a cell position into the beam, returns the time the move took"""
+        delay = self.start_move(position)
+        self.clock.sleep(delay)
+        self.position = position
+        return delay
@@ -1,10 +1,31 @@
+import asyncio
+import os
+import time
+import numpy as np
+from components.AsyncSpectralEngine import AsyncSpectralEngine
+from components.JobManager import Job, JobCancelled
+from components.SessionReader import SessionReader
+
 class CommandInterface:
+    HISTORY_ROWS = 20  # Stored scans listed by the history command
+    JOB_POLL_INTERVAL = 0.1  # Seconds between job checks while awaiting a job
+    
     def __init__(self, monitor, system_manager, spectral_engine, keyboard):
         self.monitor = monitor
         self.system_manager = system_manager
         self.spectral_engine = spectral_engine
         self.keyboard = keyboard
+        self.async_engine = AsyncSpectralEngine(spectral_engine)
+        self.task = None        # Long-running command running on the event loop
+        self.task_name = None
+        self.task_job = None    # Job a foreground job task is waiting for
+        self.preemptions = []   # (command line, future) waiting for the task's next checkpoint
+        self.preempting = False # True while one of them runs
         self.commands = {}
+        self.async_commands = {}
+        self.awaited_commands = {}
+        self.foreground_jobs = set()
+        self.preempting_commands = set()
         self.register_default_commands()
         
     def register_default_commands(self):
@@ -29,7 +50,52 @@ class CommandInterface:
             'concentration': self.cmd_concentration,
             'selftest': self.cmd_selftest,
             'autozero': self.cmd_autozero,
-            'kinetic': self.cmd_kinetic
+            'kinetic': self.cmd_kinetic,
+            'clock': self.cmd_clock,
+            'seed': self.cmd_seed,
+            'burst': self.cmd_burst,
+            'mkinetic': self.cmd_mkinetic,
+            'photometric': self.cmd_photometric,
+            'photo': self.cmd_photometric,  # Alias
+            'stop': self.cmd_stop,
+            'jobs': self.cmd_jobs,
+            'job': self.cmd_job,
+            'cancel': self.cmd_cancel,
+            'wait': self.cmd_wait,
+            'history': self.cmd_history,
+            'archive': self.cmd_archive,
+            'autosave': self.cmd_autosave,
+            'sessions': self.cmd_sessions,
+            'batch': self.cmd_batch,
+            'refcache': self.cmd_refcache
+        }
+        
+        # Commands that can run as background jobs with a trailing '&'
+        self.job_commands = {
+            'scan': self._start_scan_job,
+            'kinetic': self._start_kinetic_job,
+            'calibrate': self._start_calibrate_job,
+            'batch': self._start_batch_job
+        }
+        
+        # Commands process_command_async awaits before returning, without
+        # blocking the event loop
+        self.awaited_commands = {
+            'wait': self.acmd_wait
+        }
+        
+        # Long commands process_command_async runs as jobs behind a task
+        self.foreground_jobs = {'batch', 'mkinetic', 'burst', 'selftest'}
+        
+        # Quick instrument commands, run at a checkpoint of the job or
+        # foreground task holding the instrument (see _task_checkpoint)
+        self.preempting_commands = {'measure', 'autozero', 'photometric', 'photo', 'wavelength', 'wl', 'goto'}
+        
+        # Commands run as event loop tasks by process_command_async
+        self.async_commands = {
+            'scan': self.acmd_scan,
+            'calibrate': self.acmd_calibrate,
+            'kinetic': self.acmd_kinetic
         }
         
     def process_command(self, command_line):
@@ -38,10 +104,26 @@ class CommandInterface:
         if not parts:
             return
             
+        # Trailing '&' runs the command as a background job
+        background = parts[-1].endswith('&')
+        if background:
+            parts[-1] = parts[-1][:-1]
+            parts = [part for part in parts if part]
+            if not parts:
+                return
+                
         cmd = parts[0].lower()
         args = parts[1:]
         
-        if cmd in self.commands:
+        if background:
+            if cmd in self.job_commands:
+                try:
+                    self.job_commands[cmd](args)
+                except Exception as e:
+                    self.monitor.write(f"Error starting job: {e}\n")
+            else:
+                self.monitor.write(f"'{cmd}' cannot run in the background\n")
+        elif cmd in self.commands:
             try:
                 self.commands[cmd](args)
             except Exception as e:
@@ -49,6 +131,144 @@ class CommandInterface:
         else:
             self.monitor.write(f"Unknown command: {cmd}. Type 'help' for available commands.\n")
             
+    async def process_command_async(self, command_line):
+        """Process a command line on the event loop
+        
+        Scan, calibrate and kinetic start as a background task so the prompt stays
+        responsive (and 'stop' can reach them). Batch, mkinetic, burst and
+        selftest do too, run as jobs on the job worker. Quick instrument
+        commands that have to preempt a running task or job are awaited
+        without blocking the loop; other commands run immediately.
+        """
+        parts = command_line.strip().split()
+        if not parts:
+            return
+            
+        cmd = parts[0].lower()
+        args = parts[1:]
+        
+        background = command_line.rstrip().endswith('&')
+        if cmd in self.awaited_commands and not background:
+            await self.awaited_commands[cmd](args)
+            return
+        jobs = self.system_manager.jobs
+        if cmd in self.preempting_commands and not background:
+            # Runs at the next checkpoint of whatever holds the instrument;
+            # the prompt waits, the loop does not
+            if self.is_busy() and self.task_name in self.async_commands:
+                if await self._preempt_task(command_line):
+                    return
+            if jobs.current is not None:
+                job = jobs.submit(cmd, lambda job: self.process_command(command_line), priority=jobs.PRIORITY_HIGH)
+                await self._wait_job(job)
+                return
+        if (cmd not in self.async_commands and cmd not in self.foreground_jobs) or background:
+            self.process_command(command_line)
+            return
+            
+        if self.is_busy():
+            self.monitor.write(f"Busy with '{self.task_name}'. Type 'stop' to end it.\n")
+            return
+            
+        if cmd in self.foreground_jobs:
+            self.task_name = cmd
+            self.task = asyncio.ensure_future(
+                self._run_task(self._run_foreground_job, (cmd, args), owns_instrument=False)
+            )
+            return
+            
+        # The task owns the instrument until it ends, queued jobs wait for it
+        if not jobs.instrument_lock.acquire(blocking=False):
+            self.monitor.write(self._busy_message() + "\n")
+            return
+            
+        self.task_name = cmd
+        self.task = asyncio.ensure_future(self._run_task(self.async_commands[cmd], args))
+        
+    async def _run_task(self, command, args, owns_instrument=True):
+        """Run an async command, reporting errors like process_command
+        
+        With owns_instrument the task holds the instrument lock, released here.
+        """
+        try:
+            await command(args)
+        except asyncio.CancelledError:
+            self.monitor.write(f"'{self.task_name}' cancelled\n")
+        except Exception as e:
+            self.monitor.write(f"Error executing command: {e}\n")
+        finally:
+            if owns_instrument:
+                self.system_manager.jobs.instrument_lock.release()
+            # Commands still waiting for a checkpoint are dispatched normally
+            for command_line, future in self.preemptions:
+                if not future.done():
+                    future.set_result(False)
+            self.preemptions = []
+        self.monitor.write("spectro> ")
+        
+    async def _preempt_task(self, command_line):
+        """Run a command at the running task's next checkpoint, False if the task ended first"""
+        future = asyncio.get_running_loop().create_future()
+        self.preemptions.append((command_line, future))
+        return await future
+        
+    def _task_checkpoint(self, progress=None, partial=None):
+        """Checkpoint of foreground tasks: run the commands waiting to preempt the task
+        
+        Like JobManager._preempt, the instrument state is saved before them
+        and restored afterwards, so the task resumes where it was.
+        """
+        while self.preemptions:
+            command_line, future = self.preemptions.pop(0)
+            if future.done():
+                continue
+            engine = self.spectral_engine
+            state = engine.save_state()
+            self.preempting = True
+            try:
+                self.process_command(command_line)
+            finally:
+                self.preempting = False
+                engine.restore_state(state)
+                future.set_result(True)
+            
+    async def _run_foreground_job(self, command):
+        """Run a long command as a job and wait for it, so the event loop keeps running
+        
+        The job can be preempted at its checkpoints like any background job.
+        'stop' cancels the job (see cmd_stop); cancelling the task cancels it
+        too, and the task only ends once the job has let go of the instrument.
+        """
+        cmd, args = command
+        jobs = self.system_manager.jobs
+        job = jobs.submit(cmd, lambda job: self.commands[cmd](args))
+        self.task_job = job
+        if jobs.current is not None and jobs.current is not job:
+            self.monitor.write(f"Waiting for job {jobs.current.id} to finish...\n")
+        try:
+            await self._wait_job(job)
+        except asyncio.CancelledError:
+            # The job holds the instrument until it reaches a checkpoint
+            job.cancel()
+            if job.status != Job.QUEUED:
+                await self._wait_job(job)
+            raise
+        finally:
+            self.task_job = None
+        if job.status == Job.CANCELLED:
+            self.monitor.write(f"'{cmd}' cancelled\n")
+            
+    def _job_checkpoint(self):
+        """Checkpoint of the job this command runs in, None outside jobs"""
+        jobs = self.system_manager.jobs if self.system_manager is not None else None
+        if jobs is not None and jobs.on_worker_thread() and jobs.current is not None:
+            return jobs.current.checkpoint
+        return None
+        
+    def is_busy(self):
+        """True while a background command is running"""
+        return self.task is not None and not self.task.done()
+        
     def cmd_help(self, args):
         """Display help information"""
         help_text = """
@@ -56,9 +276,13 @@ class CommandInterface:
 
 Measurement Commands:
   measure                - Measure intensity at current wavelength
-  scan [start] [end]    - Perform full wavelength scan (default: 400-700nm)
+  photometric <nm>...   - Measure a set of wavelengths (alias: photo)
+  scan [start] [end] [name] - Perform full wavelength scan (default: 400-700nm)
   kinetic [time] [int]  - Time-course measurements (default: 60s, 1s interval)
+  burst <n> <rate> [nm] - Fast burst acquisition of n points at rate Hz
+  mkinetic <time> <int> <nm>... - Time-course at several wavelengths
   absorbance            - Calculate absorbance from reference & sample
+  batch <name:pos>...   - Autosampler run: one blank, then scan every sample
   concentration [abs]   - Calculate concentration from absorbance
 
 Wavelength Control:
@@ -69,17 +293,34 @@ Wavelength Control:
 System Control:
   lamp [on|off]         - Turn lamp on/off
   sample [present|absent] - Set sample presence
-  calibrate             - Calibrate with reference (blank)
+  calibrate [start end|full] [fresh] - Calibrate with a blank (reused while cached)
+  refcache [s|off|clear] - Show cached blanks, set their validity window or clear them
   selftest              - Perform instrument self-test
+  clock [mode]          - Set/get clock mode (realtime, instant, x<N>)
+  seed [n]              - Set/get the measurement noise seed
 
 Data Management:
-  save <filename>       - Save current data to file
-  load <filename>       - Load data from file
+  save <file> [compress] - Save current data (binary, or JSON if <file> ends in .json)
+  load <file> [section...] - Load a data file (or some sections), journal or measurement log
+  sessions [dir]        - List saved data files with their metadata
+  history [name|*] [days] - List stored scans, optionally of one sample / recent days
+  archive export <file> - Write stored scans to a memory-mapped archive
+  archive open <file>   - Open an archive (scans are read when accessed)
+  archive list [name]   - List scans in the open archive
+  archive show <id>     - Show one archived scan
+  autosave [now|<s>]    - Show autosave status, save changes now or set the interval
+
+Job Control (append '&' to scan, kinetic or calibrate to run as a job):
+  jobs                  - List background jobs
+  job <id>              - Show job progress and partial results
+  cancel <id>           - Cancel a background job
+  wait <id> [seconds]   - Wait for a job to finish
 
 Utility Commands:
   status                - Display system status
   clear                 - Clear the screen
   log [n]               - Show last n log entries (default: 10)
+  stop                  - Stop the running scan, kinetic or calibration
   exit                  - Exit the application
   help                  - Display this help message
 
@@ -91,6 +332,38 @@ Keyboard Simulation:
         
     def cmd_scan(self, args):
         """Perform a spectral scan"""
+        scan_args = self._parse_scan_args(args)
+        if scan_args is None:
+            return
+        start_wl, end_wl, sample_name = scan_args
+        
+        try:
+            scan_result = self._run_on_instrument('scan', lambda: self.spectral_engine.scan_full_range(
+                start_wl, end_wl, sample_name=sample_name
+            ))
+            self._report_scan(scan_result)
+        except Exception as e:
+            self.monitor.write(f"Scan failed: {e}\n")
+            
+    async def acmd_scan(self, args):
+        """Perform a spectral scan on the event loop"""
+        scan_args = self._parse_scan_args(args)
+        if scan_args is None:
+            return
+        start_wl, end_wl, sample_name = scan_args
+        
+        try:
+            scan_result = await self.async_engine.scan(
+                start_wl, end_wl, sample_name=sample_name, checkpoint=self._task_checkpoint
+            )
+            self._report_scan(scan_result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.monitor.write(f"Scan failed: {e}\n")
+            
+    def _parse_scan_args(self, args):
+        """Parse scan arguments, returns (start_wl, end_wl, sample_name) or None if invalid"""
         # Default scan range
         start_wl = 400.0
         end_wl = 700.0
@@ -100,48 +373,91 @@ Keyboard Simulation:
                 start_wl = float(args[0])
             except ValueError:
                 self.monitor.write(f"Invalid start wavelength: {args[0]}\n")
-                return
+                return None
                 
         if len(args) >= 2:
             try:
                 end_wl = float(args[1])
             except ValueError:
                 self.monitor.write(f"Invalid end wavelength: {args[1]}\n")
-                return
+                return None
         
         sample_name = "Sample_1"
         if len(args) >= 3:
             sample_name = args[2]
             
         self.monitor.write(f"Starting scan of '{sample_name}' from {start_wl}nm to {end_wl}nm...\n")
+        return start_wl, end_wl, sample_name
         
-        try:
-            scan_result = self.spectral_engine.scan_full_range(start_wl, end_wl)
+    def _report_scan(self, scan_result):
+        """Display scan summary"""
+        summary = scan_result.summary
+        if summary.count:
+            self.monitor.write(f"Scan complete: {summary.count} data points\n")
+            self.monitor.write(f"Peak intensity: {summary.max_intensity:.2f} at {summary.max_wavelength}nm\n")
+            self.monitor.write(f"Min intensity: {summary.min_intensity:.2f} at {summary.min_wavelength}nm\n")
+            scan_id = scan_result.scan_id
+            if scan_id is None:
+                scan_id = len(self.spectral_engine.scan_history)
+            self.monitor.write(f"Scan saved to history (ID: {scan_id})\n")
             
-            # Display summary
-            if scan_result['data']:
-                intensities = [d['intensity'] for d in scan_result['data']]
-                wavelengths = [d['wavelength'] for d in scan_result['data']]
-                
-                max_idx = intensities.index(max(intensities))
-                min_idx = intensities.index(min(intensities))
-                
-                self.monitor.write(f"Scan complete: {len(scan_result['data'])} data points\n")
-                self.monitor.write(f"Peak intensity: {intensities[max_idx]:.2f} at {wavelengths[max_idx]}nm\n")
-                self.monitor.write(f"Min intensity: {intensities[min_idx]:.2f} at {wavelengths[min_idx]}nm\n")
-                self.monitor.write(f"Scan saved to history (ID: {len(self.spectral_engine.scan_history)})\n")
-        except Exception as e:
-            self.monitor.write(f"Scan failed: {e}\n")
+    def _parse_calibrate_args(self, args):
+        """Parse calibrate arguments, returns (start_wl, end_wl, use_cache) or None if invalid"""
+        use_cache = True
+        if args and args[-1].lower() == 'fresh':
+            use_cache = False
+            args = args[:-1]
+            
+        start_wl = end_wl = None
+        if args and args[0].lower() == 'full':
+            start_wl = self.spectral_engine.MIN_WAVELENGTH
+            end_wl = self.spectral_engine.MAX_WAVELENGTH
+        elif len(args) == 2:
+            try:
+                start_wl, end_wl = float(args[0]), float(args[1])
+            except ValueError:
+                self.monitor.write(f"Invalid wavelength range: {' '.join(args)}\n")
+                return None
+        elif args:
+            self.monitor.write("Usage: calibrate [start end|full] [fresh]\n")
+            return None
             
+        self.monitor.write("Starting calibration procedure...\n")
+        return start_wl, end_wl, use_cache
+        
     def cmd_calibrate(self, args):
         """Perform calibration"""
-        self.monitor.write("Starting calibration procedure...\n")
+        calibrate_args = self._parse_calibrate_args(args)
+        if calibrate_args is None:
+            return
+        start_wl, end_wl, use_cache = calibrate_args
+        
+        try:
+            if self._run_on_instrument('calibrate', lambda: self.spectral_engine.calibrate_reference(
+                start_wl, end_wl, use_cache=use_cache
+            )):
+                self.monitor.write("Calibration successful. Reference spectrum saved.\n")
+            else:
+                self.monitor.write("Calibration failed.\n")
+        except Exception as e:
+            self.monitor.write(f"Calibration error: {e}\n")
+            
+    async def acmd_calibrate(self, args):
+        """Perform calibration on the event loop"""
+        calibrate_args = self._parse_calibrate_args(args)
+        if calibrate_args is None:
+            return
+        start_wl, end_wl, use_cache = calibrate_args
         
         try:
-            if self.spectral_engine.calibrate_reference():
+            if await self.async_engine.calibrate(
+                start_wl=start_wl, end_wl=end_wl, use_cache=use_cache, checkpoint=self._task_checkpoint
+            ):
                 self.monitor.write("Calibration successful. Reference spectrum saved.\n")
             else:
                 self.monitor.write("Calibration failed.\n")
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             self.monitor.write(f"Calibration error: {e}\n")
             
@@ -154,6 +470,7 @@ Keyboard Simulation:
         self.monitor.write(f"System Running: {status['running']}\n")
         self.monitor.write(f"Active Components: {', '.join(status['components'])}\n")
         self.monitor.write(f"Active Tasks: {status['active_tasks']}\n")
+        self.monitor.write(f"Active Jobs: {status['active_jobs']}\n")
         self.monitor.write(f"Log Entries: {status['log_entries']}\n")
         
         self.monitor.write("\n=== Spectrometer Status ===\n")
@@ -164,6 +481,7 @@ Keyboard Simulation:
         self.monitor.write(f"Sample Present: {'YES' if engine_status['sample_present'] else 'NO'}\n")
         self.monitor.write(f"Scan Mode: {engine_status['scan_mode']}\n")
         self.monitor.write(f"Scans in History: {engine_status['scan_history_count']}\n")
+        self.monitor.write(f"Clock: {engine_status['clock_mode']}, instrument time {engine_status['instrument_time']:.1f}s\n")
         self.monitor.write("====================\n")
         
     def cmd_clear(self, args):
@@ -188,7 +506,7 @@ Keyboard Simulation:
         if args:
             try:
                 wl = float(args[0])
-                actual_wl = self.spectral_engine.set_wavelength(wl)
+                actual_wl = self._run_on_instrument('wavelength', lambda: self.spectral_engine.set_wavelength(wl))
                 self.monitor.write(f"Wavelength set to {actual_wl}nm\n")
             except ValueError as e:
                 self.monitor.write(f"Error: {e}\n")
@@ -203,7 +521,7 @@ Keyboard Simulation:
             
         try:
             wl = float(args[0])
-            actual_wl = self.spectral_engine.goto_wavelength(wl)
+            actual_wl = self._run_on_instrument('goto', lambda: self.spectral_engine.goto_wavelength(wl))
             self.monitor.write(f"GOTO wavelength: {actual_wl}nm\n")
         except ValueError as e:
             self.monitor.write(f"Error: {e}\n")
@@ -213,13 +531,17 @@ Keyboard Simulation:
         if args:
             state = args[0].lower()
             if state in ['on', '1', 'true']:
-                self.spectral_engine.is_lamp_on = True
-                self.monitor.write("Lamp turned ON\n")
+                on = True
             elif state in ['off', '0', 'false']:
-                self.spectral_engine.is_lamp_on = False
-                self.monitor.write("Lamp turned OFF\n")
+                on = False
             else:
                 self.monitor.write("Usage: lamp [on|off]\n")
+                return
+            try:
+                self._change_instrument(lambda: setattr(self.spectral_engine, 'is_lamp_on', on))
+                self.monitor.write(f"Lamp turned {'ON' if on else 'OFF'}\n")
+            except RuntimeError as e:
+                self.monitor.write(f"Error: {e}\n")
         else:
             state = "ON" if self.spectral_engine.is_lamp_on else "OFF"
             self.monitor.write(f"Lamp is {state}\n")
@@ -229,13 +551,17 @@ Keyboard Simulation:
         if args:
             state = args[0].lower()
             if state in ['present', 'yes', 'true', '1']:
-                self.spectral_engine.sample_present = True
-                self.monitor.write("Sample set as PRESENT\n")
+                present = True
             elif state in ['absent', 'no', 'false', '0', 'blank']:
-                self.spectral_engine.sample_present = False
-                self.monitor.write("Sample set as ABSENT (blank)\n")
+                present = False
             else:
                 self.monitor.write("Usage: sample [present|absent]\n")
+                return
+            try:
+                self._change_instrument(lambda: setattr(self.spectral_engine, 'sample_present', present))
+                self.monitor.write("Sample set as PRESENT\n" if present else "Sample set as ABSENT (blank)\n")
+            except RuntimeError as e:
+                self.monitor.write(f"Error: {e}\n")
         else:
             state = "PRESENT" if self.spectral_engine.sample_present else "ABSENT"
             self.monitor.write(f"Sample is {state}\n")
@@ -243,7 +569,7 @@ Keyboard Simulation:
     def cmd_measure(self, args):
         """Measure intensity at current wavelength"""
         try:
-            measurement = self.spectral_engine.measure_single()
+            measurement = self._run_on_instrument('measure', self.spectral_engine.measure_single)
             self.monitor.write(f"Measurement at {measurement['wavelength']}nm:\n")
             self.monitor.write(f"  Intensity: {measurement['intensity']:.2f}\n")
             self.monitor.write(f"  Sample: {'Present' if measurement['sample_present'] else 'Absent'}\n")
@@ -251,6 +577,93 @@ Keyboard Simulation:
         except Exception as e:
             self.monitor.write(f"Measurement failed: {e}\n")
             
+    def cmd_photometric(self, args):
+        """Photometric measure at several wavelengths"""
+        if not args:
+            self.monitor.write("Usage: photometric <wavelength> [wavelength...]\n")
+            return
+            
+        try:
+            wavelengths = [float(wl) for wl in args]
+        except ValueError:
+            self.monitor.write(f"Invalid wavelengths: {' '.join(args)}\n")
+            return
+            
+        try:
+            result = self._run_on_instrument('photometric', lambda: self.spectral_engine.photometric_measure(wavelengths))
+            self.monitor.write(f"Photometric measure at {len(result['wavelengths'])} wavelengths:\n")
+            for wl, intensity, absorbance in zip(
+                result['wavelengths'], result['intensities'], result['absorbance']
+            ):
+                line = f"  {wl}nm: I={intensity:.2f}"
+                if not np.isnan(absorbance):
+                    line += f", A={absorbance:.3f}"
+                self.monitor.write(line + "\n")
+            self.monitor.write(f"  Monochromator travel: {result['move_time']:.2f}s\n")
+        except Exception as e:
+            self.monitor.write(f"Photometric measure failed: {e}\n")
+            
+    def cmd_batch(self, args):
+        """Autosampler batch over several cell positions"""
+        batch_args = self._parse_batch_args(args)
+        if batch_args is None:
+            return
+        samples, start_wl, end_wl, blank_position, output_dir = batch_args
+        
+        try:
+            rows = self._run_on_instrument('batch', lambda: self.spectral_engine.run_batch(
+                samples, start_wl, end_wl, blank_position, output_dir, checkpoint=self._job_checkpoint()
+            ))
+            self._report_batch(rows)
+        except JobCancelled:
+            raise  # Ends the job as cancelled
+        except Exception as e:
+            self.monitor.write(f"Batch failed: {e}\n")
+            
+    def _parse_batch_args(self, args):
+        """Parse batch arguments, returns (samples, start_wl, end_wl, blank, out) or None if invalid"""
+        usage = "Usage: batch <name:position>... [start end] [blank=<position>] [out=<dir>]\n"
+        samples = []
+        wavelengths = []
+        blank_position = 0
+        output_dir = None
+        try:
+            for arg in args:
+                if arg.startswith('blank='):
+                    blank_position = int(arg[6:])
+                elif arg.startswith('out='):
+                    output_dir = arg[4:]
+                elif ':' in arg:
+                    name, position = arg.rsplit(':', 1)
+                    samples.append((name, int(position)))
+                else:
+                    wavelengths.append(float(arg))
+        except ValueError:
+            self.monitor.write(f"Invalid batch argument: {arg}\n")
+            return None
+            
+        if not samples or len(wavelengths) not in (0, 2):
+            self.monitor.write(usage)
+            return None
+        start_wl, end_wl = wavelengths if wavelengths else (None, None)
+        
+        self.monitor.write(f"Starting batch of {len(samples)} samples (blank at position {blank_position})...\n")
+        return samples, start_wl, end_wl, blank_position, output_dir
+        
+    def _report_batch(self, rows):
+        """Display the batch summary table"""
+        self.monitor.write(f"Batch summary ({len(rows)} samples):\n")
+        self.monitor.write(f"  {'Sample':<14}{'Pos':>4}{'Scan':>6}{'Peak nm':>9}{'Peak A':>8}{'Mean A':>8}  File\n")
+        for row in rows:
+            peak_wavelength = f"{row['peak_wavelength']:.1f}" if row['peak_wavelength'] is not None else '-'
+            peak_absorbance = f"{row['peak_absorbance']:.3f}" if row['peak_absorbance'] is not None else '-'
+            mean_absorbance = f"{row['mean_absorbance']:.3f}" if row['mean_absorbance'] is not None else '-'
+            scan_id = row['scan_id'] if row['scan_id'] is not None else '-'
+            self.monitor.write(
+                f"  {row['name']:<14}{row['position']:>4}{scan_id:>6}{peak_wavelength:>9}"
+                f"{peak_absorbance:>8}{mean_absorbance:>8}  {row['file'] or '-'}\n"
+            )
+            
     def cmd_absorbance(self, args):
         """Calculate absorbance"""
         try:
@@ -303,7 +716,7 @@ Keyboard Simulation:
         self.monitor.write("Performing instrument self-test...\n")
         
         try:
-            self_test = self.spectral_engine.perform_self_test()
+            self_test = self._run_on_instrument('selftest', self.spectral_engine.perform_self_test)
             
             self.monitor.write(f"Self-test result: {'PASS' if self_test['passed'] else 'FAIL'}\n")
             for test_name, result in self_test['tests'].items():
@@ -318,13 +731,39 @@ Keyboard Simulation:
         self.monitor.write("Performing auto-zero...\n")
         
         try:
-            if self.spectral_engine.auto_zero():
+            if self._run_on_instrument('autozero', self.spectral_engine.auto_zero):
                 self.monitor.write(f"Auto-zero complete at {self.spectral_engine.current_wavelength}nm\n")
         except Exception as e:
             self.monitor.write(f"Auto-zero failed: {e}\n")
             
     def cmd_kinetic(self, args):
         """Perform kinetic scan"""
+        kinetic_args = self._parse_kinetic_args(args)
+        if kinetic_args is None:
+            return
+        
+        try:
+            kinetic_data = self._run_on_instrument('kinetic', lambda: self.spectral_engine.kinetic_scan(*kinetic_args))
+            self._report_kinetic(kinetic_data)
+        except Exception as e:
+            self.monitor.write(f"Kinetic scan failed: {e}\n")
+            
+    async def acmd_kinetic(self, args):
+        """Perform kinetic scan on the event loop"""
+        kinetic_args = self._parse_kinetic_args(args)
+        if kinetic_args is None:
+            return
+        
+        try:
+            kinetic_data = await self.async_engine.kinetic(*kinetic_args, checkpoint=self._task_checkpoint)
+            self._report_kinetic(kinetic_data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.monitor.write(f"Kinetic scan failed: {e}\n")
+            
+    def _parse_kinetic_args(self, args):
+        """Parse kinetic arguments, returns (duration, interval) or None if invalid"""
         duration = 60.0
         interval = 1.0
         
@@ -333,63 +772,568 @@ Keyboard Simulation:
                 duration = float(args[0])
             except ValueError:
                 self.monitor.write(f"Invalid duration: {args[0]}\n")
-                return
+                return None
                 
         if len(args) >= 2:
             try:
                 interval = float(args[1])
             except ValueError:
                 self.monitor.write(f"Invalid interval: {args[1]}\n")
-                return
+                return None
         
         self.monitor.write(f"Starting kinetic scan: {duration} seconds, {interval} second interval\n")
+        return duration, interval
+        
+    def _report_kinetic(self, kinetic_data):
+        """Display kinetic scan results and timing"""
+        self.monitor.write(f"Kinetic scan complete: {len(kinetic_data)} data points\n")
         
+        if kinetic_data:
+            first = kinetic_data[0]
+            last = kinetic_data[-1]
+            self.monitor.write(f"  First: {first['intensity']:.2f} at {first['time']:.3f}s\n")
+            self.monitor.write(f"  Last: {last['intensity']:.2f} at {last['time']:.3f}s\n")
+        
+        timing = self.spectral_engine.kinetic_timing
+        if timing:
+            self.monitor.write(
+                f"  Timing: mean lateness {timing['mean_lateness'] * 1000:.3f}ms, "
+                f"max {timing['max_lateness'] * 1000:.3f}ms, "
+                f"jitter {timing['jitter'] * 1000:.3f}ms, "
+                f"{timing['skipped']} skipped\n"
+            )
+            
+    def cmd_stop(self, args):
+        """Stop the running background command"""
+        if not self.is_busy():
+            self.monitor.write("Nothing is running\n")
+            return
+            
+        if self.task_name in ('scan', 'kinetic'):
+            # Cooperative stop keeps the data acquired so far
+            self.async_engine.stop()
+            self.monitor.write(f"Stopping '{self.task_name}'...\n")
+        elif self.task_job is not None:
+            # The task ends once the job has stopped at its next checkpoint
+            self.task_job.cancel()
+            self.monitor.write(f"Stopping '{self.task_name}'...\n")
+        else:
+            self.task.cancel()
+            
+    def cmd_clock(self, args):
+        """Set or get the instrument clock mode"""
+        clock = self.spectral_engine.clock
+        if args:
+            try:
+                self._change_instrument(lambda: clock.set_mode_from_spec(args[0]))
+                self.monitor.write(f"Clock set to {clock.describe()}\n")
+            except ValueError as e:
+                self.monitor.write(f"Error: {e}\n")
+                self.monitor.write("Usage: clock [realtime|instant|x<N>]\n")
+            except RuntimeError as e:
+                self.monitor.write(f"Error: {e}\n")
+        else:
+            self.monitor.write(f"Clock: {clock.describe()}\n")
+            self.monitor.write(f"Instrument time: {clock.monotonic():.1f}s\n")
+            
+    def cmd_seed(self, args):
+        """Set or get the measurement noise seed"""
+        if args:
+            try:
+                seed = int(args[0])
+            except ValueError:
+                self.monitor.write(f"Invalid seed: {args[0]}\n")
+                return
+            try:
+                seed = self._change_instrument(lambda: self.spectral_engine.set_seed(seed))
+                self.monitor.write(f"Noise seed set to {seed}\n")
+            except RuntimeError as e:
+                self.monitor.write(f"Error: {e}\n")
+        else:
+            self.monitor.write(f"Noise seed: {self.spectral_engine.noise.seed}\n")
+            
+    def cmd_mkinetic(self, args):
+        """Perform a multi-wavelength kinetic scan"""
+        if len(args) < 3:
+            self.monitor.write("Usage: mkinetic <duration> <interval> <wavelength> [wavelength...]\n")
+            return
+            
         try:
-            kinetic_data = self.spectral_engine.kinetic_scan(duration, interval)
-            self.monitor.write(f"Kinetic scan complete: {len(kinetic_data)} data points\n")
-            
-            if kinetic_data:
-                first = kinetic_data[0]
-                last = kinetic_data[-1]
-                self.monitor.write(f"  First: {first['intensity']:.2f} at {first['time']}s\n")
-                self.monitor.write(f"  Last: {last['intensity']:.2f} at {last['time']}s\n")
-                
+            duration = float(args[0])
+            interval = float(args[1])
+            wavelengths = [float(wl) for wl in args[2:]]
+        except ValueError:
+            self.monitor.write(f"Invalid kinetic parameters: {' '.join(args)}\n")
+            return
+            
+        try:
+            result = self._run_on_instrument('mkinetic', lambda: self.spectral_engine.kinetic_scan_multi(
+                wavelengths, duration, interval, checkpoint=self._job_checkpoint()
+            ))
+            self.monitor.write(
+                f"Kinetic scan complete: {len(result['times'])} time points x "
+                f"{len(result['wavelengths'])} wavelengths\n"
+            )
+            self.monitor.write(f"  Monochromator travel: {result['move_time']:.2f}s\n")
+            if len(result['times']):
+                last = result['intensities'][-1]
+                for wl, intensity in zip(result['wavelengths'], last):
+                    self.monitor.write(f"  {wl}nm: {intensity:.2f} at {result['times'][-1]:.3f}s\n")
+        except JobCancelled:
+            raise  # Ends the job as cancelled
         except Exception as e:
             self.monitor.write(f"Kinetic scan failed: {e}\n")
             
+    def cmd_burst(self, args):
+        """Perform a burst (stopped-flow) acquisition"""
+        if len(args) < 2:
+            self.monitor.write("Usage: burst <points> <rate_hz> [wavelength]\n")
+            return
+            
+        try:
+            num_points = int(args[0])
+            rate = float(args[1])
+            wavelength = float(args[2]) if len(args) > 2 else None
+        except ValueError:
+            self.monitor.write(f"Invalid burst parameters: {' '.join(args)}\n")
+            return
+            
+        try:
+            burst = self._run_on_instrument('burst', lambda: self.spectral_engine.burst_acquire(
+                num_points, rate, wavelength, checkpoint=self._job_checkpoint()
+            ))
+            intensities = burst['intensities']
+            self.monitor.write(f"Burst complete: {len(intensities)} points at {burst['wavelength']}nm\n")
+            if len(intensities):
+                self.monitor.write(f"  Mean intensity: {intensities.mean():.2f} (sd {intensities.std():.3f})\n")
+                self.monitor.write(f"  Achieved rate: {len(intensities) / max(burst['duration'], 1e-9):.0f}Hz\n")
+                self.monitor.write(f"  Max lateness: {burst['max_lateness'] * 1000:.3f}ms\n")
+        except JobCancelled:
+            raise  # Ends the job as cancelled
+        except Exception as e:
+            self.monitor.write(f"Burst failed: {e}\n")
+            
+    def _run_on_instrument(self, name, function):
+        """Run an instrument operation now, preempting a running background job if needed
+        
+        The operation takes the instrument lock for its duration. While a job
+        holds the instrument, the operation is queued at high priority and runs
+        at the job's next checkpoint; this waits for its result. While a
+        foreground task drives the instrument the operation is refused, unless
+        it runs at the task's checkpoint (see process_command_async).
+        """
+        jobs = self.system_manager.jobs if self.system_manager is not None else None
+        if jobs is None or jobs.on_worker_thread() or self.preempting:
+            return function()
+        if jobs.instrument_lock.acquire(blocking=False):
+            try:
+                return function()
+            finally:
+                jobs.instrument_lock.release()
+        if self.is_busy():
+            raise RuntimeError(self._busy_message())
+            
+        job = jobs.submit(name, lambda job: function(), priority=jobs.PRIORITY_HIGH)
+        job.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+        
+    def _change_instrument(self, function):
+        """Change instrument state (lamp, sample, clock...), refused while the instrument is in use
+        
+        Unlike _run_on_instrument these changes are not run at a job
+        checkpoint: they would corrupt the running acquisition, and a
+        preempted job restores its own state afterwards anyway.
+        """
+        jobs = self.system_manager.jobs if self.system_manager is not None else None
+        if jobs is None or jobs.on_worker_thread():
+            return function()
+        if not jobs.instrument_lock.acquire(blocking=False):
+            raise RuntimeError(self._busy_message())
+        try:
+            return function()
+        finally:
+            jobs.instrument_lock.release()
+            
+    def _busy_message(self):
+        """Why the instrument cannot be used right now, for error messages"""
+        if self.is_busy():
+            return f"Instrument busy with '{self.task_name}'. Type 'stop' to end it."
+        current_job = self.system_manager.jobs.current
+        owner = f"job {current_job.id}" if current_job is not None else "a background job"
+        return f"Instrument busy with {owner}. Use 'wait' or 'cancel'."
+        
+    def _start_scan_job(self, args):
+        """Queue a scan as a background job"""
+        scan_args = self._parse_scan_args(args)
+        if scan_args is None:
+            return
+        start_wl, end_wl, sample_name = scan_args
+        self._submit_job('scan', lambda job: self.spectral_engine.scan_full_range(
+            start_wl, end_wl, checkpoint=job.checkpoint, sample_name=sample_name
+        ))
+        
+    def _start_kinetic_job(self, args):
+        """Queue a kinetic scan as a background job"""
+        kinetic_args = self._parse_kinetic_args(args)
+        if kinetic_args is None:
+            return
+        duration, interval = kinetic_args
+        self._submit_job('kinetic', lambda job: self.spectral_engine.kinetic_scan(
+            duration, interval, checkpoint=job.checkpoint
+        ))
+        
+    def _start_calibrate_job(self, args):
+        """Queue a calibration as a background job"""
+        calibrate_args = self._parse_calibrate_args(args)
+        if calibrate_args is None:
+            return
+        start_wl, end_wl, use_cache = calibrate_args
+        self._submit_job('calibrate', lambda job: self.spectral_engine.calibrate_reference(
+            start_wl, end_wl, checkpoint=job.checkpoint, use_cache=use_cache
+        ))
+        
+    def _start_batch_job(self, args):
+        """Queue an autosampler batch as a background job"""
+        batch_args = self._parse_batch_args(args)
+        if batch_args is None:
+            return
+        samples, start_wl, end_wl, blank_position, output_dir = batch_args
+        self._submit_job('batch', lambda job: self.spectral_engine.run_batch(
+            samples, start_wl, end_wl, blank_position, output_dir, checkpoint=job.checkpoint
+        ))
+        
+    def _submit_job(self, name, function):
+        job = self.system_manager.jobs.submit(name, function, on_done=self._job_finished)
+        self.monitor.write(f"Job {job.id} queued. Use 'job {job.id}' to check it.\n")
+        if self.is_busy():
+            self.monitor.write(f"It starts once '{self.task_name}' has finished.\n")
+        return job
+        
+    def _job_finished(self, job):
+        """Report a finished job (called on the job worker thread)"""
+        self.monitor.write(f"\nJob {job.id} '{job.name}' {job.status}\n")
+        if job.status == Job.DONE:
+            self._report_job_result(job)
+        elif job.status == Job.FAILED:
+            self.monitor.write(f"  Error: {job.error}\n")
+            
+    def _report_job_result(self, job):
+        if job.name == 'scan':
+            self._report_scan(job.result)
+        elif job.name == 'kinetic':
+            self._report_kinetic(job.result)
+        elif job.name == 'batch':
+            self._report_batch(job.result)
+        elif job.name == 'calibrate':
+            if job.result:
+                self.monitor.write("Calibration successful. Reference spectrum saved.\n")
+            else:
+                self.monitor.write("Calibration failed.\n")
+                
+    def _parse_job_id(self, args, usage):
+        """Job referenced by the first argument, or None after printing an error"""
+        if not args:
+            self.monitor.write(f"Usage: {usage}\n")
+            return None
+        try:
+            job_id = int(args[0])
+        except ValueError:
+            self.monitor.write(f"Invalid job ID: {args[0]}\n")
+            return None
+        job = self.system_manager.jobs.get(job_id)
+        if job is None:
+            self.monitor.write(f"No job with ID {job_id}\n")
+        return job
+        
+    def cmd_jobs(self, args):
+        """List background jobs"""
+        jobs = self.system_manager.jobs.list()
+        if not jobs:
+            self.monitor.write("No jobs\n")
+            return
+        self.monitor.write("=== Jobs ===\n")
+        for job in jobs:
+            self.monitor.write(job.describe() + "\n")
+            
+    def cmd_job(self, args):
+        """Show details of a background job"""
+        job = self._parse_job_id(args, "job <id>")
+        if job is None:
+            return
+            
+        self.monitor.write(job.describe() + "\n")
+        partial = job.partial
+        if job.status == Job.DONE:
+            self._report_job_result(job)
+        elif job.name == 'scan' and partial is not None:
+            summary = partial.summary
+            self.monitor.write(f"  Acquired: {summary.count}/{partial.total_points} points\n")
+            self.monitor.write(f"  Peak so far: {summary.max_intensity:.2f} at {summary.max_wavelength}nm\n")
+        elif job.name == 'batch' and partial:
+            self.monitor.write(f"  Processed: {len(partial)} samples, last '{partial[-1]['name']}'\n")
+        elif job.name == 'kinetic' and partial is not None and len(partial):
+            last = partial[-1]
+            self.monitor.write(f"  Acquired: {len(partial)} points\n")
+            self.monitor.write(f"  Last: {last['intensity']:.2f} at {last['time']:.3f}s\n")
+        if job.error is not None:
+            self.monitor.write(f"  Error: {job.error}\n")
+            
+    def cmd_cancel(self, args):
+        """Cancel a background job"""
+        job = self._parse_job_id(args, "cancel <id>")
+        if job is None:
+            return
+        if job.cancel():
+            self.monitor.write(f"Cancelling job {job.id}...\n")
+        else:
+            self.monitor.write(f"Job {job.id} already {job.status}\n")
+            
+    def cmd_wait(self, args):
+        """Wait for a background job to finish"""
+        job = self._parse_job_id(args, "wait <id> [seconds]")
+        if job is None:
+            return
+        try:
+            timeout = float(args[1]) if len(args) > 1 else None
+        except ValueError:
+            self.monitor.write(f"Invalid timeout: {args[1]}\n")
+            return
+            
+        if not job.wait(timeout):
+            self.monitor.write(f"Job {job.id} still {job.status} ({job.progress * 100:.1f}%)\n")
+            
+    async def acmd_wait(self, args):
+        """Wait for a background job to finish, keeping the event loop running"""
+        job = self._parse_job_id(args, "wait <id> [seconds]")
+        if job is None:
+            return
+        try:
+            timeout = float(args[1]) if len(args) > 1 else None
+        except ValueError:
+            self.monitor.write(f"Invalid timeout: {args[1]}\n")
+            return
+            
+        if not await self._wait_job(job, timeout):
+            self.monitor.write(f"Job {job.id} still {job.status} ({job.progress * 100:.1f}%)\n")
+            
+    async def _wait_job(self, job, timeout=None):
+        """Poll until a job has finished, returns False on timeout"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not job.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self.JOB_POLL_INTERVAL)
+        return True
+            
+    def cmd_history(self, args):
+        """List scans in the persistent scan store"""
+        store = self.spectral_engine.scan_store
+        if store is None:
+            self.monitor.write("No scan store attached\n")
+            return
+            
+        sample_name = args[0] if args and args[0] != '*' else None
+        since = None
+        if len(args) >= 2:
+            try:
+                # Scans are stamped with instrument time, which runs fast in accelerated modes
+                since = self.spectral_engine.clock.time() - float(args[1]) * 86400
+            except ValueError:
+                self.monitor.write(f"Invalid number of days: {args[1]}\n")
+                return
+                
+        scan_ids = store.query(sample_name=sample_name, since=since)
+        self.monitor.write(f"{len(scan_ids)} stored scans match\n")
+        for scan_id in scan_ids[-self.HISTORY_ROWS:]:
+            scan = store.describe(scan_id)
+            self.monitor.write(
+                f"  [{scan_id}] {scan['timestamp'][:19]}  {scan['sample_name'] or '-':<12} "
+                f"{scan['start_wavelength']}-{scan['end_wavelength']}nm ({scan['num_points']} points)\n"
+            )
+        if len(scan_ids) > self.HISTORY_ROWS:
+            self.monitor.write(f"  ... showing the latest {self.HISTORY_ROWS}\n")
+            
+    def cmd_archive(self, args):
+        """Export, open and browse memory-mapped scan archives"""
+        usage = "Usage: archive export <file> | open <file> | list [name] | show <id>\n"
+        if not args:
+            self.monitor.write(usage)
+            return
+            
+        subcommand = args[0].lower()
+        engine = self.spectral_engine
+        try:
+            if subcommand in ('export', 'open'):
+                if len(args) < 2:
+                    self.monitor.write(usage)
+                    return
+                filename = args[1]
+                if '.' not in os.path.basename(filename):
+                    filename += '.spec'
+                if subcommand == 'export':
+                    count = engine.export_archive(filename)
+                    self.monitor.write(f"Archived {count} scans to {filename}\n")
+                else:
+                    archive = engine.open_archive(filename)
+                    self.monitor.write(f"Opened {filename}: {len(archive)} scans\n")
+                return
+                
+            archive = engine.archive
+            if archive is None:
+                self.monitor.write("No archive open\n")
+                return
+                
+            if subcommand == 'list':
+                sample_name = args[1] if len(args) > 1 else None
+                scan_ids = archive.query(sample_name=sample_name)
+                self.monitor.write(f"{len(scan_ids)} archived scans match\n")
+                for scan_id in scan_ids[-self.HISTORY_ROWS:]:
+                    scan = archive.describe(scan_id)
+                    self.monitor.write(
+                        f"  [{scan_id}] {scan['timestamp'][:19]}  {scan['sample_name'] or '-':<12} "
+                        f"{scan['start_wavelength']}-{scan['end_wavelength']}nm ({scan['num_points']} points)\n"
+                    )
+                if len(scan_ids) > self.HISTORY_ROWS:
+                    self.monitor.write(f"  ... showing the latest {self.HISTORY_ROWS}\n")
+            elif subcommand == 'show':
+                if len(args) < 2:
+                    self.monitor.write(usage)
+                    return
+                scan = archive.get(int(args[1]))
+                summary = scan.summary
+                self.monitor.write(f"Scan {scan.scan_id}: {scan.start_wavelength}-{scan.end_wavelength}nm, "
+                                   f"{len(scan)} points, sample {scan.sample_name or '-'}\n")
+                self.monitor.write(f"  Peak: {summary.max_intensity:.2f} at {summary.max_wavelength}nm\n")
+                self.monitor.write(f"  Min: {summary.min_intensity:.2f} at {summary.min_wavelength}nm\n")
+            else:
+                self.monitor.write(usage)
+        except Exception as e:
+            self.monitor.write(f"Archive {subcommand} failed: {e}\n")
+            
+    def cmd_autosave(self, args):
+        """Show or control the incremental session autosave"""
+        journal = self.system_manager.components.get('journal')
+        if journal is None:
+            self.monitor.write("Autosave is not enabled\n")
+            return
+            
+        if args:
+            try:
+                if args[0].lower() == 'now':
+                    journal.sync()
+                    self.monitor.write("Changes queued for autosave\n")
+                else:
+                    journal.interval = float(args[0])
+                    self.monitor.write(f"Autosave interval set to {journal.interval}s\n")
+            except Exception as e:
+                self.monitor.write(f"Autosave failed: {e}\n")
+            return
+            
+        self.monitor.write(f"Autosave journal: {journal.path}\n")
+        self.monitor.write(f"  Interval: {journal.interval}s\n")
+        self.monitor.write(f"  Records: {journal.records} ({journal.bytes_written / 1024:.1f} KB on disk)\n")
+        if journal.last_sync is not None:
+            self.monitor.write(f"  Last autosave: {self.spectral_engine.clock.time() - journal.last_sync:.1f}s ago\n")
+        if journal.error is not None:
+            self.monitor.write(f"  Last error: {journal.error}\n")
+            
+    def cmd_refcache(self, args):
+        """Show or control the cache of blank (reference) scans"""
+        engine = self.spectral_engine
+        cache = engine.reference_cache
+        
+        if args:
+            try:
+                option = args[0].lower()
+                if option == 'clear':
+                    cache.clear()
+                    self.monitor.write("Reference cache cleared\n")
+                elif option == 'off':
+                    engine.configure_reference_cache(None)
+                    self.monitor.write("Cached blanks stay valid until the lamp or calibration changes\n")
+                else:
+                    engine.configure_reference_cache(float(args[0]))
+                    self.monitor.write(f"Cached blanks valid for {cache.max_age}s\n")
+            except Exception as e:
+                self.monitor.write(f"Reference cache failed: {e}\n")
+            return
+            
+        max_age = 'until lamp/calibration change' if cache.max_age is None else f"{cache.max_age}s"
+        self.monitor.write(f"Reference cache: {len(cache)} cached blank(s), valid {max_age}\n")
+        self.monitor.write(f"  Hits: {cache.hits}, misses: {cache.misses}\n")
+        now = engine.clock.time()
+        for entry in sorted(cache.entries.values(), key=lambda entry: entry.created):
+            reference = entry.reference
+            self.monitor.write(
+                f"  {reference.start_wavelength}-{reference.end_wavelength}nm, "
+                f"lamp session {entry.lamp_session}, {now - entry.created:.0f}s old\n"
+            )
+            
     def cmd_save(self, args):
         """Save spectrum data"""
         if not args:
-            self.monitor.write("Usage: save <filename>\n")
+            self.monitor.write("Usage: save <filename> [compress]\n")
             return
             
+        # Binary unless the name ends in .json
         filename = args[0]
-        if not filename.endswith('.json'):
-            filename += '.json'
+        if '.' not in os.path.basename(filename):
+            filename += '.spec'
+        compress = len(args) > 1 and args[1].lower() in ('compress', 'z', '-z')
             
         self.monitor.write(f"Saving data to {filename}...\n")
         
         try:
-            if self.spectral_engine.save_data(filename):
+            if self.spectral_engine.save_data(filename, compress=compress):
                 self.monitor.write(f"Data saved successfully to {filename}\n")
         except Exception as e:
             self.monitor.write(f"Save failed: {e}\n")
             
     def cmd_load(self, args):
-        """Load data from file"""
+        """Load data from file, optionally only some sections"""
         if not args:
-            self.monitor.write("Usage: load <filename>\n")
+            self.monitor.write("Usage: load <filename> [section ...]\n")
             return
             
         filename = args[0]
-        self.monitor.write(f"Loading data from {filename}...\n")
+        sections = args[1:] or None
+        self.monitor.write(f"Loading {', '.join(sections) if sections else 'data'} from {filename}...\n")
         
         try:
-            if self.spectral_engine.load_data(filename):
+            if self._change_instrument(lambda: self.spectral_engine.load_data(filename, sections)):
                 self.monitor.write(f"Data loaded successfully from {filename}\n")
         except Exception as e:
             self.monitor.write(f"Load failed: {e}\n")
             
+    def cmd_sessions(self, args):
+        """List saved data files in a directory with their metadata"""
+        directory = args[0] if args else '.'
+        try:
+            names = sorted(
+                name for name in os.listdir(directory)
+                if name.lower().endswith(('.spec', '.json'))
+            )
+        except OSError as e:
+            self.monitor.write(f"Cannot list {directory}: {e}\n")
+            return
+            
+        self.monitor.write(f"{len(names)} saved data files in {directory}\n")
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                with SessionReader(path) as reader:
+                    metadata = reader.metadata()
+            except Exception as e:
+                self.monitor.write(f"  {name:<24} unreadable: {e}\n")
+                continue
+            self.monitor.write(
+                f"  {name:<24} {metadata.get('timestamp', '?')[:19]}  "
+                f"{metadata.get('current_wavelength', '?')}nm  "
+                f"{'calibrated' if metadata.get('is_calibrated') else 'uncalibrated'}\n"
+            )
+            
     def cmd_exit(self, args):
         """Exit the application"""
         self.monitor.write("Shutting down system...\n")
@@ -0,0 +1,78 @@
+import math
+
+class DeadlineScheduler:
+    """Drives periodic acquisition from absolute deadlines on the instrument clock
+
+    Tick k is due at start + k * interval, so the cost of each measurement never
+    accumulates into drift. Lateness of every tick is recorded, and ticks that
+    are already more than one interval late are skipped rather than bunched up.
+    """
+
+    def __init__(self, clock, interval, start=None):
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        self.clock = clock
+        self.interval = interval
+        self.start = start if start is not None else clock.monotonic()
+        self.next_tick = 0
+
+        # Lateness statistics (seconds)
+        self.ticks = 0
+        self.skipped = 0
+        self.total_lateness = 0.0
+        self.total_lateness_sq = 0.0
+        self.max_lateness = 0.0
+
+    def next_deadline(self):
+        """Deadline of the next tick, relative to start"""
+        return self.next_tick * self.interval
+
+    def wait(self):
+        """Wait for the next tick, returns (scheduled_time, actual_time) relative to start"""
+        deadline = self.next_due()
+        self.clock.sleep_until(deadline)
+        return self.record(deadline)
+
+    def next_due(self):
+        """Absolute deadline of the next tick, skipping ticks that were missed
+
+        Callers that wait by other means (e.g. on an event loop) wait until
+        this deadline and then call record(deadline), like wait() does.
+        """
+        deadline = self.start + self.next_tick * self.interval
+        now = self.clock.monotonic()
+
+        # More than an interval late: skip the missed ticks and take the most
+        # recent deadline that has passed, measuring at once (under an interval late)
+        if now - deadline > self.interval:
+            missed = math.floor((now - deadline) / self.interval)
+            self.skipped += missed
+            self.next_tick += missed
+            deadline = self.start + self.next_tick * self.interval
+        return deadline
+
+    def record(self, deadline):
+        """Record a tick that was due at `deadline`, returns (scheduled_time, actual_time) relative to start"""
+        actual = self.clock.monotonic()
+
+        lateness = actual - deadline
+        self.ticks += 1
+        self.total_lateness += lateness
+        self.total_lateness_sq += lateness * lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+
+        self.next_tick += 1
+        return deadline - self.start, actual - self.start
+
+    def stats(self):
+        """Timing statistics of the ticks so far"""
+        mean = self.total_lateness / self.ticks if self.ticks else 0.0
+        variance = self.total_lateness_sq / self.ticks - mean * mean if self.ticks else 0.0
+        return {
+            'interval': self.interval,
+            'ticks': self.ticks,
+            'skipped': self.skipped,
+            'mean_lateness': mean,
+            'max_lateness': self.max_lateness,
+            'jitter': math.sqrt(max(variance, 0.0))
+        }
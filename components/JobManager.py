@@ -0,0 +1,247 @@
+import itertools
+import queue
+import threading
+import time
+
+
+class JobCancelled(Exception):
+    """Raised at a job checkpoint once the job has been cancelled"""
+
+
+class Job:
+    """A long-running operation executed by the JobManager worker
+
+    The job function is called as function(job, *args, **kwargs) and should call
+    job.checkpoint(progress, partial) at safe points, e.g. after every scan
+    chunk. Progress is a fraction between 0 and 1; `partial` is whatever result
+    has been acquired so far. Cancellation takes effect at the next checkpoint,
+    and queued jobs of higher priority preempt this one there.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    PAUSED = 'paused'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, job_id, name, function, args=(), kwargs=None, on_done=None,
+                 priority=10, manager=None):
+        self.id = job_id
+        self.name = name
+        self.priority = priority  # Lower runs first
+        self.manager = manager
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.on_done = on_done  # Called with the job once it has finished
+
+        self.status = Job.QUEUED
+        self.progress = 0.0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self):
+        """True once cancellation has been requested"""
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def cancel(self):
+        """Request cancellation, returns False if the job has already finished"""
+        if self.done:
+            return False
+        self._cancel.set()
+        return True
+
+    def checkpoint(self, progress=None, partial=None):
+        """Report progress at a safe point, raises JobCancelled if cancelled"""
+        if progress is not None:
+            self.progress = progress
+        if partial is not None:
+            self.partial = partial
+        if self.manager is not None:
+            self.manager._preempt(self)
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} cancelled")
+
+    def wait(self, timeout=None):
+        """Block until the job has finished, returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def run(self):
+        """Execute the job function, called on the worker thread"""
+        if self._cancel.is_set():
+            self._finish(Job.CANCELLED)
+            return
+
+        self.status = Job.RUNNING
+        self.started = time.time()
+        try:
+            self.result = self.function(self, *self.args, **self.kwargs)
+            self.progress = 1.0
+            self._finish(Job.DONE)
+        except JobCancelled:
+            self._finish(Job.CANCELLED)
+        except Exception as e:
+            self.error = e
+            self._finish(Job.FAILED)
+
+    def _finish(self, status):
+        self.status = status
+        self.finished = time.time()
+        self._done.set()
+        if self.on_done is not None:
+            self.on_done(self)
+
+    @property
+    def elapsed(self):
+        """Seconds the job has been running (or ran)"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def describe(self):
+        """One-line description for job listings"""
+        line = f"[{self.id}] {self.name:<10} {self.status:<9} {self.progress * 100:5.1f}%  {self.elapsed:.1f}s"
+        if self.error is not None:
+            line += f"  ({self.error})"
+        return line
+
+
+class JobManager:
+    """Priority queue of background jobs executed on a worker thread
+
+    Jobs share the instrument, so one runs at a time, lowest priority value
+    first. A queued job with a higher priority than the running one preempts it
+    at its next checkpoint (e.g. a point boundary of a scan): the running job is
+    paused, the instrument state is saved, the preempting job runs to completion
+    and the state is restored before the paused job resumes. Finished jobs are
+    kept for inspection, up to MAX_FINISHED of them.
+
+    instrument_lock is the single ownership lock of the instrument: the worker
+    holds it while a job runs, and anything else driving the instrument (e.g.
+    a foreground command on the event loop) must hold it too, so queued jobs
+    wait until it is released.
+    """
+
+    PRIORITY_HIGH = 0      # Interactive commands (measure, autozero)
+    PRIORITY_NORMAL = 10   # Background acquisitions
+    PRIORITY_LOW = 20
+
+    MAX_FINISHED = 100
+
+    def __init__(self, log=print, instrument=None):
+        self.log = log
+        # Object with save_state()/restore_state(state), kept across preemptions
+        self.instrument = instrument
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.current = None  # Job being executed
+        self.instrument_lock = threading.Lock()
+        self._queue = queue.PriorityQueue()
+        self._ids = itertools.count(1)
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread"""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._worker_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=2):
+        """Cancel outstanding jobs and stop the worker thread"""
+        self.running = False
+        with self.lock:
+            for job in self.jobs.values():
+                job.cancel()
+        self._queue.put((float('inf'), next(self._ids), None))
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def submit(self, name, function, *args, priority=PRIORITY_NORMAL, on_done=None, **kwargs):
+        """Queue function(job, *args, **kwargs) as a job, returns the Job"""
+        job = Job(next(self._ids), name, function, args, kwargs, on_done, priority, self)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune()
+        # Job IDs increase, so jobs of equal priority run in submission order
+        self._queue.put((priority, job.id, job))
+        self.log(f"Jobs: Job {job.id} '{name}' queued")
+        return job
+
+    def get(self, job_id):
+        """Job by ID, or None"""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        """All known jobs, oldest first"""
+        with self.lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        """Request cancellation of a job, returns False if unknown or finished"""
+        job = self.get(job_id)
+        return job is not None and job.cancel()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.MAX_FINISHED)]:
+            del self.jobs[job_id]
+
+    def on_worker_thread(self):
+        """True when called from a running job, which already owns the instrument"""
+        return threading.current_thread() is self._thread
+
+    def _preempt(self, job):
+        """Run queued jobs with a higher priority than `job` (at one of its checkpoints)"""
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry[2] is None or entry[0] >= job.priority:
+                self._queue.put(entry)
+                return
+
+            other = entry[2]
+            state = self.instrument.save_state() if self.instrument is not None else None
+            job.status = Job.PAUSED
+            self.log(f"Jobs: Job {job.id} '{job.name}' paused for job {other.id} '{other.name}'")
+            try:
+                self.current = other
+                other.run()
+                self.log(f"Jobs: Job {other.id} '{other.name}' {other.status}")
+            finally:
+                if state is not None:
+                    self.instrument.restore_state(state)
+                self.current = job
+                job.status = Job.RUNNING
+                self.log(f"Jobs: Job {job.id} '{job.name}' resumed")
+
+    def _worker_loop(self):
+        while self.running:
+            job = self._queue.get()[2]
+            if job is None:
+                continue
+            with self.instrument_lock:
+                self.current = job
+                job.run()
+                self.current = None
+            self.log(f"Jobs: Job {job.id} '{job.name}' {job.status}")
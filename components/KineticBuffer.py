@@ -0,0 +1,175 @@
+import os
+import numpy as np
+
+
+def _claim_spill_file(path):
+    """Create an empty spill file at `path`, or at <name>-<n><ext> if that exists"""
+    base, ext = os.path.splitext(path)
+    candidate = path
+    n = 0
+    while True:
+        try:
+            with open(candidate, 'xb'):
+                return candidate
+        except FileExistsError:
+            n += 1
+            candidate = f"{base}-{n}{ext}"
+
+
+class KineticBuffer:
+    """Bounded, preallocated ring buffer for kinetic (time-course) points
+
+    Every point is written twice, at slot i and i + capacity, so any window of up
+    to `capacity` latest points is one contiguous slice and is returned as a
+    zero-copy view. Memory use is fixed by `capacity`. With `spill_path` set,
+    points are appended to that file in blocks before they are overwritten, so
+    the full history can be read back with read_spilled()/history(). An existing
+    file is never overwritten: the buffer claims the first free name of the form
+    <name>-<n><ext> instead, and spill_path is set to the file actually used.
+    """
+
+    COLUMNS = ('time', 'scheduled_time', 'wavelength', 'intensity', 'absorbance')
+
+    def __init__(self, capacity=65536, spill_path=None, spill_block=4096):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity = capacity
+        self.spill_path = _claim_spill_file(spill_path) if spill_path is not None else None
+        self.spill_block = max(1, min(spill_block, capacity))
+        self._data = np.full((len(self.COLUMNS), 2 * capacity), np.nan)
+        self.total = 0      # points appended since creation
+        self.spilled = 0    # oldest points already written to the spill file
+
+    @classmethod
+    def from_records(cls, records, capacity=65536, spill_path=None):
+        """Build a buffer from a list of point dicts (e.g. loaded from JSON)"""
+        buffer = cls(max(capacity, len(records)), spill_path)
+        for record in records:
+            buffer.append(
+                record['time'], record['wavelength'], record['intensity'],
+                record.get('absorbance'), record.get('scheduled_time')
+            )
+        return buffer
+
+    @classmethod
+    def from_columns(cls, columns, capacity=65536, spill_path=None):
+        """Build a buffer from a (columns x n) array such as window() output"""
+        columns = np.asarray(columns, dtype=np.float64)
+        count = columns.shape[1]
+        buffer = cls(max(capacity, count), spill_path)
+        buffer._data[:, :count] = columns
+        buffer._data[:, buffer.capacity:buffer.capacity + count] = columns
+        buffer.total = count
+        return buffer
+
+    # Writing
+
+    def append(self, time, wavelength, intensity, absorbance=None, scheduled_time=None):
+        """Append one point, evicting (and spilling) the oldest if full"""
+        if self.spill_path is not None and self.total - self.spilled >= self.capacity:
+            self._spill(min(self.spill_block, self.total - self.spilled))
+
+        slot = self.total % self.capacity
+        row = (
+            time,
+            time if scheduled_time is None else scheduled_time,
+            wavelength,
+            intensity,
+            np.nan if absorbance is None else absorbance
+        )
+        self._data[:, slot] = row
+        self._data[:, slot + self.capacity] = row
+        self.total += 1
+
+    def _spill(self, count):
+        """Append the oldest `count` unspilled points to the spill file"""
+        start = self.spilled % self.capacity
+        rows = self._data[:, start:start + count].T
+        with open(self.spill_path, 'ab') as f:
+            np.ascontiguousarray(rows, dtype='<f8').tofile(f)
+        self.spilled += count
+
+    def flush(self):
+        """Spill every point still only held in memory"""
+        if self.spill_path is not None:
+            pending = self.total - self.spilled
+            while pending:
+                count = min(self.spill_block, pending)
+                self._spill(count)
+                pending -= count
+
+    # Reading
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def window(self, n=None):
+        """Zero-copy (columns x n) view of the latest n points held in memory"""
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        start = (self.total - n) % self.capacity
+        return self._data[:, start:start + n]
+
+    def since(self, index):
+        """Copy of the points appended from `index` on (columns x n) and the new total
+
+        Safe while another thread appends: the total is read once, points
+        before it are complete. Points already evicted from memory are skipped.
+        """
+        total = self.total
+        start = max(index, total - self.capacity)
+        begin = start % self.capacity
+        return self._data[:, begin:begin + total - start].copy(), total
+
+    def column(self, name, n=None):
+        """Zero-copy view of one column over the latest n points"""
+        return self.window(n)[self.COLUMNS.index(name)]
+
+    @property
+    def times(self):
+        return self.column('time')
+
+    @property
+    def intensities(self):
+        return self.column('intensity')
+
+    def point(self, index):
+        """Point dict for an index into the in-memory window"""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("kinetic point index out of range")
+        slot = (self.total - size + index) % self.capacity
+        values = self._data[:, slot].tolist()
+        point = dict(zip(self.COLUMNS, values))
+        if np.isnan(point['absorbance']):
+            point['absorbance'] = None
+        return point
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.point(i) for i in range(*index.indices(len(self)))]
+        return self.point(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.point(i)
+
+    def to_list(self):
+        """In-memory points as a list of dicts"""
+        return list(self)
+
+    def read_spilled(self):
+        """Points written to the spill file as a (n x columns) array"""
+        if self.spill_path is None or not os.path.exists(self.spill_path):
+            return np.empty((0, len(self.COLUMNS)))
+        return np.fromfile(self.spill_path, dtype='<f8').reshape(-1, len(self.COLUMNS))
+
+    def history(self):
+        """Every point ever appended, as (columns x n), if nothing was lost to eviction"""
+        lost = self.total - len(self)
+        if self.spill_path is None and lost:
+            raise RuntimeError(f"{lost} points were evicted without spill-to-disk")
+        spilled = self.read_spilled().T
+        return np.concatenate((spilled, self.window(self.total - self.spilled)), axis=1)
@@ -0,0 +1,218 @@
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+# Write-ahead log of raw measurements
+#
+#   header  MAGIC, then FILE_FORMAT (version)
+#   frames  FRAME_FORMAT (kind, columns, reserved, run ID, payload length,
+#           CRC32 of the payload), then the payload
+#
+# Frame kinds:
+#   BEGIN   a run (scan or kinetic) started, payload is its JSON metadata
+#   POINTS  rows of float64 values, `columns` per row, of a run (run ID 0 for
+#           single measurements); see the *_COLUMNS tuples for their meaning
+#   END     a run finished, payload is JSON with the number of points
+#
+# Frames are buffered and committed (written and fsynced) as a group. Replay
+# stops at the first frame that is cut short or fails its CRC.
+
+MAGIC = b'SPECWAL\x00'
+FILE_FORMAT = '<H'
+VERSION = 1
+FRAME_FORMAT = '<BBHIII'
+FRAME_SIZE = struct.calcsize(FRAME_FORMAT)
+
+BEGIN = 1
+POINTS = 2
+END = 3
+
+SINGLE_COLUMNS = ('time', 'wavelength', 'calibrated_wavelength', 'intensity')
+SCAN_COLUMNS = ('wavelength', 'calibrated_wavelength', 'intensity', 'time_offset')
+# Kinetic rows use KineticBuffer.COLUMNS
+
+
+def is_measurement_log(path):
+    """True if the file starts with the measurement log magic"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class MeasurementLog:
+    """Write-ahead log every measurement of a SpectralEngine is streamed into
+
+    Logging only encodes a frame into an in-memory buffer. A committer thread
+    writes and fsyncs the buffer once `commit_bytes` are pending or the oldest
+    pending frame is `commit_interval` seconds old, so a crash loses at most
+    about that much data while fsyncs stay rare. Opening an existing log drops
+    a torn last frame and appends after it; recover() reads runs back.
+    """
+
+    def __init__(self, path, commit_bytes=65536, commit_interval=1.0, log=print):
+        self.path = path
+        self.commit_bytes = commit_bytes
+        self.commit_interval = commit_interval
+        self.log = log
+        self.commits = 0
+        self.bytes_committed = 0
+        self.error = None
+
+        self._buffer = bytearray()
+        self._pending_since = None  # time.monotonic() of the oldest uncommitted frame
+        self._condition = threading.Condition()
+        self._closing = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._next_run = 1
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # Keep the intact frames of an interrupted session, continue after them
+            length = len(MAGIC) + struct.calcsize(FILE_FORMAT)
+            for run_id, _, _, _, end in self._frames(path):
+                self._next_run = max(self._next_run, run_id + 1)
+                length = end
+            self._file = open(path, 'r+b')
+            self._file.truncate(length)
+            self._file.seek(length)
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(MAGIC + struct.pack(FILE_FORMAT, VERSION))
+
+        self._thread = threading.Thread(target=self._commit_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    # Logging
+
+    def begin_run(self, run_type, **metadata):
+        """Log the start of a scan or kinetic run, returns its run ID"""
+        with self._condition:
+            run_id = self._next_run
+            self._next_run += 1
+        metadata['type'] = run_type
+        self._append(BEGIN, 0, run_id, json.dumps(metadata).encode('utf-8'))
+        return run_id
+
+    def points(self, run_id, *columns):
+        """Log a block of points given as equal-length columns"""
+        rows = np.column_stack(columns).astype('<f8', copy=False)
+        self._append(POINTS, rows.shape[1], run_id, rows.tobytes())
+
+    def point(self, run_id, *values):
+        """Log one point of a run, cheaper than points() for a single row"""
+        self._append(POINTS, len(values), run_id, struct.pack(f'<{len(values)}d', *values))
+
+    def single(self, point_time, wavelength, calibrated_wavelength, intensity):
+        """Log a single measurement (see SINGLE_COLUMNS)"""
+        self.point(0, point_time, wavelength, calibrated_wavelength, intensity)
+
+    def end_run(self, run_id, points):
+        """Log the end of a run with the number of points it acquired"""
+        self._append(END, 0, run_id, json.dumps({'points': points}).encode('utf-8'))
+
+    def _append(self, kind, columns, run_id, payload):
+        frame = struct.pack(FRAME_FORMAT, kind, columns, 0, run_id, len(payload), zlib.crc32(payload))
+        with self._condition:
+            first = self._pending_since is None
+            if first:
+                self._pending_since = time.monotonic()
+            self._buffer += frame
+            self._buffer += payload
+            # Wake the committer to start the interval, or to commit a full group
+            if first or len(self._buffer) >= self.commit_bytes:
+                self._condition.notify()
+
+    # Committing
+
+    def _commit_loop(self):
+        while True:
+            with self._condition:
+                while not self._closing:
+                    if len(self._buffer) >= self.commit_bytes:
+                        break
+                    if self._pending_since is not None:
+                        remaining = self._pending_since + self.commit_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                closing = self._closing
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                self._pending_since = None
+
+            if data:
+                try:
+                    self._file.write(data)
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self.commits += 1
+                    self.bytes_committed += len(data)
+                except Exception as e:
+                    self.error = e
+                    self.log(f"Measurement log: Commit failed: {e}")
+            if closing:
+                return
+
+    def close(self):
+        """Commit everything pending and close the file"""
+        with self._condition:
+            if self._closing:
+                return
+            self._closing = True
+            self._condition.notify()
+        self._thread.join()
+        self._file.close()
+
+    # Recovery
+
+    @staticmethod
+    def _frames(path):
+        """Yield (run_id, kind, columns, payload, end offset) of every intact frame"""
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a measurement log")
+            (version,) = struct.unpack(FILE_FORMAT, f.read(struct.calcsize(FILE_FORMAT)))
+            if version > VERSION:
+                raise ValueError(f"Unsupported measurement log version {version} (newest supported: {VERSION})")
+            while True:
+                header = f.read(FRAME_SIZE)
+                if len(header) < FRAME_SIZE:
+                    return
+                kind, columns, _, run_id, length, crc = struct.unpack(FRAME_FORMAT, header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                yield run_id, kind, columns, payload, f.tell()
+
+    @classmethod
+    def recover(cls, path):
+        """Runs in a log as a list of dicts, in start order
+
+        Each run has its BEGIN metadata ('type', ...), 'rows' (n x columns
+        float64 array) and 'complete' (False if the END frame was never
+        written, e.g. after a crash). Single measurements form run 0 of type
+        'single'.
+        """
+        runs = {0: {'run_id': 0, 'type': 'single', 'blocks': [], 'complete': True}}
+        for run_id, kind, columns, payload, _ in cls._frames(path):
+            if kind == BEGIN:
+                runs[run_id] = dict(json.loads(payload.decode('utf-8')), run_id=run_id, blocks=[], complete=False)
+            elif kind == POINTS and run_id in runs:
+                runs[run_id]['blocks'].append(np.frombuffer(payload, dtype='<f8').reshape(-1, columns))
+            elif kind == END and run_id in runs:
+                runs[run_id]['complete'] = True
+
+        result = []
+        for run in runs.values():
+            blocks = run.pop('blocks')
+            run['rows'] = np.concatenate(blocks) if blocks else np.empty((0, 0))
+            if run['run_id'] != 0 or len(run['rows']):
+                result.append(run)
+        return result
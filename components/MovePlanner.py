@@ -0,0 +1,38 @@
+class MovePlanner:
+    """Plans monochromator paths through a set of wavelengths
+
+    Travel time is modelled like SpectralEngine.set_wavelength: the distance in
+    nm divided by the monochromator speed. On a line, the shortest path through
+    a set of points from a given position is one sweep from the nearer end to
+    the farther end, so plans are sorted sweeps; repeated visits alternate
+    direction (bidirectional/serpentine) instead of flying back to the start.
+    """
+
+    def __init__(self, speed=10.0):
+        if speed <= 0:
+            raise ValueError("Speed must be positive")
+        self.speed = speed  # nm/sec
+
+    def move_time(self, from_wl, to_wl):
+        """Modelled time to move between two wavelengths"""
+        return abs(to_wl - from_wl) / self.speed
+
+    def path_time(self, path, current):
+        """Modelled travel time of a path starting at `current`"""
+        total = 0.0
+        for wavelength in path:
+            total += self.move_time(current, wavelength)
+            current = wavelength
+        return total
+
+    def plan(self, wavelengths, current, bidirectional=True):
+        """Order to visit `wavelengths` from `current`
+
+        With bidirectional sweeps the path starts at whichever end of the set is
+        closer. Otherwise every sweep runs upwards from the shortest wavelength.
+        """
+        path = sorted(set(wavelengths))
+        if bidirectional and path and abs(current - path[-1]) < abs(current - path[0]):
+            path.reverse()
+        return path
+
@@ -0,0 +1,67 @@
+class CachedReference:
+    """A blank (reference) scan kept by ReferenceCache"""
+    __slots__ = ('start_index', 'end_index', 'step', 'calibration_key', 'lamp_session',
+                 'reference', 'background', 'created')
+
+    def __init__(self, start_index, end_index, step, calibration_key, lamp_session,
+                 reference, background, created):
+        self.start_index = start_index
+        self.end_index = end_index
+        self.step = step
+        self.calibration_key = calibration_key  # wavelength and intensity coefficients
+        self.lamp_session = lamp_session        # lamp on-cycle the blank was measured in
+        self.reference = reference              # Spectrum of the blank
+        self.background = background            # dark reading taken with it
+        self.created = created                  # instrument clock time
+
+    @property
+    def key(self):
+        return (self.start_index, self.end_index, self.step, self.calibration_key, self.lamp_session)
+
+    def covers(self, start_index, end_index):
+        return self.start_index <= start_index and end_index <= self.end_index
+
+
+class ReferenceCache:
+    """Blank scans keyed by scan range, step, calibration and lamp session
+
+    A blank is valid for `max_age` seconds of instrument time (None: until the
+    calibration or lamp session changes). Lookups return the most recent valid
+    blank covering the requested grid range, so a full-range blank also serves
+    every narrower scan. Expired entries and those of an earlier calibration or
+    lamp session are dropped as they are found.
+    """
+
+    def __init__(self, max_age=1800.0):
+        self.max_age = max_age
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def put(self, entry):
+        self.entries[entry.key] = entry
+
+    def find(self, start_index, end_index, step, calibration_key, lamp_session, now):
+        """Newest valid entry covering start_index..end_index, or None"""
+        best = None
+        for key, entry in list(self.entries.items()):
+            # Blanks of an earlier lamp session or calibration never become valid again
+            if ((self.max_age is not None and now - entry.created > self.max_age)
+                    or entry.calibration_key != calibration_key or entry.lamp_session != lamp_session):
+                del self.entries[key]
+                continue
+            if entry.step == step and entry.covers(start_index, end_index):
+                if best is None or entry.created > best.created:
+                    best = entry
+
+        if best is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return best
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,50 @@
+import numpy as np
+
+class ResponseTable:
+    """Precomputed instrument response on the fixed wavelength grid
+
+    Holds, for every nominal grid wavelength, the calibrated wavelength and the
+    noise-free intensity (lamp/detector response, sample absorption and intensity
+    calibration applied). Tables are only valid for the calibration and sample
+    state they were built for, identified by `key`.
+    """
+    __slots__ = (
+        'key', 'min_wavelength', 'step', 'wavelengths',
+        'calibrated_wavelengths', 'responses', '_lists'
+    )
+
+    # Nominal wavelengths closer than this to a grid point use the table (nm)
+    TOLERANCE = 1e-6
+
+    def __init__(self, key, min_wavelength, step, wavelengths, calibrated_wavelengths, responses):
+        self.key = key
+        self.min_wavelength = min_wavelength
+        self.step = step
+        self.wavelengths = wavelengths
+        self.calibrated_wavelengths = calibrated_wavelengths
+        self.responses = responses
+        self._lists = None
+
+    def __len__(self):
+        return len(self.wavelengths)
+
+    def index(self, wavelength):
+        """Grid index of a nominal wavelength, or None if it is off the grid"""
+        i = round((wavelength - self.min_wavelength) / self.step)
+        if 0 <= i < len(self.wavelengths) and abs(self.wavelengths[i] - wavelength) < self.TOLERANCE:
+            return i
+        return None
+
+    def indices(self, wavelengths):
+        """Grid indices for an array of wavelengths, plus a mask of the ones on the grid"""
+        indices = np.rint((wavelengths - self.min_wavelength) / self.step).astype(np.int64)
+        np.clip(indices, 0, len(self.wavelengths) - 1, out=indices)
+        on_grid = np.abs(self.wavelengths[indices] - wavelengths) < self.TOLERANCE
+        return indices, on_grid
+
+    def lookup(self, index):
+        """(calibrated_wavelength, response) at a grid index as Python floats"""
+        if self._lists is None:
+            self._lists = (self.calibrated_wavelengths.tolist(), self.responses.tolist())
+        calibrated, responses = self._lists
+        return calibrated[index], responses[index]
@@ -0,0 +1,134 @@
+from datetime import datetime
+import numpy as np
+from components.ScanRecord import ScanRecord
+
+
+class ScanIndex:
+    """Queries over an index of stored scans, shared by ScanStore and SpectralArchive
+
+    Subclasses keep the index as a numpy structured array of INDEX_DTYPE records
+    in self._index (the first self._count are valid) and the interned sample
+    names and scan types in self.names. A scan's data is stored as its
+    wavelength, calibrated wavelength and intensity columns (little-endian
+    float64) followed by its time offsets (little-endian int64).
+    """
+
+    INDEX_DTYPE = np.dtype([
+        ('start_time', '<f8'),        # epoch seconds of the first point
+        ('timestamp', '<f8'),         # epoch seconds the scan was stored
+        ('start_wavelength', '<f8'),
+        ('end_wavelength', '<f8'),
+        ('step_size', '<f8'),
+        ('num_points', '<i8'),
+        ('offset', '<i8'),            # byte offset of the scan data
+        ('sample_name', '<i4'),       # position in names, -1 if unnamed
+        ('type', '<i4'),              # position in names
+        ('sample_present', '?')
+    ])
+
+    # Bytes of scan data per point: three float64 columns and an int64 time offset
+    POINT_BYTES = 32
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def index(self):
+        """Index records of all stored scans; the scan ID is the position"""
+        return self._index[:self._count]
+
+    def _name(self, name_id):
+        return self.names[name_id] if name_id >= 0 else None
+
+    @classmethod
+    def _index_entry(cls, record, offset, sample_name_id, type_id):
+        """One-element INDEX_DTYPE array describing a ScanRecord stored at `offset`"""
+        entry = np.zeros(1, dtype=cls.INDEX_DTYPE)
+        entry['start_time'] = record.start_time
+        entry['timestamp'] = datetime.fromisoformat(record.timestamp).timestamp()
+        entry['start_wavelength'] = record.start_wavelength
+        entry['end_wavelength'] = record.end_wavelength
+        entry['step_size'] = record.step_size
+        entry['num_points'] = len(record)
+        entry['offset'] = offset
+        entry['sample_name'] = sample_name_id
+        entry['type'] = type_id
+        entry['sample_present'] = record.sample_present
+        return entry
+
+    @staticmethod
+    def _data_chunks(record):
+        """Stored bytes of a scan's data columns"""
+        for column in (record.wavelengths, record.calibrated_wavelengths, record.intensities):
+            yield column.astype('<f8', copy=False).tobytes()
+        yield record.time_offsets.astype('<i8', copy=False).tobytes()
+
+    def _record(self, scan_id, floats, time_offsets):
+        """ScanRecord for a scan from its index entry and data columns (not copied)"""
+        entry = self._index[scan_id]
+        num_points = int(entry['num_points'])
+        record = ScanRecord(
+            float(entry['start_wavelength']), float(entry['end_wavelength']), float(entry['step_size']),
+            floats[:num_points], floats[num_points:2 * num_points], floats[2 * num_points:],
+            float(entry['start_time']), time_offsets,
+            sample_present=bool(entry['sample_present']),
+            timestamp=datetime.fromtimestamp(float(entry['timestamp'])).isoformat(),
+            scan_type=self.names[entry['type']],
+            sample_name=self._name(entry['sample_name'])
+        )
+        record.scan_id = scan_id
+        return record
+
+    # Queries
+
+    def query(self, sample_name=None, since=None, until=None, wavelength=None,
+              start_wl=None, end_wl=None, limit=None):
+        """IDs of scans matching every given condition, oldest first
+
+        since/until are epoch seconds or datetimes compared with the scan start
+        time. `wavelength` selects scans covering that wavelength; start_wl and
+        end_wl select scans overlapping that range. `limit` keeps the newest.
+        """
+        index = self.index
+        mask = np.ones(len(index), dtype=bool)
+
+        if sample_name is not None:
+            name_id = self._name_ids.get(sample_name)
+            if name_id is None:
+                return []
+            mask &= index['sample_name'] == name_id
+        if since is not None:
+            mask &= index['start_time'] >= self._epoch(since)
+        if until is not None:
+            mask &= index['start_time'] < self._epoch(until)
+        if wavelength is not None:
+            mask &= (index['start_wavelength'] <= wavelength) & (index['end_wavelength'] >= wavelength)
+        if start_wl is not None:
+            mask &= index['end_wavelength'] >= start_wl
+        if end_wl is not None:
+            mask &= index['start_wavelength'] <= end_wl
+
+        scan_ids = np.flatnonzero(mask)
+        if limit is not None:
+            scan_ids = scan_ids[-limit:] if limit > 0 else scan_ids[:0]
+        return scan_ids.tolist()
+
+    @staticmethod
+    def _epoch(value):
+        return value.timestamp() if isinstance(value, datetime) else float(value)
+
+    def describe(self, scan_id):
+        """Index entry of a scan as a dict, without reading its data"""
+        entry = self.index[scan_id]
+        return {
+            'scan_id': scan_id,
+            'sample_name': self._name(entry['sample_name']),
+            'type': self.names[entry['type']],
+            'start_time': float(entry['start_time']),
+            'timestamp': datetime.fromtimestamp(float(entry['timestamp'])).isoformat(),
+            'start_wavelength': float(entry['start_wavelength']),
+            'end_wavelength': float(entry['end_wavelength']),
+            'step_size': float(entry['step_size']),
+            'num_points': int(entry['num_points']),
+            'sample_present': bool(entry['sample_present'])
+        }
@@ -0,0 +1,266 @@
+import numpy as np
+from datetime import datetime
+
+
+class ScanPoints:
+    """Read-only sequence view presenting a ScanRecord as a list of point dicts"""
+    __slots__ = ('record',)
+
+    def __init__(self, record):
+        self.record = record
+
+    def __len__(self):
+        return len(self.record)
+
+    def __iter__(self):
+        for i in range(len(self.record)):
+            yield self.record.point(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record.point(i) for i in range(*index.indices(len(self.record)))]
+        if index < 0:
+            index += len(self.record)
+        if not 0 <= index < len(self.record):
+            raise IndexError("scan point index out of range")
+        return self.record.point(index)
+
+
+class ScanSummary:
+    """Running min/max/peak statistics over a scan, updated chunk by chunk"""
+    __slots__ = (
+        'count', 'total_intensity',
+        'min_intensity', 'min_wavelength',
+        'max_intensity', 'max_wavelength'
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.total_intensity = 0.0
+        self.min_intensity = None
+        self.min_wavelength = None
+        self.max_intensity = None
+        self.max_wavelength = None
+
+    def update(self, wavelengths, intensities):
+        """Fold a chunk of points into the running statistics"""
+        if len(intensities) == 0:
+            return
+        max_idx = int(np.argmax(intensities))
+        min_idx = int(np.argmin(intensities))
+
+        # Strict comparisons keep the first occurrence, like list.index(max(...))
+        if self.max_intensity is None or intensities[max_idx] > self.max_intensity:
+            self.max_intensity = float(intensities[max_idx])
+            self.max_wavelength = float(wavelengths[max_idx])
+        if self.min_intensity is None or intensities[min_idx] < self.min_intensity:
+            self.min_intensity = float(intensities[min_idx])
+            self.min_wavelength = float(wavelengths[min_idx])
+
+        self.count += len(intensities)
+        self.total_intensity += float(np.sum(intensities))
+
+    @property
+    def peak_intensity(self):
+        return self.max_intensity
+
+    @property
+    def peak_wavelength(self):
+        return self.max_wavelength
+
+    @property
+    def mean_intensity(self):
+        return self.total_intensity / self.count if self.count else None
+
+    @classmethod
+    def from_arrays(cls, wavelengths, intensities):
+        summary = cls()
+        summary.update(wavelengths, intensities)
+        return summary
+
+    def __repr__(self):
+        return (f"ScanSummary(count={self.count}, peak={self.max_intensity} at {self.max_wavelength}nm, "
+                f"min={self.min_intensity} at {self.min_wavelength}nm)")
+
+
+class ScanChunk:
+    """A block of scan points as yielded by SpectralEngine.scan_iter"""
+    __slots__ = (
+        'index', 'total_points', 'wavelengths', 'calibrated_wavelengths',
+        'intensities', 'start_time', 'time_offsets', 'summary'
+    )
+
+    def __init__(self, index, total_points, wavelengths, calibrated_wavelengths,
+                 intensities, start_time, time_offsets, summary):
+        self.index = index                  # position of the first point in the scan
+        self.total_points = total_points
+        self.wavelengths = wavelengths
+        self.calibrated_wavelengths = calibrated_wavelengths
+        self.intensities = intensities
+        self.start_time = start_time        # scan start time (epoch seconds)
+        self.time_offsets = time_offsets    # microseconds since start_time
+        self.summary = summary              # running ScanSummary for the scan so far
+
+    def __len__(self):
+        return len(self.wavelengths)
+
+    @property
+    def progress(self):
+        """Fraction of the scan completed once this chunk is acquired"""
+        return (self.index + len(self)) / self.total_points
+
+
+class ScanRecord:
+    """Compact columnar storage for a wavelength scan
+
+    Wavelengths, calibrated wavelengths and intensities are kept as contiguous
+    float64 arrays. Point times are stored as one start time (epoch seconds)
+    plus int64 microsecond offsets. Dict-style access (record['data'],
+    record['start_wavelength'], ...) is kept for code written against the
+    old list-of-dicts layout.
+    """
+    __slots__ = (
+        'type', 'start_wavelength', 'end_wavelength', 'step_size',
+        'wavelengths', 'calibrated_wavelengths', 'intensities',
+        'start_time', 'time_offsets', 'sample_present', 'timestamp', '_summary',
+        'sample_name', 'scan_id', 'sequence'
+    )
+
+    # Array columns, in storage order
+    COLUMNS = ('wavelengths', 'calibrated_wavelengths', 'intensities', 'time_offsets')
+
+    # Keys exposed through dict-style access besides 'data'
+    FIELDS = (
+        'type', 'start_wavelength', 'end_wavelength', 'step_size',
+        'timestamp', 'sample_present', 'sample_name'
+    )
+
+    def __init__(self, start_wavelength, end_wavelength, step_size,
+                 wavelengths, calibrated_wavelengths, intensities,
+                 start_time, time_offsets, sample_present=False,
+                 timestamp=None, scan_type='full_scan', summary=None, sample_name=None):
+        self.type = scan_type
+        self.start_wavelength = start_wavelength
+        self.end_wavelength = end_wavelength
+        self.step_size = step_size
+        self.wavelengths = np.ascontiguousarray(wavelengths, dtype=np.float64)
+        self.calibrated_wavelengths = np.ascontiguousarray(calibrated_wavelengths, dtype=np.float64)
+        self.intensities = np.ascontiguousarray(intensities, dtype=np.float64)
+        self.start_time = float(start_time)
+        self.time_offsets = np.ascontiguousarray(time_offsets, dtype=np.int64)
+        self.sample_present = sample_present
+        self.timestamp = timestamp if timestamp is not None else datetime.now().isoformat()
+        self._summary = summary
+        self.sample_name = sample_name
+        self.scan_id = None  # ID in a ScanStore once stored there
+        self.sequence = None  # SpectralEngine.scan_sequence number once in its history
+
+    def __len__(self):
+        return len(self.wavelengths)
+
+    def __repr__(self):
+        return (f"ScanRecord({self.start_wavelength}-{self.end_wavelength}nm, "
+                f"{len(self)} points, sample_present={self.sample_present})")
+
+    # Dict-style compatibility
+
+    def __getitem__(self, key):
+        if key == 'data':
+            return ScanPoints(self)
+        if key in self.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key == 'data' or key in self.FIELDS
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self.FIELDS) + ['data']
+
+    def point(self, index):
+        """Return a single point as a dict in the legacy format"""
+        point_time = self.start_time + self.time_offsets[index] / 1e6
+        return {
+            'wavelength': float(self.wavelengths[index]),
+            'calibrated_wavelength': float(self.calibrated_wavelengths[index]),
+            'intensity': float(self.intensities[index]),
+            'timestamp': datetime.fromtimestamp(point_time).isoformat(),
+            'sample_present': self.sample_present
+        }
+
+    @property
+    def summary(self):
+        """ScanSummary of the scan, computed on first access if not supplied"""
+        if self._summary is None:
+            self._summary = ScanSummary.from_arrays(self.wavelengths, self.intensities)
+        return self._summary
+
+    @property
+    def nbytes(self):
+        """Bytes used by the data columns"""
+        return (self.wavelengths.nbytes + self.calibrated_wavelengths.nbytes +
+                self.intensities.nbytes + self.time_offsets.nbytes)
+
+    # Serialization
+
+    def metadata(self):
+        """Scalar fields as a JSON-serializable dict, everything but the COLUMNS"""
+        return {
+            'type': self.type,
+            'start_wavelength': self.start_wavelength,
+            'end_wavelength': self.end_wavelength,
+            'step_size': self.step_size,
+            'timestamp': self.timestamp,
+            'sample_present': self.sample_present,
+            'sample_name': self.sample_name,
+            'start_time': self.start_time
+        }
+
+    def to_dict(self):
+        """Convert to a JSON-serializable columnar dict"""
+        data = self.metadata()
+        for name in self.COLUMNS:
+            data[name] = getattr(self, name).tolist()
+        return data
+
+    @classmethod
+    def from_columns(cls, metadata, columns):
+        """Build a ScanRecord from metadata() output and a mapping of COLUMNS arrays"""
+        return cls(
+            metadata['start_wavelength'], metadata['end_wavelength'], metadata['step_size'],
+            columns['wavelengths'], columns['calibrated_wavelengths'], columns['intensities'],
+            metadata['start_time'], columns['time_offsets'],
+            sample_present=metadata.get('sample_present', False),
+            timestamp=metadata.get('timestamp'),
+            scan_type=metadata.get('type', 'full_scan'),
+            sample_name=metadata.get('sample_name')
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a ScanRecord from to_dict() output or a legacy list-of-dicts scan"""
+        if 'wavelengths' in data:
+            return cls.from_columns(data, data)
+
+        # Legacy layout: one dict per point with its own ISO timestamp
+        points = data.get('data', [])
+        times = [datetime.fromisoformat(p['timestamp']).timestamp() for p in points]
+        start_time = times[0] if times else datetime.now().timestamp()
+        return cls(
+            data['start_wavelength'], data['end_wavelength'], data['step_size'],
+            [p['wavelength'] for p in points],
+            [p.get('calibrated_wavelength', p['wavelength']) for p in points],
+            [p['intensity'] for p in points],
+            start_time,
+            [round((t - start_time) * 1e6) for t in times],
+            sample_present=data.get('sample_present', False),
+            timestamp=data.get('timestamp'),
+            scan_type=data.get('type', 'full_scan'),
+            sample_name=data.get('sample_name')
+        )
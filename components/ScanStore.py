@@ -0,0 +1,131 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from components.ScanIndex import ScanIndex
+
+
+class ScanStore(ScanIndex):
+    """Append-only on-disk scan history with an in-memory index and LRU cache
+
+    A store is a directory with three append-only files:
+      scans.dat  - raw little-endian scan columns, one scan after another
+      index.dat  - one fixed-size INDEX_DTYPE record per scan
+      names.txt  - sample names and scan types, referenced by line number
+    The whole index is loaded as a numpy structured array, so queries over tens
+    of thousands of scans are vectorized comparisons. Only scan data that is
+    asked for is read, and at most `cache_size` ScanRecords are kept in memory.
+    """
+
+    def __init__(self, directory, cache_size=32):
+        if cache_size < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.directory = directory
+        self.cache_size = cache_size
+        self.data_path = os.path.join(directory, 'scans.dat')
+        self.index_path = os.path.join(directory, 'index.dat')
+        self.names_path = os.path.join(directory, 'names.txt')
+        self.lock = threading.Lock()
+        self._cache = OrderedDict()
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Read names and index, dropping a torn index record from an interrupted append"""
+        self.names = []
+        if os.path.exists(self.names_path):
+            with open(self.names_path, 'r', encoding='utf-8') as f:
+                self.names = [line.rstrip('\n') for line in f]
+        self._name_ids = {name: i for i, name in enumerate(self.names)}
+
+        self._index = np.empty(0, dtype=self.INDEX_DTYPE)
+        self._count = 0
+        if os.path.exists(self.index_path):
+            size = os.path.getsize(self.index_path)
+            count = size // self.INDEX_DTYPE.itemsize
+            if count * self.INDEX_DTYPE.itemsize != size:
+                with open(self.index_path, 'r+b') as f:
+                    f.truncate(count * self.INDEX_DTYPE.itemsize)
+            self._index = np.fromfile(self.index_path, dtype=self.INDEX_DTYPE, count=count)
+            self._count = count
+
+    # Writing
+
+    def add(self, record):
+        """Append a ScanRecord, returns its scan ID"""
+        with self.lock:
+            offset = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+            entry = self._index_entry(
+                record, offset, self._name_id(record.sample_name), self._name_id(record.type)
+            )
+
+            # Data goes first, so an index record never points past the data file
+            with open(self.data_path, 'ab') as f:
+                for chunk in self._data_chunks(record):
+                    f.write(chunk)
+            with open(self.index_path, 'ab') as f:
+                entry.tofile(f)
+
+            scan_id = self._count
+            self._append_index(entry)
+            record.scan_id = scan_id
+            self._remember(scan_id, record)
+            return scan_id
+
+    def _name_id(self, name):
+        """Line of a name in names.txt, appending it if new"""
+        if name is None:
+            return -1
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            if '\n' in name:
+                raise ValueError("Names cannot contain newlines")
+            with open(self.names_path, 'a', encoding='utf-8') as f:
+                f.write(name + '\n')
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def _append_index(self, entry):
+        """Add an index record in memory, growing the array geometrically"""
+        if self._count == len(self._index):
+            grown = np.empty(max(64, 2 * len(self._index)), dtype=self.INDEX_DTYPE)
+            grown[:self._count] = self._index[:self._count]
+            self._index = grown
+        self._index[self._count] = entry[0]
+        self._count += 1
+
+    # Reading
+
+    def get(self, scan_id):
+        """ScanRecord by ID, from the LRU cache or read from disk"""
+        with self.lock:
+            record = self._cache.get(scan_id)
+            if record is not None:
+                self._cache.move_to_end(scan_id)
+                return record
+            if not 0 <= scan_id < self._count:
+                raise KeyError(scan_id)
+            record = self._read(scan_id)
+            self._remember(scan_id, record)
+            return record
+
+    def __getitem__(self, scan_id):
+        return self.get(scan_id)
+
+    def _read(self, scan_id):
+        entry = self._index[scan_id]
+        num_points = int(entry['num_points'])
+        with open(self.data_path, 'rb') as f:
+            f.seek(int(entry['offset']))
+            floats = np.fromfile(f, dtype='<f8', count=3 * num_points)
+            time_offsets = np.fromfile(f, dtype='<i8', count=num_points)
+        return self._record(scan_id, floats, time_offsets)
+
+    def _remember(self, scan_id, record):
+        self._cache[scan_id] = record
+        self._cache.move_to_end(scan_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
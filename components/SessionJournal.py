@@ -0,0 +1,290 @@
+import json
+import os
+import queue
+import struct
+import threading
+import zlib
+import numpy as np
+from components.KineticBuffer import KineticBuffer
+from components.ScanRecord import ScanRecord
+from components.Spectrum import Spectrum
+
+# Append-only session journal written by SessionJournal.sync
+#
+#   header   MAGIC, then FILE_FORMAT (version)
+#   records  RECORD_FORMAT (kind, JSON length, data length, CRC32 of JSON + data),
+#            then UTF-8 JSON and raw little-endian data
+#
+# Record kinds:
+#   META  session metadata, first record
+#   CALB  calibration_data, is_calibrated and the saved spectra (whenever changed)
+#   SCAN  one scan: ScanRecord.metadata() and its COLUMNS back to back
+#   KRUN  a new kinetic run started, following KPTS belong to it
+#   KPTS  kinetic points as (n x KineticBuffer.COLUMNS) float64 rows
+#
+# A record cut short by a crash fails its length or CRC check and ends replay.
+
+MAGIC = b'SPECJNL\x00'
+FILE_FORMAT = '<H'
+VERSION = 1
+RECORD_FORMAT = '<4sIII'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+
+def is_journal_file(path):
+    """True if the file starts with the session journal magic"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class SessionJournal:
+    """Incremental autosave of a SpectralEngine to an append-only journal
+
+    sync() is meant to run periodically as a SystemManager task. Each call only
+    collects what changed since the previous one - new scans, new kinetic points
+    and changed calibration - and hands the encoded records to a writer thread,
+    which appends everything queued so far and fsyncs once per batch. The
+    caller never waits for the disk, so acquisition is not stalled; a crash
+    loses at most the last sync interval plus the batch being written.
+    replay() rebuilds the engine state from a journal.
+    """
+
+    def __init__(self, engine, path, log=print):
+        self.engine = engine
+        self.path = path
+        self.log = log
+        self.lock = threading.Lock()
+        self.records = 0        # records queued since the journal was opened
+        self.bytes_written = 0  # bytes appended and fsynced
+        self.last_sync = None   # clock time of the last sync() call
+        self.error = None       # last write error, if any
+        self.task = None        # SystemManager task running sync(), see schedule()
+
+        # What has been journaled so far
+        # Sequence number of the last scan journaled; scans already in the
+        # history when the journal is opened are journaled by the first sync
+        history = engine.scan_history
+        self._scan_sequence = history[0].sequence - 1 if history else engine.scan_sequence
+        self._last_store_id = None  # ScanStore ID of the last scan journaled, if stored
+        self._kinetic = None    # KineticBuffer being journaled
+        self._kinetic_total = 0
+        self._calibration = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + struct.pack(FILE_FORMAT, VERSION))
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+        self._put(b'META', {
+            'timestamp': engine.clock.now().isoformat(),
+            'instrument': 'Spectrophotometer OS v1.0'
+        })
+
+    def schedule(self, system_manager, interval):
+        """Run sync() every `interval` seconds as a SystemManager task"""
+        self.task = system_manager.schedule_task(self.sync, interval)
+        return self.task
+
+    @property
+    def interval(self):
+        return self.task['interval'] if self.task is not None else None
+
+    @interval.setter
+    def interval(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Autosave interval must be positive")
+        self.task['interval'] = seconds
+
+    # Collecting changes
+
+    def sync(self):
+        """Queue records for everything that changed since the last call"""
+        with self.lock:
+            if self._file is None:
+                return
+            self._sync_calibration()
+            self._sync_scans()
+            self._sync_kinetic()
+            self.last_sync = self.engine.clock.time()
+
+    def _sync_calibration(self):
+        engine = self.engine
+        spectra = {}
+        data = []
+        for name in engine.SAVED_SPECTRA:
+            spectrum = getattr(engine, name)
+            spectra[name] = {
+                'start_index': spectrum.start_index,
+                'stride': spectrum.stride,
+                'length': len(spectrum.intensities)
+            }
+            data.append(spectrum.intensities.astype('<f8', copy=False).tobytes())
+        meta = {
+            'calibration_data': engine.calibration_data,
+            'is_calibrated': engine.is_calibrated,
+            'spectra': spectra
+        }
+        calibration = (json.dumps(meta), b''.join(data))
+        if calibration != self._calibration:
+            self._calibration = calibration
+            self._put(b'CALB', meta, calibration[1])
+
+    def _sync_scans(self):
+        # scan_history may be trimmed, so new scans are found by sequence number
+        # and any trimmed before this sync are fetched back from the scan store
+        new = [scan for scan in list(self.engine.scan_history) if scan.sequence > self._scan_sequence]
+        if not new:
+            return
+        missing = new[0].sequence - self._scan_sequence - 1
+        if missing:
+            trimmed = self._trimmed_scans(new, missing)
+            if missing > len(trimmed):
+                self.log(f"Journal: {missing - len(trimmed)} scans left the history before autosave")
+            new = trimmed + new
+
+        for scan in new:
+            self._put(
+                b'SCAN', {'scan': scan.metadata(), 'points': len(scan)},
+                b''.join(
+                    getattr(scan, column).astype('<i8' if column == 'time_offsets' else '<f8', copy=False).tobytes()
+                    for column in ScanRecord.COLUMNS
+                )
+            )
+            if scan.scan_id is not None:
+                self._last_store_id = scan.scan_id
+        self._scan_sequence = new[-1].sequence
+    
+    def _trimmed_scans(self, new, missing):
+        """Up to `missing` stored scans added before `new` but not journaled yet"""
+        store = self.engine.scan_store
+        if store is None:
+            return []
+        # Scans are stored in the order they enter the history
+        end = next((scan.scan_id for scan in new if scan.scan_id is not None), len(store))
+        start = max(end - missing, 0)
+        if self._last_store_id is not None:
+            start = max(start, self._last_store_id + 1)
+        return [store.get(scan_id) for scan_id in range(start, end)]
+
+    def _sync_kinetic(self):
+        kinetic = self.engine.kinetic_data
+        if kinetic is not self._kinetic:
+            self._kinetic = kinetic
+            self._kinetic_total = 0
+            self._put(b'KRUN', {'capacity': kinetic.capacity})
+
+        if kinetic.total > self._kinetic_total:
+            columns, total = kinetic.since(self._kinetic_total)
+            # Points evicted from memory since the last sync cannot be journaled
+            lost = total - self._kinetic_total - columns.shape[1]
+            if lost:
+                self.log(f"Journal: {lost} kinetic points evicted before autosave")
+            self._put(b'KPTS', {'points': columns.shape[1]}, np.ascontiguousarray(columns.T, dtype='<f8').tobytes())
+            self._kinetic_total = total
+
+    # Writing
+
+    def _put(self, kind, meta, data=b''):
+        encoded = json.dumps(meta).encode('utf-8')
+        crc = zlib.crc32(data, zlib.crc32(encoded))
+        self._queue.put(struct.pack(RECORD_FORMAT, kind, len(encoded), len(data), crc) + encoded + data)
+        self.records += 1
+
+    def _writer_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # Group everything queued meanwhile into one write and one fsync
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = None in batch
+            batch = [record for record in batch if record is not None]
+            try:
+                for record in batch:
+                    self._file.write(record)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.bytes_written += sum(len(record) for record in batch)
+            except Exception as e:
+                self.error = e
+                self.log(f"Journal: Write failed: {e}")
+            if closing:
+                return
+
+    def close(self):
+        """Journal the last changes, wait for them to be on disk and close the file"""
+        self.sync()
+        with self.lock:
+            if self._file is None:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._file.close()
+            self._file = None
+
+    # Rebuilding
+
+    @staticmethod
+    def read_records(path):
+        """Yield (kind, meta, data) of every intact record, stopping at a torn one"""
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a session journal")
+            (version,) = struct.unpack(FILE_FORMAT, f.read(struct.calcsize(FILE_FORMAT)))
+            if version > VERSION:
+                raise ValueError(f"Unsupported journal version {version} (newest supported: {VERSION})")
+            while True:
+                header = f.read(RECORD_SIZE)
+                if len(header) < RECORD_SIZE:
+                    return
+                kind, json_length, data_length, crc = struct.unpack(RECORD_FORMAT, header)
+                encoded = f.read(json_length)
+                data = f.read(data_length)
+                if len(encoded) < json_length or len(data) < data_length:
+                    return
+                if zlib.crc32(data, zlib.crc32(encoded)) != crc:
+                    return
+                yield kind, json.loads(encoded.decode('utf-8')), data
+
+    @classmethod
+    def replay(cls, path, engine):
+        """Rebuild calibration, spectra, scans and kinetic data of a journaled session"""
+        counts = {'scans': 0, 'kinetic_points': 0}
+        kinetic_rows = None
+        for kind, meta, data in cls.read_records(path):
+            if kind == b'CALB':
+                engine.calibration_data = meta['calibration_data']
+                engine.is_calibrated = meta['is_calibrated']
+                offset = 0
+                for name, attrs in meta['spectra'].items():
+                    intensities = np.frombuffer(data, dtype='<f8', count=attrs['length'], offset=offset)
+                    offset += 8 * attrs['length']
+                    setattr(engine, name, Spectrum(attrs['start_index'], intensities.copy(), attrs['stride']))
+            elif kind == b'SCAN':
+                columns = {}
+                n = meta['points']
+                for i, column in enumerate(ScanRecord.COLUMNS):
+                    dtype = '<i8' if column == 'time_offsets' else '<f8'
+                    columns[column] = np.frombuffer(data, dtype=dtype, count=n, offset=8 * n * i).copy()
+                engine._add_to_history(ScanRecord.from_columns(meta['scan'], columns))
+                counts['scans'] += 1
+            elif kind == b'KRUN':
+                kinetic_rows = []
+            elif kind == b'KPTS' and kinetic_rows is not None:
+                kinetic_rows.append(np.frombuffer(data, dtype='<f8').reshape(-1, len(KineticBuffer.COLUMNS)))
+
+        if engine.scan_store is not None and len(engine.scan_history) > engine.HISTORY_LIMIT:
+            del engine.scan_history[:-engine.HISTORY_LIMIT]
+        if kinetic_rows is not None:
+            rows = np.concatenate(kinetic_rows) if kinetic_rows else np.empty((0, len(KineticBuffer.COLUMNS)))
+            engine.kinetic_data = KineticBuffer.from_columns(rows.T, engine.kinetic_capacity)
+            counts['kinetic_points'] = len(rows)
+        return counts
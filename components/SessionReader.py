@@ -0,0 +1,211 @@
+import json
+import mmap
+import re
+import numpy as np
+from components.KineticBuffer import KineticBuffer
+from components.ScanRecord import ScanRecord
+from components.SpectralFile import SpectralFileReader, is_spectral_file
+from components.Spectrum import Spectrum
+
+# Top-level keys of a JSON file written by SpectralEngine.save_data (indent=2)
+# start a line indented by exactly two spaces; deeper lines are indented more
+# and JSON strings cannot span lines, so these patterns only match at the top.
+_JSON_KEY = b'\n  "%s": '
+_JSON_NEXT_KEY = re.compile(rb'\n  "|\n}')
+_JSON_KINETIC_POINT = re.compile(rb'\n    \{.*?\n    \}', re.DOTALL)
+
+
+class SessionReader:
+    """Reads single sections of a saved session file without loading the rest
+
+    Works on both formats written by SpectralEngine.save_data. Binary files
+    are read through their table of contents. JSON files are memory-mapped and
+    a section's value is located by scanning for its top-level key, then only
+    that value is decoded; files not laid out like save_data output fall back
+    to parsing the whole file once.
+    """
+
+    # Section name -> key in the file
+    SECTIONS = {
+        'metadata': 'metadata',
+        'reference': 'reference_spectrum',
+        'sample': 'sample_spectrum',
+        'background': 'background_spectrum',
+        'calibration': 'calibration_data',
+        'recent_scan': 'recent_scan',
+        'kinetic': 'kinetic_data'
+    }
+
+    def __init__(self, path):
+        self.path = path
+        self._binary = None
+        self._text = None
+        self._data = None   # Whole JSON document, only for the fallback
+        self._file = None
+
+        if is_spectral_file(path):
+            self._binary = SpectralFileReader(path)
+        else:
+            self._file = open(path, 'rb')
+            try:
+                self._text = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                self._text = b''  # Empty file
+            if self._text[:5] != b'{\n  "':
+                self._data = json.loads(self._text[:].decode('utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
+        if self._file is not None:
+            self._file.close()
+        self._text = None
+        self._file = None
+
+    @classmethod
+    def key(cls, section):
+        """File key of a section, accepting both short names and file keys"""
+        if section in cls.SECTIONS:
+            return cls.SECTIONS[section]
+        if section in cls.SECTIONS.values():
+            return section
+        raise ValueError(f"Unknown section: {section} (one of {', '.join(cls.SECTIONS)})")
+
+    def sections(self):
+        """Short names of the sections present in the file"""
+        return [name for name, key in self.SECTIONS.items() if self._has(key)]
+
+    def _has(self, key):
+        if self._binary is not None:
+            return key in self._binary
+        if self._data is not None:
+            return key in self._data
+        return self._text.find(_JSON_KEY % key.encode()) >= 0
+
+    def _json_span(self, key):
+        """(start, end) of a top-level JSON value, or None if the key is missing"""
+        match = self._text.find(_JSON_KEY % key.encode())
+        if match < 0:
+            return None
+        start = match + len(_JSON_KEY % key.encode())
+        end = _JSON_NEXT_KEY.search(self._text, start)
+        return start, end.start() if end is not None else len(self._text)
+
+    def _json_value(self, key):
+        if self._data is not None:
+            return self._data.get(key)
+        span = self._json_span(key)
+        if span is None:
+            return None
+        return json.loads(self._text[span[0]:span[1]].rstrip(b', \n').decode('utf-8'))
+
+    # Sections
+
+    def metadata(self):
+        """Metadata block of the file (timestamp, wavelength, calibration state)"""
+        return self.read('metadata') or {}
+
+    def read(self, section):
+        """One section as the object load_data would use
+
+        metadata and calibration are dicts, reference/sample/background are
+        Spectrum objects, recent_scan a ScanRecord (or None) and kinetic a
+        KineticBuffer. Missing sections give None.
+        """
+        key = self.key(section)
+        if key == 'kinetic_data':
+            return self.read_kinetic() if self._has(key) else None
+        if self._binary is not None:
+            return self._read_binary(key)
+
+        value = self._json_value(key)
+        if value is None:
+            return None
+        if key.endswith('_spectrum'):
+            return Spectrum.from_dict(value)
+        if key == 'recent_scan':
+            return ScanRecord.from_dict(value)
+        return value
+
+    def _read_binary(self, key):
+        reader = self._binary
+        if key not in reader:
+            return None
+        if key.endswith('_spectrum'):
+            attrs = reader.attrs(key)
+            return Spectrum(attrs['start_index'], reader.read_array(key), attrs['stride'])
+        if key == 'recent_scan':
+            columns = {column: reader.read_array(f'recent_scan/{column}') for column in ScanRecord.COLUMNS}
+            return ScanRecord.from_columns(reader.read_json(key), columns)
+        return reader.read_json(key)
+
+    # Kinetic data
+
+    def read_kinetic(self, capacity=65536):
+        """Kinetic data as a KineticBuffer of at least `capacity` points"""
+        if self._binary is not None:
+            if 'kinetic_data' not in self._binary:
+                return KineticBuffer(capacity)
+            return KineticBuffer.from_columns(self._binary.read_array('kinetic_data'), capacity)
+        return KineticBuffer.from_records(list(self.kinetic_points()), capacity)
+
+    def kinetic_points(self, chunk=4096):
+        """Generator of kinetic point dicts, reading `chunk` points at a time"""
+        if self._binary is not None:
+            yield from self._binary_kinetic_points(chunk)
+        elif self._data is not None:
+            yield from self._data.get('kinetic_data') or []
+        else:
+            span = self._json_span('kinetic_data')
+            if span is None:
+                return
+            block = []
+            for match in _JSON_KINETIC_POINT.finditer(self._text, span[0], span[1]):
+                block.append(match.group())
+                if len(block) == chunk:
+                    yield from self._decode_points(block)
+                    block = []
+            yield from self._decode_points(block)
+
+    @staticmethod
+    def _decode_points(block):
+        """Decode a list of JSON point objects in one json.loads call"""
+        if block:
+            yield from json.loads(b'[' + b','.join(block) + b']')
+
+    def _binary_kinetic_points(self, chunk):
+        reader = self._binary
+        if 'kinetic_data' not in reader:
+            return
+        entry = reader.entry('kinetic_data')
+        num_columns, count = entry['shape']
+
+        if entry['compression'] is not None:
+            columns = reader.read_array('kinetic_data')
+            blocks = (columns[:, start:start + chunk] for start in range(0, count, chunk))
+        else:
+            blocks = self._read_column_blocks(entry['offset'], num_columns, count, chunk)
+
+        for block in blocks:
+            for row in block.T.tolist():
+                point = dict(zip(KineticBuffer.COLUMNS, row))
+                if point['absorbance'] != point['absorbance']:  # NaN
+                    point['absorbance'] = None
+                yield point
+
+    def _read_column_blocks(self, offset, num_columns, count, chunk):
+        """(columns x n) blocks of an uncompressed row-major float64 array"""
+        with open(self.path, 'rb') as f:
+            for start in range(0, count, chunk):
+                size = min(chunk, count - start)
+                block = np.empty((num_columns, size))
+                for column in range(num_columns):
+                    f.seek(offset + 8 * (column * count + start))
+                    block[column] = np.fromfile(f, dtype='<f8', count=size)
+                yield block
@@ -0,0 +1,133 @@
+import mmap
+import numpy as np
+from components.ScanIndex import ScanIndex
+from components.SpectralFile import SpectralFileWriter, SpectralFileReader
+
+
+class SpectralArchive(ScanIndex):
+    """Read-only, memory-mapped archive of many scans in the binary SpectralFile format
+
+    An archive holds three sections: 'archive/names' (JSON list of sample names
+    and scan types), 'archive/index' (INDEX_DTYPE records) and 'archive/data'
+    (the scans' columns back to back, never compressed). Opening one only reads
+    the header and table of contents and maps the file; the index and every
+    scan are zero-copy, read-only numpy views of the mapping, so the OS pages
+    in a scan's data only when it is accessed.
+    """
+
+    NAMES_SECTION = 'archive/names'
+    INDEX_SECTION = 'archive/index'
+    DATA_SECTION = 'archive/data'
+
+    def __init__(self, path):
+        self.path = path
+        reader = SpectralFileReader(path)
+        if self.INDEX_SECTION not in reader:
+            raise ValueError(f"{path} does not contain a scan archive")
+        for name in (self.INDEX_SECTION, self.DATA_SECTION):
+            if reader.entry(name)['compression'] is not None:
+                raise ValueError(f"Archive section {name} is compressed and cannot be mapped")
+
+        self.names = reader.read_json(self.NAMES_SECTION)
+        self._name_ids = {name: i for i, name in enumerate(self.names)}
+
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index_entry = reader.entry(self.INDEX_SECTION)
+        dtype = np.dtype([tuple(field) for field in index_entry['attrs']['fields']])
+        self._count = index_entry['raw_length'] // dtype.itemsize
+        self._index = np.frombuffer(self._mmap, dtype=dtype, count=self._count, offset=index_entry['offset'])
+        self._data_offset = reader.entry(self.DATA_SECTION)['offset']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Unmap the file; views handed out earlier must no longer be used"""
+        if self._mmap is not None:
+            self._index = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views are still alive, the mapping goes away with them
+                pass
+            self._mmap = None
+
+    def _check_open(self):
+        if self._mmap is None:
+            raise ValueError(f"Archive {self.path} is closed")
+
+    @property
+    def index(self):
+        """Index records of all archived scans; the scan ID is the position"""
+        self._check_open()
+        return self._index[:self._count]
+
+    def get(self, scan_id):
+        """ScanRecord whose columns are zero-copy views into the mapped file"""
+        self._check_open()
+        if not 0 <= scan_id < self._count:
+            raise KeyError(scan_id)
+        entry = self._index[scan_id]
+        num_points = int(entry['num_points'])
+        offset = self._data_offset + int(entry['offset'])
+        floats = np.frombuffer(self._mmap, dtype='<f8', count=3 * num_points, offset=offset)
+        time_offsets = np.frombuffer(
+            self._mmap, dtype='<i8', count=num_points, offset=offset + 24 * num_points
+        )
+        return self._record(scan_id, floats, time_offsets)
+
+    def __getitem__(self, scan_id):
+        return self.get(scan_id)
+
+    def __iter__(self):
+        for scan_id in range(self._count):
+            yield self.get(scan_id)
+
+    @classmethod
+    def write(cls, path, records, writer=None):
+        """Write an iterable of ScanRecords as an archive, returns the number of scans
+
+        Scans are streamed to disk one at a time. Pass an open SpectralFileWriter
+        as `writer` to add the archive to a file with other sections.
+        """
+        names = []
+        name_ids = {}
+        entries = []
+
+        def name_id(name):
+            if name is None:
+                return -1
+            if name not in name_ids:
+                name_ids[name] = len(names)
+                names.append(name)
+            return name_ids[name]
+
+        def data_chunks():
+            offset = 0
+            for record in records:
+                entries.append(cls._index_entry(
+                    record, offset, name_id(record.sample_name), name_id(record.type)
+                ))
+                yield from cls._data_chunks(record)
+                offset += len(record) * cls.POINT_BYTES
+
+        own_writer = writer is None
+        if own_writer:
+            writer = SpectralFileWriter(path)
+        try:
+            writer.add_stream(cls.DATA_SECTION, data_chunks(), compress=False)
+            index = np.concatenate(entries) if entries else np.empty(0, dtype=cls.INDEX_DTYPE)
+            writer.add_stream(
+                cls.INDEX_SECTION, [index.tobytes()], compress=False,
+                attrs={'fields': [list(field) for field in cls.INDEX_DTYPE.descr]}
+            )
+            writer.add_json(cls.NAMES_SECTION, names)
+        finally:
+            if own_writer:
+                writer.close()
+        return len(entries)
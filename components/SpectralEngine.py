@@ -10,9 +10,25 @@
 import numpy as np
 import math
 import json
-import time
-from datetime import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
+from components.VirtualClock import VirtualClock, ClockMode
+from components.NoiseGenerator import NoiseGenerator
+from components.ResponseTable import ResponseTable
+from components.DeadlineScheduler import DeadlineScheduler
+from components.KineticBuffer import KineticBuffer
+from components.MovePlanner import MovePlanner
+from components.CellMotor import CellMotor
+from components.ReferenceCache import ReferenceCache, CachedReference
+from components.AbsorbanceResult import AbsorbanceResult
+from components.Spectrum import Spectrum, grid_index, grid_wavelengths
+from components.ScanRecord import ScanRecord, ScanChunk, ScanSummary
+from components.SpectralFile import SpectralFileWriter, SpectralFileReader, is_spectral_file
+from components.SpectralArchive import SpectralArchive
+from components.SessionJournal import SessionJournal, is_journal_file
+from components.MeasurementLog import MeasurementLog, is_measurement_log
+from components.SessionReader import SessionReader
 
 class ScanMode(Enum):
     """Enum for different scanning modes"""
@@ -24,7 +40,13 @@ class ScanMode(Enum):
 class SpectralEngine:
     """Core engine for spectrophotometer operations"""
     
-    def __init__(self):
+    def __init__(self, clock=None, seed=None):
+        # Instrument clock used for every delay and timestamp
+        self.clock = clock if clock is not None else VirtualClock()
+        
+        # Seeded noise source shared by single-point and vectorized measurements
+        self.noise = NoiseGenerator(seed)
+        
         # Hardware specifications
         self.MIN_WAVELENGTH = 190.0  # nm
         self.MAX_WAVELENGTH = 1100.0  # nm
@@ -36,22 +58,45 @@ class SpectralEngine:
         self.target_wavelength = 450.0
         self.is_scanning = False
         self.is_calibrated = False
-        self.is_lamp_on = False
+        self._lamp_on = False
+        self.lamp_session = 0   # Counts lamp switch-ons, blanks are only valid within one
         self.sample_present = False
         
         # Data storage
-        self.reference_spectrum = {}    # Reference (blank) data
-        self.sample_spectrum = {}       # Current sample data
-        self.background_spectrum = {}   # Dark current data
+        self.reference_spectrum = Spectrum()    # Reference (blank) data
+        self.reference_cache = ReferenceCache(max_age=1800.0)  # Blanks reused while still valid
+        self.sample_spectrum = Spectrum()       # Current sample data
+        self.background_spectrum = Spectrum()   # Dark current data
         self.calibration_data = {}      # Calibration coefficients
-        self.scan_history = []          # History of scans
-        self.kinetic_data = []          # Time-course data
+        self.scan_history = []          # History of scans (only the latest if a scan_store is attached)
+        self.scan_sequence = 0          # Number of the last scan added to scan_history, see _add_to_history
+        self.scan_store = None          # Persistent ScanStore every scan is appended to, if attached
+        self.HISTORY_LIMIT = 16         # Scans kept in scan_history while a scan_store is attached
+        self.archive = None             # Memory-mapped SpectralArchive of historical scans, if opened
+        self.measurement_log = None     # Write-ahead MeasurementLog every measurement is streamed into, if attached
+        self.last_scan_seed = None      # Seed entropy of the last parallel scan
+        self._response_tables = {}      # Response lookup tables, see _get_response_table
+        self.kinetic_data = KineticBuffer()  # Time-course data
+        self.kinetic_capacity = 65536   # Points of a kinetic run kept in memory
+        self.kinetic_spill_path = None  # File older kinetic points are spilled to, if set
+        self.kinetic_timing = None      # Lateness/jitter statistics of the last kinetic scan
+        self.burst_data = None          # Result of the last burst acquisition
+        self.kinetic_matrix = None      # Result of the last multi-wavelength kinetic scan
+        
+        # Monochromator movement model and path planning
+        self.move_planner = MovePlanner(speed=10.0)
+        
+        # Autosampler cell changer used by batch runs
+        self.cell_motor = CellMotor(self.clock)
         
         # Scan parameters
         self.scan_mode = ScanMode.SINGLE
         self.scan_speed = 1.0  # nm/sec
         self.integration_time = 0.1  # seconds per reading
         self.scan_range = (self.MIN_WAVELENGTH, self.MAX_WAVELENGTH)
+        self.SCAN_BLOCK_SIZE = 100  # points acquired per vectorized block
+        self.CHECKPOINT_BLOCK_SIZE = 10  # smaller blocks when scans report to a checkpoint
+        self.BURST_LATENCY = 0.001  # seconds of burst samples acquired per wake-up
         
         # Instrument noise parameters
         self.dark_current = 0.001
@@ -68,14 +113,26 @@ class SpectralEngine:
             'wavelength_coeffs': [0.000001, 1.0001, -0.05],  # a, b, c
             'intensity_coeffs': [1.0, 0.0],  # linear correction
             'dark_current': self.dark_current,
-            'last_calibration': datetime.now().isoformat(),
+            'last_calibration': self.clock.now().isoformat(),
             'calibration_valid': False
         }
     
+    @property
+    def is_lamp_on(self):
+        return self._lamp_on
+    
+    @is_lamp_on.setter
+    def is_lamp_on(self, on):
+        # A lamp switched on again drifts differently, blanks from before are stale
+        if on and not self._lamp_on:
+            self.lamp_session += 1
+        self._lamp_on = bool(on)
+    
     def initialize(self):
         """Initialize the spectral engine with calibration"""
         print("Spectral Engine: Initializing...")
         self._initialize_default_calibration()
+        self.cell_motor.reset()
         
         # Set default wavelength to middle of range
         self.current_wavelength = (self.MIN_WAVELENGTH + self.MAX_WAVELENGTH) / 2
@@ -97,8 +154,16 @@ class SpectralEngine:
         print(f"Spectral Engine: Ready. Range: {self.MIN_WAVELENGTH}-{self.MAX_WAVELENGTH}nm")
         return self_test['passed']
     
-    def set_wavelength(self, wavelength):
-        """Set the target wavelength"""
+    def set_wavelength(self, wavelength, verbose=True):
+        """Set the target wavelength, returns the new current wavelength"""
+        delay = self._start_move(wavelength, verbose)
+        self.clock.sleep(delay)  # Simulated delay
+        
+        self.current_wavelength = wavelength
+        return self.current_wavelength
+    
+    def _start_move(self, wavelength, verbose=True):
+        """Check a wavelength and set it as target, returns the simulated move delay"""
         if not (self.MIN_WAVELENGTH <= wavelength <= self.MAX_WAVELENGTH):
             raise ValueError(
                 f"Wavelength {wavelength}nm out of range. "
@@ -107,16 +172,13 @@ class SpectralEngine:
         
         self.target_wavelength = wavelength
         
-        # Simulate wavelength movement
-        wavelength_diff = abs(wavelength - self.current_wavelength)
-        move_time = wavelength_diff / 10.0  # 10 nm/sec movement speed
+        # Simulate wavelength movement (10 nm/sec movement speed)
+        move_time = self.move_planner.move_time(self.current_wavelength, wavelength)
         
         # In real hardware, this would control the monochromator
-        print(f"Moving from {self.current_wavelength}nm to {wavelength}nm...")
-        time.sleep(min(move_time, 0.1))  # Simulated delay
-        
-        self.current_wavelength = wavelength
-        return self.current_wavelength
+        if verbose:
+            print(f"Moving from {self.current_wavelength}nm to {wavelength}nm...")
+        return min(move_time, 0.1)
     
     def goto_wavelength(self, wavelength):
         """Go to specific wavelength (for GOTO button)"""
@@ -127,26 +189,470 @@ class SpectralEngine:
         if not self.is_lamp_on:
             raise RuntimeError("Lamp is off. Cannot measure.")
         
-        # Apply wavelength calibration
-        calibrated_wl = self._apply_wavelength_calibration(self.current_wavelength)
+        table = self._get_response_table()
+        index = table.index(self.current_wavelength)
         
-        # Simulate photodetector measurement with noise
-        intensity = self._simulate_spectral_response(calibrated_wl)
+        if index is not None:
+            # Grid wavelength: calibration and response come from the lookup table
+            calibrated_wl, calibrated_intensity = table.lookup(index)
+        else:
+            # Apply wavelength calibration
+            calibrated_wl = self._apply_wavelength_calibration(self.current_wavelength)
+            
+            # Simulate photodetector measurement
+            intensity = self._simulate_spectral_response(calibrated_wl)
+            
+            # Apply intensity calibration
+            calibrated_intensity = self._apply_intensity_calibration(intensity)
         
-        # Apply intensity calibration and add noise
-        calibrated_intensity = self._apply_intensity_calibration(intensity)
         noisy_intensity = self._add_measurement_noise(calibrated_intensity)
         
+        # Points of scan and kinetic runs are logged by the run
+        if self.measurement_log is not None and not self.is_scanning:
+            self.measurement_log.single(
+                self.clock.time(), self.current_wavelength, calibrated_wl, max(0, noisy_intensity)
+            )
+        
         return {
             'wavelength': self.current_wavelength,
             'calibrated_wavelength': calibrated_wl,
             'intensity': max(0, noisy_intensity),
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.clock.now().isoformat(),
             'sample_present': self.sample_present
         }
     
-    def scan_full_range(self, start_wl=None, end_wl=None):
-        """Perform a full wavelength scan"""
+    def measure_raw(self):
+        """Measure intensity at current wavelength as a bare float
+        
+        Low-overhead variant of measure_single without the result dict and timestamp.
+        """
+        if not self.is_lamp_on:
+            raise RuntimeError("Lamp is off. Cannot measure.")
+        return self._add_measurement_noise(self._noise_free_intensity(self.current_wavelength))
+    
+    def _noise_free_intensity(self, wavelength):
+        """Calibrated intensity before noise, from the lookup table when on the grid"""
+        table = self._get_response_table()
+        index = table.index(wavelength)
+        if index is not None:
+            return table.lookup(index)[1]
+        calibrated_wl = self._apply_wavelength_calibration(wavelength)
+        return self._apply_intensity_calibration(self._simulate_spectral_response(calibrated_wl))
+    
+    def burst_acquire(self, num_points, rate, wavelength=None, checkpoint=None):
+        """Stopped-flow style burst: acquire num_points at a fixed wavelength at `rate` Hz
+        
+        The wavelength is set once and the output arrays are preallocated. Points are
+        sampled on the deadlines k / rate of the instrument clock; whatever points are
+        due are acquired as one vectorized block, so 10 kHz-class rates are reachable.
+        `checkpoint`, if given, is called as checkpoint(progress, None) after every
+        block. Returns a dict with 'times' (scheduled sample times) and 'intensities' arrays.
+        """
+        if num_points < 1:
+            raise ValueError("Number of points must be at least 1")
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        if wavelength is not None:
+            self.set_wavelength(wavelength)
+        if not self.is_lamp_on:
+            raise RuntimeError("Lamp is off. Cannot measure.")
+        
+        print(f"Starting burst: {num_points} points at {rate}Hz, {self.current_wavelength}nm")
+        
+        times = np.arange(num_points) / rate
+        intensities = np.empty(num_points)
+        base_intensity = self._noise_free_intensity(self.current_wavelength)
+        # Points per wake-up at most, so a block never waits longer than BURST_LATENCY;
+        # with simulated time nobody waits, so the whole burst is one block
+        if self.clock.mode == ClockMode.INSTANT:
+            block_points = num_points
+        else:
+            block_points = max(1, int(rate * self.BURST_LATENCY))
+        
+        self.is_scanning = True
+        acquired = 0
+        max_lateness = 0.0
+        start = self.clock.monotonic()
+        try:
+            while acquired < num_points and self.is_scanning:
+                # Sleep until the last point of the next block is due
+                target = min(acquired + block_points, num_points)
+                self.clock.sleep_until(start + times[target - 1])
+                
+                # Acquire every point that is due by now
+                elapsed = self.clock.monotonic() - start
+                due = min(num_points, max(target, int(elapsed * rate) + 1))
+                intensities[acquired:due] = self._add_measurement_noise_array(
+                    np.full(due - acquired, base_intensity)
+                )
+                max_lateness = max(max_lateness, elapsed - times[due - 1])
+                acquired = due
+                if checkpoint is not None:
+                    checkpoint(acquired / num_points, None)
+        finally:
+            self.is_scanning = False
+        
+        duration = self.clock.monotonic() - start
+        self.burst_data = {
+            'wavelength': self.current_wavelength,
+            'rate': rate,
+            'times': times[:acquired],
+            'intensities': intensities[:acquired],
+            'duration': duration,
+            'max_lateness': max_lateness
+        }
+        return self.burst_data
+    
+    def _measure_dark(self):
+        """Measure the detector dark signal at current wavelength (lamp off)"""
+        return {
+            'wavelength': self.current_wavelength,
+            'intensity': self._add_measurement_noise(0.0),
+            'timestamp': self.clock.now().isoformat()
+        }
+    
+    def scan_full_range(self, start_wl=None, end_wl=None, vectorized=True,
+                        segments=None, workers=None, seed=None, checkpoint=None,
+                        sample_name=None):
+        """Perform a full wavelength scan, labelled with `sample_name` in the history
+        
+        `checkpoint`, if given, is called as checkpoint(progress, chunk) after
+        every block of CHECKPOINT_BLOCK_SIZE points (chunk is None in per-point
+        mode, where it is called after every point); an exception raised by it
+        aborts the scan without storing it. Segmented scans do not call it.
+        
+        With `segments` set, the range is split into that many segments which are
+        acquired in parallel in a process pool (`workers` processes) and stitched
+        back into one ScanRecord. Every SCAN_BLOCK_SIZE points draw their noise
+        from their own RNG stream spawned from `seed` (or the engine's seed), so
+        a seeded scan gives the same spectrum whatever the number of segments.
+        """
+        if vectorized and segments is None:
+            return self._run_steps(self._scan_steps(start_wl, end_wl, checkpoint, sample_name))
+        
+        start_wl, end_wl, start_index, num_points = self._validate_scan_range(start_wl, end_wl)
+        
+        if segments is not None:
+            return self._scan_segmented(
+                start_wl, end_wl, start_index, num_points, segments, workers, seed, sample_name
+            )
+        
+        columns = self._scan_columns(num_points)
+        start_time = self.clock.time()
+        acquired = 0
+        
+        print(f"Starting scan: {start_wl}-{end_wl}nm ({num_points} points)")
+        
+        run_id = self._begin_log_scan(start_wl, end_wl, num_points, start_time, sample_name)
+        try:
+            columns[0][:] = grid_wavelengths(start_index + np.arange(num_points))
+            acquired = self._scan_per_point(*columns, start_time, checkpoint, run_id)
+        finally:
+            self._end_log_run(run_id, acquired)
+        
+        return self._store_scan_columns(start_wl, end_wl, columns, acquired, start_time, sample_name=sample_name)
+    
+    def _run_steps(self, steps):
+        """Run a step generator to completion on this thread, returns its result
+        
+        Step generators (_scan_steps, _kinetic_steps, _calibration_steps) hold
+        the logic of an operation for both the blocking API and
+        AsyncSpectralEngine. Before every step they yield the instrument
+        monotonic time to wait until; here it is slept, the asyncio front end
+        awaits it instead.
+        """
+        try:
+            while True:
+                try:
+                    deadline = next(steps)
+                except StopIteration as stop:
+                    return stop.value
+                self.clock.sleep_until(deadline)
+        finally:
+            steps.close()
+    
+    def _scan_steps(self, start_wl=None, end_wl=None, checkpoint=None, sample_name=None):
+        """Vectorized scan as a step generator (see _run_steps), returns the stored ScanRecord
+        
+        The scan is a scan_iter stream; the integration time of every chunk is
+        waited out once it has been acquired.
+        """
+        # Checkpoints are where jobs can be preempted, so they come more often
+        block_size = self.SCAN_BLOCK_SIZE if checkpoint is None else self.CHECKPOINT_BLOCK_SIZE
+        chunks = self.scan_iter(start_wl, end_wl, block_size, sample_name, checkpoint, pace=False)
+        try:
+            while True:
+                try:
+                    chunk = next(chunks)
+                except StopIteration as stop:
+                    return stop.value
+                yield self.clock.monotonic() + self.integration_time * len(chunk)
+        finally:
+            # Discards the scan if the steps were closed early
+            chunks.close()
+    
+    def _scan_columns(self, num_points):
+        """Preallocated (wavelengths, calibrated wavelengths, intensities, time offsets) columns"""
+        return (
+            np.empty(num_points),
+            np.empty(num_points),
+            np.empty(num_points),
+            np.empty(num_points, dtype=np.int64)
+        )
+    
+    def _fill_scan_columns(self, columns, chunk):
+        """Copy a ScanChunk into scan columns, returns the number of points filled so far"""
+        block = slice(chunk.index, chunk.index + len(chunk))
+        wavelengths, calibrated_wavelengths, intensities, time_offsets = columns
+        wavelengths[block] = chunk.wavelengths
+        calibrated_wavelengths[block] = chunk.calibrated_wavelengths
+        intensities[block] = chunk.intensities
+        time_offsets[block] = chunk.time_offsets
+        return block.stop
+    
+    def _store_scan_columns(self, start_wl, end_wl, columns, acquired, start_time,
+                            summary=None, sample_name=None):
+        """Store scan columns, trimmed if the scan was stopped early"""
+        if acquired < len(columns[0]):
+            columns = tuple(column[:acquired].copy() for column in columns)
+        wavelengths, calibrated_wavelengths, intensities, time_offsets = columns
+        return self._store_scan(
+            start_wl, end_wl, wavelengths, calibrated_wavelengths, intensities,
+            start_time, time_offsets, summary, sample_name
+        )
+    
+    def scan_batch(self, scan_ranges, workers=None, seed=None):
+        """Acquire several simulated scans in parallel, one process pool task per scan
+        
+        `scan_ranges` is a list of (start_wl, end_wl) tuples. Each scan gets its own
+        RNG stream spawned from `seed`. Returns the ScanRecords in the given order.
+        """
+        validated = [self._validate_scan_range(start_wl, end_wl) for start_wl, end_wl in scan_ranges]
+        streams = self._spawn_noise_streams(len(validated), seed)
+        block_size = self.SCAN_BLOCK_SIZE
+        
+        print(f"Starting batch of {len(validated)} scans")
+        
+        start_time = self.clock.time()
+        self.is_scanning = True
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = []
+                for (start_wl, end_wl, start_index, num_points), stream in zip(validated, streams):
+                    calibrated_wavelengths, responses = self._noise_free_range(start_index, num_points)
+                    futures.append((calibrated_wavelengths, pool.submit(
+                        _acquire_segment, responses, stream.spawn(-(-num_points // block_size)),
+                        block_size, self._noise_parameters()
+                    )))
+                intensities = [future.result() for _, future in futures]
+        finally:
+            self.is_scanning = False
+        
+        # The scans are acquired side by side, so they take as long as the longest one
+        self._wait_integration(max(num_points for _, _, _, num_points in validated))
+        
+        return [
+            self._store_segmented_scan(
+                start_wl, end_wl, start_index, calibrated_wavelengths, scan_intensities,
+                start_time, self._segment_time_offsets([0, num_points])
+            )
+            for (start_wl, end_wl, start_index, num_points), (calibrated_wavelengths, _), scan_intensities
+            in zip(validated, futures, intensities)
+        ]
+    
+    def _scan_segmented(self, start_wl, end_wl, start_index, num_points, segments, workers, seed,
+                        sample_name=None):
+        """Acquire a scan as parallel segments in a process pool"""
+        if segments < 1:
+            raise ValueError("Number of segments must be at least 1")
+        
+        # Segments are whole noise blocks, each block has its own stream
+        block_size = self.SCAN_BLOCK_SIZE
+        blocks = -(-num_points // block_size)
+        segments = min(segments, blocks)
+        block_bounds = np.linspace(0, blocks, segments + 1).astype(int)
+        bounds = np.minimum(block_bounds * block_size, num_points)
+        streams = self._spawn_noise_streams(blocks, seed)
+        
+        calibrated_wavelengths, responses = self._noise_free_range(start_index, num_points)
+        intensities = np.empty(num_points)
+        
+        print(f"Starting scan: {start_wl}-{end_wl}nm ({num_points} points, {segments} segments)")
+        
+        start_time = self.clock.time()
+        self.is_scanning = True
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(
+                        _acquire_segment, responses[bounds[i]:bounds[i + 1]],
+                        streams[block_bounds[i]:block_bounds[i + 1]], block_size, self._noise_parameters()
+                    )
+                    for i in range(segments)
+                ]
+                
+                # Stitch segments back in wavelength order
+                for i, future in enumerate(futures):
+                    intensities[bounds[i]:bounds[i + 1]] = future.result()
+                    print(f"Scan progress: segment {i + 1}/{segments} complete")
+        finally:
+            self.is_scanning = False
+        
+        # The segments are acquired side by side, so the scan takes as long as the longest one
+        self._wait_integration(int(np.diff(bounds).max()))
+        
+        return self._store_segmented_scan(
+            start_wl, end_wl, start_index, calibrated_wavelengths, intensities,
+            start_time, self._segment_time_offsets(bounds), sample_name
+        )
+    
+    def _spawn_noise_streams(self, count, seed=None):
+        """Independent seed sequences for parallel workers, from `seed` or the engine's own seed
+        
+        Without `seed`, a fresh seed is derived from the engine's seed sequence
+        (a new one for every scan), so passing last_scan_seed back as `seed`
+        reproduces any scan, not just the first.
+        """
+        if seed is None:
+            seed = int(self.noise.spawn(1)[0].generate_state(1, np.uint64)[0])
+        seed_sequence = np.random.SeedSequence(seed)
+        self.last_scan_seed = seed_sequence.entropy
+        return seed_sequence.spawn(count)
+    
+    def _noise_free_range(self, start_index, num_points):
+        """(calibrated wavelengths, noise-free intensities) of a grid range, from the response table"""
+        table = self._get_response_table()
+        indices, _ = table.indices(grid_wavelengths(start_index + np.arange(num_points)))
+        return table.calibrated_wavelengths[indices], table.responses[indices]
+    
+    def _noise_parameters(self):
+        """(dark_current, readout_noise, photometric_noise) as passed to NoiseGenerator.apply"""
+        return self.dark_current, self.readout_noise, self.photometric_noise
+    
+    def _wait_integration(self, num_points):
+        """Let the integration time of num_points readings pass"""
+        self.clock.sleep(self.integration_time * num_points)
+    
+    def _segment_time_offsets(self, bounds):
+        """Time offsets (microseconds) of points acquired as parallel segments split at `bounds`
+        
+        Every segment starts at the scan start, its points spaced by the integration time.
+        """
+        bounds = np.asarray(bounds)
+        positions = np.arange(bounds[-1]) - np.repeat(bounds[:-1], np.diff(bounds))
+        return (positions * self.integration_time * 1e6).astype(np.int64)
+    
+    def _store_segmented_scan(self, start_wl, end_wl, start_index, calibrated_wavelengths, intensities,
+                              start_time, time_offsets, sample_name=None):
+        """Store a scan acquired outside the engine"""
+        num_points = len(intensities)
+        self.current_wavelength = end_wl
+        wavelengths = grid_wavelengths(start_index + np.arange(num_points))
+        
+        run_id = self._begin_log_scan(start_wl, end_wl, num_points, start_time, sample_name)
+        self._log_points(run_id, wavelengths, calibrated_wavelengths, intensities, time_offsets)
+        self._end_log_run(run_id, num_points)
+        
+        return self._store_scan(
+            start_wl, end_wl, wavelengths,
+            calibrated_wavelengths, intensities, start_time, time_offsets, sample_name=sample_name
+        )
+    
+    def _add_to_history(self, scan_record):
+        """Append a scan to scan_history, numbering it from scan_sequence
+        
+        scan_history may be trimmed but the numbers only ever increase, so
+        readers such as the session journal can tell which scans are new and
+        how many were trimmed before they saw them.
+        """
+        self.scan_sequence += 1
+        scan_record.sequence = self.scan_sequence
+        self.scan_history.append(scan_record)
+    
+    def _store_scan(self, start_wl, end_wl, wavelengths, calibrated_wavelengths, intensities,
+                    start_time, time_offsets, summary=None, sample_name=None):
+        """Wrap scan columns in a ScanRecord, add it to history and update the sample spectrum"""
+        scan_record = ScanRecord(
+            start_wl, end_wl, self.WAVELENGTH_STEP,
+            wavelengths, calibrated_wavelengths, intensities,
+            start_time, time_offsets,
+            sample_present=self.sample_present,
+            timestamp=self.clock.now().isoformat(),
+            summary=summary,
+            sample_name=sample_name
+        )
+        
+        self._add_to_history(scan_record)
+        if self.scan_store is not None:
+            # The store keeps every scan, memory only the most recent ones
+            self.scan_store.add(scan_record)
+            if len(self.scan_history) > self.HISTORY_LIMIT:
+                del self.scan_history[:-self.HISTORY_LIMIT]
+        
+        # Update sample spectrum
+        if self.sample_present:
+            self.sample_spectrum = Spectrum.from_arrays(wavelengths, intensities)
+        
+        return scan_record
+    
+    def scan_iter(self, start_wl=None, end_wl=None, chunk=None, sample_name=None,
+                  checkpoint=None, pace=True, store=True):
+        """Scan a wavelength range, yielding ScanChunk blocks as they are acquired
+        
+        Each chunk carries the running ScanSummary (min, max, peak) of the scan
+        so far, so consumers can show results before the scan finishes. Points
+        go to the measurement log as they are acquired, and once the generator
+        is exhausted the scan is stored like any other (scan history, scan
+        store, session journal) and returned as the generator's value; closing
+        the generator early discards it. `checkpoint` is called as in
+        scan_full_range after every chunk. With store=False nothing is logged
+        or kept after a chunk is yielded, so a full range scan can be processed
+        in constant memory. With pace=False the integration time of a chunk is
+        not slept here; the consumer lets it pass (see _scan_steps).
+        """
+        start_wl, end_wl, start_index, num_points = self._validate_scan_range(start_wl, end_wl)
+        chunk = chunk if chunk is not None else self.SCAN_BLOCK_SIZE
+        if chunk < 1:
+            raise ValueError("Chunk size must be at least 1")
+        
+        start_time = self.clock.time()
+        summary = None
+        acquired = 0
+        
+        print(f"Starting scan: {start_wl}-{end_wl}nm ({num_points} points)")
+        
+        chunks = self._scan_chunks(start_index, num_points, chunk, start_time, pace)
+        if not store:
+            yield from chunks
+            return None
+        
+        columns = self._scan_columns(num_points)
+        run_id = self._begin_log_scan(start_wl, end_wl, num_points, start_time, sample_name)
+        try:
+            for scan_chunk in chunks:
+                yield scan_chunk
+                acquired = self._fill_scan_columns(columns, scan_chunk)
+                summary = scan_chunk.summary
+                self._log_points(
+                    run_id, scan_chunk.wavelengths, scan_chunk.calibrated_wavelengths,
+                    scan_chunk.intensities, scan_chunk.time_offsets
+                )
+                if checkpoint is not None:
+                    checkpoint(scan_chunk.progress, scan_chunk)
+        finally:
+            # Runs the chunk generator's cleanup (is_scanning) if closed early
+            chunks.close()
+            self._end_log_run(run_id, acquired)
+        
+        return self._store_scan_columns(
+            start_wl, end_wl, columns, acquired, start_time, summary, sample_name
+        )
+    
+    def _validate_scan_range(self, start_wl, end_wl):
+        """Check a scan range and snap it to the wavelength grid
+        
+        Returns (start_wl, end_wl, start_index, num_points) for the snapped range.
+        """
         if not self.is_lamp_on:
             raise RuntimeError("Lamp is off. Cannot scan.")
         
@@ -160,87 +666,199 @@ class SpectralEngine:
         if end_wl <= start_wl:
             raise ValueError(f"End wavelength must be greater than start wavelength")
         
-        self.is_scanning = True
-        scan_data = []
+        # Snap to the canonical grid so every scan shares the same wavelength axis
+        start_index = grid_index(start_wl)
+        end_index = grid_index(end_wl)
+        if end_index <= start_index:
+            raise ValueError(f"End wavelength must be greater than start wavelength")
         
         # Calculate number of points
-        num_points = int((end_wl - start_wl) / self.WAVELENGTH_STEP) + 1
+        num_points = end_index - start_index + 1
+        return grid_wavelengths(start_index), grid_wavelengths(end_index), start_index, num_points
+    
+    def _scan_per_point(self, wavelengths, calibrated_wavelengths, intensities, time_offsets,
+                        start_time, checkpoint=None, run_id=None):
+        """Acquire scan points one at a time through measure_single, returns points acquired"""
+        num_points = len(wavelengths)
+        self.is_scanning = True
+        try:
+            for i in range(num_points):
+                if not self.is_scanning:
+                    print("Scan stopped by user")
+                    return i
+                
+                self.current_wavelength = float(wavelengths[i])
+                
+                # Measure at this wavelength
+                measurement = self.measure_single()
+                calibrated_wavelengths[i] = measurement['calibrated_wavelength']
+                intensities[i] = measurement['intensity']
+                time_offsets[i] = int((self.clock.time() - start_time) * 1e6)
+                self._log_point(
+                    run_id, wavelengths[i], calibrated_wavelengths[i], intensities[i], time_offsets[i]
+                )
+                
+                # Simulate integration time
+                self.clock.sleep(self.integration_time)
+                
+                # Progress indicator
+                if i % 100 == 0:
+                    progress = (i / num_points) * 100
+                    print(f"Scan progress: {progress:.1f}%")
+                
+                if checkpoint is not None:
+                    checkpoint((i + 1) / num_points, None)
+            
+            return num_points
+        finally:
+            self.is_scanning = False
+    
+    def _scan_chunks(self, start_index, num_points, chunk_size, start_time, pace=True):
+        """Generator acquiring a scan in blocks using whole-array operations
         
-        print(f"Starting scan: {start_wl}-{end_wl}nm ({num_points} points)")
+        With pace=False the integration time of each block is not slept here;
+        the consumer is expected to let it pass (see _scan_steps).
+        """
+        summary = ScanSummary()
+        # Points within a block are spaced by the integration time
+        point_offsets = (np.arange(chunk_size) * self.integration_time * 1e6).astype(np.int64)
+        last_report = None
         
-        # Simulate scanning each wavelength point
-        for i in range(num_points):
-            if not self.is_scanning:
-                print("Scan stopped by user")
-                break
+        self.is_scanning = True
+        try:
+            for block_start in range(0, num_points, chunk_size):
+                if not self.is_scanning:
+                    print("Scan stopped by user")
+                    return
                 
-            current_wl = start_wl + i * self.WAVELENGTH_STEP
-            self.current_wavelength = current_wl
-            
-            # Measure at this wavelength
-            measurement = self.measure_single()
-            scan_data.append(measurement)
-            
-            # Simulate integration time
-            time.sleep(self.integration_time)
-            
-            # Progress indicator
-            if i % 100 == 0:
-                progress = (i / num_points) * 100
-                print(f"Scan progress: {progress:.1f}%")
+                if not self.is_lamp_on:
+                    raise RuntimeError("Lamp is off. Cannot measure.")
+                
+                block_stop = min(block_start + chunk_size, num_points)
+                block_size = block_stop - block_start
+                
+                wavelengths = grid_wavelengths(start_index + np.arange(block_start, block_stop))
+                self.current_wavelength = float(wavelengths[-1])
+                
+                calibrated_wavelengths, intensities = self._acquire_block(wavelengths)
+                time_offsets = int((self.clock.time() - start_time) * 1e6) + point_offsets[:block_size]
+                summary.update(wavelengths, intensities)
+                
+                # Simulate integration time for the whole block
+                if pace:
+                    self.clock.sleep(self.integration_time * block_size)
+                
+                # Report progress every SCAN_BLOCK_SIZE points, however small the blocks
+                report = block_start // self.SCAN_BLOCK_SIZE
+                if report != last_report:
+                    last_report = report
+                    progress = (block_start / num_points) * 100
+                    print(f"Scan progress: {progress:.1f}%")
+                
+                yield ScanChunk(
+                    block_start, num_points, wavelengths, calibrated_wavelengths,
+                    intensities, start_time, time_offsets, summary
+                )
+        finally:
+            self.is_scanning = False
+    
+    def _acquire_block(self, wavelengths):
+        """Measure a block of wavelengths in one pass, returns (calibrated_wl, intensity) arrays"""
+        table = self._get_response_table()
+        indices, on_grid = table.indices(wavelengths)
+        calibrated_wl = table.calibrated_wavelengths[indices]
+        intensities = table.responses[indices]
         
-        self.is_scanning = False
+        # Wavelengths off the instrument grid are computed directly
+        if not on_grid.all():
+            off_grid = ~on_grid
+            calibrated_wl[off_grid] = self._apply_wavelength_calibration(wavelengths[off_grid])
+            intensities[off_grid] = self._apply_intensity_calibration(
+                self._simulate_spectral_response_array(calibrated_wl[off_grid])
+            )
         
-        # Store the scan
-        scan_record = {
-            'type': 'full_scan',
-            'start_wavelength': start_wl,
-            'end_wavelength': end_wl,
-            'step_size': self.WAVELENGTH_STEP,
-            'data': scan_data,
-            'timestamp': datetime.now().isoformat(),
-            'sample_present': self.sample_present
-        }
+        intensities = self._add_measurement_noise_array(intensities)
+        return calibrated_wl, intensities
+    
+    def _get_response_table(self):
+        """Response lookup table for the current calibration and sample state
         
-        self.scan_history.append(scan_record)
+        Tables are keyed by the calibration coefficients and sample presence, so
+        they are rebuilt automatically whenever calibration_data or sample_present
+        changes. Tables for both sample states are kept until the calibration changes.
+        """
+        calibration_key = self._calibration_key()
+        key = (calibration_key, self.sample_present)
+        table = self._response_tables.get(key)
         
-        # Update sample spectrum
-        if self.sample_present:
-            self.sample_spectrum = {d['wavelength']: d['intensity'] for d in scan_data}
+        if table is None:
+            # Drop tables built for an outdated calibration
+            self._response_tables = {
+                k: t for k, t in self._response_tables.items() if k[0] == calibration_key
+            }
+            grid = grid_wavelengths(np.arange(
+                grid_index(self.MIN_WAVELENGTH), grid_index(self.MAX_WAVELENGTH) + 1
+            ))
+            calibrated_grid = self._apply_wavelength_calibration(grid)
+            responses = self._apply_intensity_calibration(
+                self._simulate_spectral_response_array(calibrated_grid)
+            )
+            table = ResponseTable(
+                key, self.MIN_WAVELENGTH, self.WAVELENGTH_STEP, grid, calibrated_grid, responses
+            )
+            self._response_tables[key] = table
         
-        return scan_record
+        return table
     
     def measure_absorbance(self):
-        """Calculate absorbance from reference and sample measurements"""
+        """Calculate absorbance from reference and sample measurements
+        
+        Returns an AbsorbanceResult with wavelength, absorbance, transmittance (%),
+        reference and sample intensity columns.
+        """
         if not self.reference_spectrum:
             raise RuntimeError("No reference spectrum available. Run calibration first.")
         
         if not self.sample_spectrum:
             raise RuntimeError("No sample spectrum available. Scan a sample first.")
         
-        absorbance_data = []
+        sample = self.sample_spectrum
+        return self._absorbance(sample, self._reference_for(sample.start_index, sample.stop_index - sample.stride))
+    
+    @staticmethod
+    def _absorbance(sample, reference):
+        """AbsorbanceResult of a sample spectrum against a reference spectrum"""
+        # Same stride and phase on the grid: align by index arithmetic
+        aligned = sample.align(reference)
+        if aligned is not None:
+            start_index, stride, sample_values, reference_values = aligned
+            wavelengths = grid_wavelengths(start_index + np.arange(len(sample_values)) * stride)
+            return AbsorbanceResult.compute(wavelengths, sample_values, reference_values)
+        
+        # Ranges or steps differ: interpolate the reference onto the sample points,
+        # points outside the reference come back as NaN and are masked
+        return AbsorbanceResult.compute(
+            sample.wavelengths,
+            sample.intensities,
+            reference.interpolate(sample.wavelengths),
+            resampled=True
+        )
+    
+    def calibrate_reference(self, start_wl=None, end_wl=None, checkpoint=None, use_cache=True):
+        """Calibrate with reference (blank), `checkpoint` is passed to the reference scan
+        
+        The blank covers start_wl-end_wl (by default a few nm around the current
+        wavelength). With `use_cache`, a still-valid cached blank covering that
+        range is reused instead of scanning; see reference_cache.
+        """
+        return self._run_steps(self._calibration_steps(start_wl, end_wl, checkpoint, use_cache))
+    
+    def _calibration_steps(self, start_wl=None, end_wl=None, checkpoint=None, use_cache=True):
+        """Reference calibration as a step generator (see _run_steps), returns True"""
+        start_wl, end_wl = self._calibration_range(start_wl, end_wl)
+        if use_cache and self._use_cached_reference(start_wl, end_wl):
+            return True
         
-        # Calculate absorbance for each wavelength point
-        for wl, sample_intensity in self.sample_spectrum.items():
-            if wl in self.reference_spectrum:
-                ref_intensity = self.reference_spectrum[wl]
-                
-                if ref_intensity > 0:
-                    transmittance = sample_intensity / ref_intensity
-                    absorbance = -math.log10(transmittance) if transmittance > 0 else float('inf')
-                    
-                    absorbance_data.append({
-                        'wavelength': wl,
-                        'absorbance': absorbance,
-                        'transmittance': transmittance * 100,  # Percentage
-                        'reference_intensity': ref_intensity,
-                        'sample_intensity': sample_intensity
-                    })
-        
-        return absorbance_data
-    
-    def calibrate_reference(self):
-        """Calibrate with reference (blank)"""
         print("Starting reference calibration...")
         
         # Store original sample state
@@ -248,26 +866,25 @@ class SpectralEngine:
         self.sample_present = False
         
         try:
-            # Measure dark current first
-            self.is_lamp_on = False
-            time.sleep(0.1)
-            dark_measurement = self.measure_single()
-            self.background_spectrum = {self.current_wavelength: dark_measurement['intensity']}
+            # Measure dark current first, blocking the lamp rather than
+            # switching it so cached blanks of this lamp session stay valid
+            lamp_on = self._lamp_on
+            self._lamp_on = False
+            try:
+                yield self.clock.monotonic() + 0.1
+                self._store_dark_reading()
+            finally:
+                # Also when stopped during the dark reading
+                self._lamp_on = lamp_on
             
             # Turn lamp on and measure reference
             self.is_lamp_on = True
-            time.sleep(0.5)  # Lamp warm-up
-            
-            # Do a quick scan at current wavelength region
-            scan_result = self.scan_full_range(
-                self.current_wavelength - 5,
-                self.current_wavelength + 5
-            )
+            yield self.clock.monotonic() + 0.5  # Lamp warm-up
             
-            self.reference_spectrum = {d['wavelength']: d['intensity'] for d in scan_result['data']}
-            
-            # Mark as calibrated
-            self.is_calibrated = True
+            # Scan the blank over the calibration range
+            scan_result = yield from self._scan_steps(start_wl, end_wl, checkpoint)
+            self._set_reference(scan_result)
+            self._cache_reference()
             
             print("Reference calibration complete")
             return True
@@ -276,6 +893,100 @@ class SpectralEngine:
             # Restore sample state
             self.sample_present = original_sample_state
     
+    def _store_dark_reading(self):
+        """Measure the dark signal and keep it as background spectrum"""
+        dark_measurement = self._measure_dark()
+        self.background_spectrum = Spectrum()
+        self.background_spectrum[self.current_wavelength] = dark_measurement['intensity']
+    
+    def _reference_range(self):
+        """Wavelength range scanned for the reference, around the current wavelength
+        
+        Near the ends of the instrument range it is clipped to the range.
+        """
+        return (
+            max(self.MIN_WAVELENGTH, self.current_wavelength - 5),
+            min(self.MAX_WAVELENGTH, self.current_wavelength + 5)
+        )
+    
+    def _calibration_range(self, start_wl=None, end_wl=None):
+        """Range of a blank scan, defaulting to _reference_range()"""
+        default_start, default_end = self._reference_range()
+        return (
+            default_start if start_wl is None else start_wl,
+            default_end if end_wl is None else end_wl
+        )
+    
+    def _calibration_key(self):
+        """Calibration coefficients as a hashable key"""
+        return (
+            tuple(self.calibration_data['wavelength_coeffs']),
+            tuple(self.calibration_data['intensity_coeffs'])
+        )
+    
+    def _find_cached_reference(self, start_index, end_index):
+        """Valid cached blank covering grid indices start_index..end_index, or None"""
+        if not self.is_lamp_on:
+            return None
+        return self.reference_cache.find(
+            start_index, end_index, self.WAVELENGTH_STEP, self._calibration_key(),
+            self.lamp_session, self.clock.time()
+        )
+    
+    def _use_cached_reference(self, start_wl, end_wl):
+        """Make a valid cached blank covering the range the reference, returns False if none"""
+        # Blanks are only valid while the lamp is on; calibration switches it
+        # on itself, so an off lamp is a miss rather than an error
+        if not self.is_lamp_on:
+            return False
+        _, _, start_index, num_points = self._validate_scan_range(start_wl, end_wl)
+        entry = self._find_cached_reference(start_index, start_index + num_points - 1)
+        if entry is None:
+            return False
+        
+        self.reference_spectrum = entry.reference
+        self.background_spectrum = entry.background.copy()
+        self.is_calibrated = True
+        print(f"Using cached reference {entry.reference.start_wavelength}-{entry.reference.end_wavelength}nm "
+              f"({self.clock.time() - entry.created:.0f}s old)")
+        return True
+    
+    def _cache_reference(self):
+        """Keep the current reference and dark reading in reference_cache"""
+        reference = self.reference_spectrum
+        if not len(reference):
+            return
+        self.reference_cache.put(CachedReference(
+            reference.start_index, reference.stop_index - reference.stride, self.WAVELENGTH_STEP,
+            self._calibration_key(), self.lamp_session, reference,
+            self.background_spectrum.copy(), self.clock.time()
+        ))
+    
+    def _reference_for(self, start_index, end_index):
+        """Reference spectrum for grid indices start_index..end_index
+        
+        The current reference if it covers them, otherwise a valid cached blank
+        that does (the current reference if there is none).
+        """
+        reference = self.reference_spectrum
+        if len(reference) and reference.start_index <= start_index and end_index < reference.stop_index:
+            return reference
+        entry = self._find_cached_reference(start_index, end_index)
+        return entry.reference if entry is not None else reference
+    
+    def configure_reference_cache(self, max_age):
+        """Set how long (seconds of instrument time) a blank stays valid, None for no limit"""
+        if max_age is not None and max_age < 0:
+            raise ValueError("Validity window cannot be negative")
+        self.reference_cache.max_age = max_age
+    
+    def _set_reference(self, scan_result):
+        """Use a blank scan as reference spectrum and mark the instrument calibrated"""
+        self.reference_spectrum = Spectrum.from_arrays(
+            scan_result.wavelengths, scan_result.intensities
+        )
+        self.is_calibrated = True
+    
     def auto_zero(self):
         """Perform auto-zero at current wavelength"""
         print("Performing auto-zero...")
@@ -289,33 +1000,287 @@ class SpectralEngine:
         print(f"Auto-zero complete at {self.current_wavelength}nm")
         return True
     
-    def kinetic_scan(self, duration=60, interval=1):
-        """Perform kinetic (time-course) measurements"""
+    def kinetic_scan(self, duration=60, interval=1, checkpoint=None):
+        """Perform kinetic (time-course) measurements
+        
+        Points are taken on absolute deadlines (0, interval, 2*interval, ...) of
+        the instrument clock, so measurement cost does not accumulate as drift.
+        Each point is stamped with the time it was actually taken; the lateness
+        and jitter statistics are kept in kinetic_timing. `checkpoint`, if given,
+        is called as checkpoint(progress, kinetic_data) after every point.
+        """
+        return self._run_steps(self._kinetic_steps(duration, interval, checkpoint))
+    
+    def _kinetic_steps(self, duration, interval, checkpoint=None):
+        """Kinetic scan as a step generator (see _run_steps), returns the KineticBuffer"""
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        
         print(f"Starting kinetic scan: {duration} seconds, {interval} second interval")
         
         self.is_scanning = True
-        kinetic_data = []
-        start_time = time.time()
-        measurements_taken = 0
+        kinetic_data = KineticBuffer(self.kinetic_capacity, self.kinetic_spill_path)
+        if kinetic_data.spill_path is not None:
+            print(f"Spilling kinetic points to {kinetic_data.spill_path}")
+        self.kinetic_data = kinetic_data
+        scheduler = DeadlineScheduler(self.clock, interval)
+        run_id = self._begin_log_kinetic(duration, interval)
         
-        while time.time() - start_time < duration and self.is_scanning:
-            measurement = self.measure_single()
-            kinetic_data.append({
-                'time': measurements_taken * interval,
-                'wavelength': measurement['wavelength'],
-                'intensity': measurement['intensity'],
-                'absorbance': None  # Will calculate later if reference exists
-            })
-            
-            measurements_taken += 1
-            time.sleep(interval)
+        try:
+            while self.is_scanning and scheduler.next_deadline() < duration:
+                deadline = scheduler.next_due()
+                yield deadline
+                scheduled_time, actual_time = scheduler.record(deadline)
+                if scheduled_time >= duration:
+                    break
+                
+                measurement = self.measure_single()
+                # Absorbance is left empty, calculated later if a reference exists
+                kinetic_data.append(
+                    actual_time, measurement['wavelength'], measurement['intensity'],
+                    scheduled_time=scheduled_time
+                )
+                self._log_point(
+                    run_id, actual_time, scheduled_time, measurement['wavelength'],
+                    measurement['intensity'], np.nan
+                )
+                if checkpoint is not None:
+                    checkpoint(min(1.0, scheduled_time / duration), kinetic_data)
+        finally:
+            self.kinetic_timing = scheduler.stats()
+            self.is_scanning = False
+            kinetic_data.flush()
+            self._end_log_run(run_id, kinetic_data.total)
         
-        self.is_scanning = False
+        return kinetic_data
+    
+    def kinetic_scan_multi(self, wavelengths, duration=60, interval=1, bidirectional=True,
+                           checkpoint=None):
+        """Kinetic measurements tracking several wavelengths per time point
         
-        # Store kinetic data
-        self.kinetic_data = kinetic_data
+        Each cycle visits all wavelengths along the path planned by move_planner:
+        one sorted sweep per cycle, alternating direction when bidirectional, so
+        the modelled monochromator travel between cycles is minimal. Cycles start
+        on absolute deadlines like kinetic_scan. Results are time x wavelength
+        matrices with columns in the order the wavelengths were given.
+        `checkpoint`, if given, is called as checkpoint(progress, None) after every cycle.
+        """
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        columns = list(dict.fromkeys(wavelengths))
+        if not columns:
+            raise ValueError("At least one wavelength is required")
+        for wavelength in columns:
+            if not (self.MIN_WAVELENGTH <= wavelength <= self.MAX_WAVELENGTH):
+                raise ValueError(f"Wavelength {wavelength}nm out of range")
+        if not self.is_lamp_on:
+            raise RuntimeError("Lamp is off. Cannot measure.")
         
-        return kinetic_data
+        print(f"Starting multi-wavelength kinetic scan: {len(columns)} wavelengths, "
+              f"{duration} seconds, {interval} second interval")
+        
+        column_of = {wavelength: i for i, wavelength in enumerate(columns)}
+        max_cycles = max(1, math.ceil(duration / interval))
+        cycle_times = np.empty(max_cycles)
+        point_times = np.full((max_cycles, len(columns)), np.nan)
+        intensities = np.full((max_cycles, len(columns)), np.nan)
+        move_time = 0.0
+        cycles = 0
+        
+        self.is_scanning = True
+        scheduler = DeadlineScheduler(self.clock, interval)
+        try:
+            while self.is_scanning and cycles < max_cycles and scheduler.next_deadline() < duration:
+                scheduled_time, actual_time = scheduler.wait()
+                if scheduled_time >= duration:
+                    break
+                
+                cycle_times[cycles] = actual_time
+                path = self.move_planner.plan(columns, self.current_wavelength, bidirectional)
+                for wavelength in path:
+                    move_time += self.move_planner.move_time(self.current_wavelength, wavelength)
+                    self.set_wavelength(wavelength, verbose=False)
+                    column = column_of[wavelength]
+                    intensities[cycles, column] = self.measure_raw()
+                    point_times[cycles, column] = self.clock.monotonic() - scheduler.start
+                cycles += 1
+                if checkpoint is not None:
+                    checkpoint(min(1.0, scheduled_time / duration), None)
+        finally:
+            self.is_scanning = False
+        
+        self.kinetic_matrix = {
+            'wavelengths': np.array(columns),
+            'times': cycle_times[:cycles],
+            'point_times': point_times[:cycles],
+            'intensities': intensities[:cycles],
+            'move_time': move_time,
+            'bidirectional': bidirectional,
+            'timing': scheduler.stats()
+        }
+        return self.kinetic_matrix
+    
+    def photometric_measure(self, wavelengths, replicates=1):
+        """Photometric mode: measure intensity (and absorbance) at a set of wavelengths
+        
+        The wavelengths are visited along the move_planner path, one sorted sweep
+        from the nearer end, so repeating a panel over many samples sweeps back and
+        forth instead of returning to the start. `replicates` readings are averaged
+        at each stop. Absorbance uses the reference spectrum (or a cached blank
+        covering the panel) where it covers a wavelength and is NaN elsewhere. Arrays follow the requested order.
+        """
+        columns = list(dict.fromkeys(wavelengths))
+        if not columns:
+            raise ValueError("At least one wavelength is required")
+        if replicates < 1:
+            raise ValueError("Replicates must be at least 1")
+        for wavelength in columns:
+            if not (self.MIN_WAVELENGTH <= wavelength <= self.MAX_WAVELENGTH):
+                raise ValueError(f"Wavelength {wavelength}nm out of range")
+        if not self.is_lamp_on:
+            raise RuntimeError("Lamp is off. Cannot measure.")
+        
+        column_of = {wavelength: i for i, wavelength in enumerate(columns)}
+        path = self.move_planner.plan(columns, self.current_wavelength)
+        move_time = self.move_planner.path_time(path, self.current_wavelength)
+        intensities = np.empty(len(columns))
+        
+        for wavelength in path:
+            self.set_wavelength(wavelength, verbose=False)
+            base_intensity = self._noise_free_intensity(wavelength)
+            readings = self._add_measurement_noise_array(np.full(replicates, base_intensity))
+            intensities[column_of[wavelength]] = readings.mean()
+            self.clock.sleep(self.integration_time * replicates)
+        
+        wavelengths = np.array(columns)
+        reference = self._reference_for(grid_index(min(columns)), grid_index(max(columns))).interpolate(wavelengths)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            transmittance = np.where(reference > 0, intensities / reference, np.nan)
+            absorbance = np.where(transmittance > 0, -np.log10(transmittance), np.inf)
+        absorbance[np.isnan(transmittance)] = np.nan
+        
+        return {
+            'wavelengths': wavelengths,
+            'intensities': intensities,
+            'absorbance': absorbance,
+            'transmittance': transmittance * 100,  # Percentage
+            'path': path,
+            'move_time': move_time,
+            'sample_present': self.sample_present,
+            'timestamp': self.clock.now().isoformat()
+        }
+    
+    def run_batch(self, samples, start_wl=None, end_wl=None, blank_position=0,
+                  output_dir=None, checkpoint=None):
+        """Autosampler batch: one shared reference, then a scan of every sample
+        
+        `samples` is a list of (name, cell position) pairs. The blank at
+        `blank_position` is calibrated once over the scan range (a still-valid
+        cached blank is reused) and used for every sample; the scan range
+        defaults to the calibrate_reference range. While the cell motor
+        moves to the next sample, absorbance of the previous one is computed and,
+        with `output_dir` set, saved to <output_dir>/<name>.spec on a worker
+        thread. `checkpoint`, if given, is called as checkpoint(progress, rows)
+        during the blank and sample scans (see scan_full_range) and after every
+        sample, so a job running the batch can be preempted or cancelled within
+        a scan. Returns the summary: one row dict per sample.
+        """
+        samples = list(samples)
+        if not samples:
+            raise ValueError("At least one sample is required")
+        for position in [blank_position] + [position for _, position in samples]:
+            self.cell_motor.start_move(position)  # Check positions before starting
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        original_sample_state = self.sample_present
+        batch_start = self.clock.time()
+        rows = []
+        
+        print(f"Starting batch: {len(samples)} samples")
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            try:
+                # Shared reference from the blank cell
+                self.cell_motor.move_to(blank_position)
+                start_wl, end_wl = self._calibration_range(start_wl, end_wl)
+                self.calibrate_reference(
+                    start_wl, end_wl, checkpoint=self._batch_checkpoint(checkpoint, None, len(samples), rows)
+                )
+                reference = self.reference_spectrum
+                
+                pending = []
+                for i, (name, position) in enumerate(samples):
+                    move_time = self.cell_motor.move_to(position)
+                    self.sample_present = True
+                    scan = self.scan_full_range(
+                        start_wl, end_wl, sample_name=name,
+                        checkpoint=self._batch_checkpoint(checkpoint, i, len(samples), rows)
+                    )
+                    
+                    # Processing and saving overlap the next move and scan
+                    pending.append(pool.submit(
+                        self._process_batch_sample, name, position, scan, reference, move_time, output_dir
+                    ))
+                    while pending and pending[0].done():
+                        rows.append(pending.pop(0).result())
+                    if checkpoint is not None:
+                        checkpoint((i + 1) / len(samples), rows)
+                
+                for future in pending:
+                    rows.append(future.result())
+            finally:
+                self.sample_present = original_sample_state
+        
+        elapsed = self.clock.time() - batch_start
+        print(f"Batch complete: {len(rows)} samples in {elapsed:.1f}s")
+        return rows
+    
+    @staticmethod
+    def _batch_checkpoint(checkpoint, done, count, rows):
+        """Scan checkpoint reporting batch progress while sample `done` of `count` is scanned
+        
+        With done=None (the blank) progress stays at 0.
+        """
+        if checkpoint is None:
+            return None
+        if done is None:
+            return lambda progress, chunk: checkpoint(0.0, rows)
+        return lambda progress, chunk: checkpoint((done + progress) / count, rows)
+    
+    def _process_batch_sample(self, name, position, scan, reference, move_time, output_dir):
+        """Absorbance summary of one batch sample, saved if `output_dir` is set (worker thread)"""
+        result = self._absorbance(Spectrum.from_arrays(scan.wavelengths, scan.intensities), reference)
+        finite = np.isfinite(result.absorbance)
+        row = {
+            'name': name,
+            'position': position,
+            'scan_id': scan.scan_id,
+            'points': len(scan),
+            'move_time': move_time,
+            'peak_wavelength': None,
+            'peak_absorbance': None,
+            'mean_absorbance': None,
+            'file': None
+        }
+        if finite.any():
+            peak = int(np.argmax(np.where(finite, result.absorbance, -np.inf)))
+            row['peak_wavelength'] = float(result.wavelengths[peak])
+            row['peak_absorbance'] = float(result.absorbance[peak])
+            row['mean_absorbance'] = float(result.absorbance[finite].mean())
+        
+        if output_dir is not None:
+            row['file'] = os.path.join(output_dir, f"{name}.spec")
+            with SpectralFileWriter(row['file']) as writer:
+                writer.add_json('metadata', dict(self._save_metadata(), sample_name=name, cell_position=position))
+                writer.add_array(
+                    'reference_spectrum', reference.intensities,
+                    {'start_index': reference.start_index, 'stride': reference.stride}
+                )
+                writer.add_json('recent_scan', scan.metadata())
+                for column in ScanRecord.COLUMNS:
+                    writer.add_array(f'recent_scan/{column}', getattr(scan, column))
+                writer.add_array('absorbance', np.vstack((result.wavelengths, result.absorbance)))
+        return row
     
     def calculate_concentration(self, absorbance, molar_absorptivity=1.0, path_length=1.0):
         """Calculate concentration using Beer-Lambert law"""
@@ -331,48 +1296,272 @@ class SpectralEngine:
         concentration = absorbance / (molar_absorptivity * path_length)
         return concentration
     
-    def save_data(self, filename):
-        """Save current data to file"""
+    # Spectra saved as sections of the binary format
+    SAVED_SPECTRA = ('reference_spectrum', 'sample_spectrum', 'background_spectrum')
+    
+    def save_data(self, filename, compress=False):
+        """Save current data to file
+        
+        Files ending in .json are written as JSON, anything else in the binary
+        format of SpectralFile (optionally zlib-compressed).
+        """
+        if filename.lower().endswith('.json'):
+            self._save_json(filename)
+        else:
+            self._save_binary(filename, compress)
+        
+        print(f"Data saved to {filename}")
+        return True
+    
+    def _save_metadata(self):
+        return {
+            'timestamp': self.clock.now().isoformat(),
+            'current_wavelength': self.current_wavelength,
+            'is_calibrated': self.is_calibrated,
+            'sample_present': self.sample_present,
+            'instrument': 'Spectrophotometer OS v1.0'
+        }
+    
+    def _save_json(self, filename):
         data_to_save = {
-            'metadata': {
-                'timestamp': datetime.now().isoformat(),
-                'current_wavelength': self.current_wavelength,
-                'is_calibrated': self.is_calibrated,
-                'sample_present': self.sample_present,
-                'instrument': 'Spectrophotometer OS v1.0'
-            },
-            'reference_spectrum': self.reference_spectrum,
-            'sample_spectrum': self.sample_spectrum,
-            'background_spectrum': self.background_spectrum,
+            'metadata': self._save_metadata(),
+            'reference_spectrum': self.reference_spectrum.to_dict(),
+            'sample_spectrum': self.sample_spectrum.to_dict(),
+            'background_spectrum': self.background_spectrum.to_dict(),
             'calibration_data': self.calibration_data,
-            'recent_scan': self.scan_history[-1] if self.scan_history else None,
-            'kinetic_data': self.kinetic_data
+            'recent_scan': self.scan_history[-1].to_dict() if self.scan_history else None,
+            'kinetic_data': self.kinetic_data.to_list()
         }
         
         with open(filename, 'w') as f:
             json.dump(data_to_save, f, indent=2)
+    
+    def _save_binary(self, filename, compress=False):
+        with SpectralFileWriter(filename, compress) as writer:
+            writer.add_json('metadata', self._save_metadata())
+            writer.add_json('calibration_data', self.calibration_data)
+            
+            for name in self.SAVED_SPECTRA:
+                spectrum = getattr(self, name)
+                writer.add_array(
+                    name, spectrum.intensities,
+                    {'start_index': spectrum.start_index, 'stride': spectrum.stride}
+                )
+            
+            if self.scan_history:
+                scan = self.scan_history[-1]
+                writer.add_json('recent_scan', scan.metadata())
+                for column in ScanRecord.COLUMNS:
+                    writer.add_array(f'recent_scan/{column}', getattr(scan, column))
+            
+            writer.add_array(
+                'kinetic_data', self.kinetic_data.window(),
+                {'columns': list(KineticBuffer.COLUMNS)}
+            )
+    
+    def load_data(self, filename, sections=None):
+        """Load data from file, JSON, binary or session journal as recognized from the file contents
         
-        print(f"Data saved to {filename}")
+        With `sections` (e.g. ['reference', 'calibration']), only those sections
+        of a JSON or binary file are read, see SessionReader.
+        """
+        if sections is not None:
+            self._load_sections(filename, sections)
+        elif is_spectral_file(filename):
+            self._load_binary(filename)
+        elif is_journal_file(filename):
+            counts = SessionJournal.replay(filename, self)
+            print(f"Replayed session journal: {counts['scans']} scans, {counts['kinetic_points']} kinetic points")
+        elif is_measurement_log(filename):
+            self.recover_measurements(filename)
+        else:
+            self._load_json(filename)
+        
+        print(f"Data loaded from {filename}")
         return True
     
-    def load_data(self, filename):
-        """Load data from file"""
+    def _load_sections(self, filename, sections):
+        with SessionReader(filename) as reader:
+            for section in sections:
+                key = reader.key(section)
+                if key == 'kinetic_data':
+                    self.kinetic_data = reader.read_kinetic(self.kinetic_capacity)
+                    continue
+                value = reader.read(key)
+                if key in self.SAVED_SPECTRA:
+                    setattr(self, key, value if value is not None else Spectrum())
+                elif key == 'calibration_data' and value is not None:
+                    self.calibration_data = value
+                elif key == 'recent_scan' and value is not None:
+                    self._add_to_history(value)
+    
+    def _load_json(self, filename):
         with open(filename, 'r') as f:
             data = json.load(f)
         
         # Update engine state
-        self.reference_spectrum = data.get('reference_spectrum', {})
-        self.sample_spectrum = data.get('sample_spectrum', {})
-        self.background_spectrum = data.get('background_spectrum', {})
+        # Spectrum.from_dict also reads legacy files keyed by wavelength strings
+        self.reference_spectrum = Spectrum.from_dict(data.get('reference_spectrum'))
+        self.sample_spectrum = Spectrum.from_dict(data.get('sample_spectrum'))
+        self.background_spectrum = Spectrum.from_dict(data.get('background_spectrum'))
         self.calibration_data = data.get('calibration_data', self.calibration_data)
         
         if 'recent_scan' in data and data['recent_scan']:
-            self.scan_history.append(data['recent_scan'])
+            self._add_to_history(ScanRecord.from_dict(data['recent_scan']))
         
-        self.kinetic_data = data.get('kinetic_data', [])
+        self.kinetic_data = KineticBuffer.from_records(
+            data.get('kinetic_data', []), self.kinetic_capacity
+        )
+    
+    def _load_binary(self, filename):
+        reader = SpectralFileReader(filename)
         
-        print(f"Data loaded from {filename}")
-        return True
+        for name in self.SAVED_SPECTRA:
+            if name in reader:
+                attrs = reader.attrs(name)
+                setattr(self, name, Spectrum(attrs['start_index'], reader.read_array(name), attrs['stride']))
+        if 'calibration_data' in reader:
+            self.calibration_data = reader.read_json('calibration_data')
+        
+        if 'recent_scan' in reader:
+            columns = {column: reader.read_array(f'recent_scan/{column}') for column in ScanRecord.COLUMNS}
+            self._add_to_history(ScanRecord.from_columns(reader.read_json('recent_scan'), columns))
+        
+        if 'kinetic_data' in reader:
+            self.kinetic_data = KineticBuffer.from_columns(
+                reader.read_array('kinetic_data'), self.kinetic_capacity
+            )
+        
+        if SpectralArchive.INDEX_SECTION in reader:
+            self.open_archive(filename)
+    
+    def export_archive(self, filename, scan_ids=None):
+        """Write stored scans to a memory-mappable archive, returns the number written
+        
+        Scans come from the attached scan_store (all, or those in `scan_ids`),
+        otherwise from scan_history. They are streamed one at a time.
+        """
+        if self.scan_store is not None:
+            if scan_ids is None:
+                scan_ids = range(len(self.scan_store))
+            records = (self.scan_store.get(scan_id) for scan_id in scan_ids)
+        elif scan_ids is None:
+            records = iter(self.scan_history)
+        else:
+            records = (self.scan_history[scan_id] for scan_id in scan_ids)
+        
+        count = SpectralArchive.write(filename, records)
+        return count
+    
+    def open_archive(self, filename):
+        """Map an archive of historical scans; scan data is read only when accessed"""
+        archive = SpectralArchive(filename)
+        if self.archive is not None:
+            self.archive.close()
+        self.archive = archive
+        return archive
+    
+    def attach_measurement_log(self, measurement_log):
+        """Stream every measurement into a write-ahead MeasurementLog from now on (None to detach)"""
+        self.measurement_log = measurement_log
+    
+    def _begin_log_scan(self, start_wl, end_wl, num_points, start_time, sample_name=None):
+        """Log the start of a scan, returns the run ID or None without a measurement log"""
+        if self.measurement_log is None:
+            return None
+        return self.measurement_log.begin_run(
+            'scan', start_wavelength=start_wl, end_wavelength=end_wl, step_size=self.WAVELENGTH_STEP,
+            num_points=num_points, start_time=start_time, sample_present=self.sample_present,
+            sample_name=sample_name, timestamp=self.clock.now().isoformat()
+        )
+    
+    def _begin_log_kinetic(self, duration, interval):
+        """Log the start of a kinetic run, returns the run ID or None without a measurement log"""
+        if self.measurement_log is None:
+            return None
+        return self.measurement_log.begin_run(
+            'kinetic', duration=duration, interval=interval, start_time=self.clock.time(),
+            wavelength=self.current_wavelength
+        )
+    
+    def _log_points(self, run_id, *columns):
+        """Log points of a run started with _begin_log_scan/_begin_log_kinetic"""
+        if run_id is not None and self.measurement_log is not None:
+            self.measurement_log.points(run_id, *columns)
+    
+    def _log_point(self, run_id, *values):
+        if run_id is not None and self.measurement_log is not None:
+            self.measurement_log.point(run_id, *values)
+    
+    def _end_log_run(self, run_id, points):
+        if run_id is not None and self.measurement_log is not None:
+            self.measurement_log.end_run(run_id, points)
+    
+    def recover_measurements(self, filename):
+        """Rebuild scans and the last kinetic run from a measurement log, e.g. after a crash
+        
+        Interrupted runs are recovered up to their last committed point. Scans
+        are added to scan_history only (not to the scan store).
+        """
+        runs = MeasurementLog.recover(filename)
+        for run in runs:
+            rows = run['rows']
+            if run['type'] == 'scan' and len(rows):
+                self._add_to_history(ScanRecord(
+                    run['start_wavelength'], run['end_wavelength'], run['step_size'],
+                    rows[:, 0], rows[:, 1], rows[:, 2], run['start_time'], rows[:, 3],
+                    sample_present=run['sample_present'], timestamp=run['timestamp'],
+                    sample_name=run['sample_name']
+                ))
+            elif run['type'] == 'kinetic':
+                self.kinetic_data = KineticBuffer.from_columns(
+                    rows.T if len(rows) else np.empty((len(KineticBuffer.COLUMNS), 0)),
+                    self.kinetic_capacity
+                )
+        if self.scan_store is not None and len(self.scan_history) > self.HISTORY_LIMIT:
+            del self.scan_history[:-self.HISTORY_LIMIT]
+        
+        interrupted = sum(1 for run in runs if not run['complete'])
+        print(f"Recovered {len(runs)} runs from {filename} ({interrupted} interrupted)")
+        return runs
+    
+    def attach_store(self, scan_store):
+        """Append every scan to a persistent ScanStore from now on (None to detach)"""
+        self.scan_store = scan_store
+        if scan_store is not None and len(self.scan_history) > self.HISTORY_LIMIT:
+            del self.scan_history[:-self.HISTORY_LIMIT]
+    
+    def configure_kinetic_storage(self, capacity=None, spill_path=None):
+        """Set the in-memory capacity and optional spill file for kinetic runs"""
+        if capacity is not None:
+            if capacity < 1:
+                raise ValueError("Capacity must be at least 1")
+            self.kinetic_capacity = capacity
+        self.kinetic_spill_path = spill_path
+    
+    def set_seed(self, seed=None):
+        """Restart measurement noise from `seed` for reproducible runs"""
+        self.noise.reseed(seed)
+        return self.noise.seed
+    
+    def save_state(self):
+        """Snapshot of the instrument state an interrupting operation may change"""
+        return {
+            'current_wavelength': self.current_wavelength,
+            'target_wavelength': self.target_wavelength,
+            'sample_present': self.sample_present,
+            'is_lamp_on': self.is_lamp_on,
+            'is_scanning': self.is_scanning
+        }
+    
+    def restore_state(self, state):
+        """Return to a state from save_state(), moving the monochromator back if needed"""
+        if self.current_wavelength != state['current_wavelength']:
+            self.set_wavelength(state['current_wavelength'], verbose=False)
+        self.target_wavelength = state['target_wavelength']
+        self.sample_present = state['sample_present']
+        self.is_lamp_on = state['is_lamp_on']
+        self.is_scanning = state['is_scanning']
     
     def get_status(self):
         """Get current engine status"""
@@ -388,8 +1577,12 @@ class SpectralEngine:
             'integration_time': self.integration_time,
             'has_reference': bool(self.reference_spectrum),
             'has_sample': bool(self.sample_spectrum),
-            'scan_history_count': len(self.scan_history),
-            'kinetic_data_points': len(self.kinetic_data)
+            'scan_history_count': (
+                len(self.scan_store) if self.scan_store is not None else len(self.scan_history)
+            ),
+            'kinetic_data_points': len(self.kinetic_data),
+            'clock_mode': self.clock.describe(),
+            'instrument_time': self.clock.monotonic()
         }
     
     def _simulate_spectral_response(self, wavelength):
@@ -418,6 +1611,26 @@ class SpectralEngine:
         
         return max(0, response)
     
+    def _simulate_spectral_response_array(self, wavelengths):
+        """Vectorized version of _simulate_spectral_response for an array of wavelengths"""
+        # Deuterium UV region below 350nm, tungsten peaks above
+        uv_response = 1000 * np.exp(-0.002 * (wavelengths - 250)**2)
+        vis_response = (
+            800 * np.exp(-0.0001 * (wavelengths - 550)**2)
+            + 200 * np.exp(-0.0002 * (wavelengths - 750)**2)
+            + 100 * np.exp(-0.0003 * (wavelengths - 900)**2)
+        )
+        response = np.where(wavelengths < 350, uv_response, vis_response)
+        
+        # Add sample absorption if present
+        if self.sample_present:
+            absorption = 0.8
+            absorption = absorption * (1 - 0.3 * np.exp(-0.001 * (wavelengths - 450)**2))
+            absorption = absorption * (1 - 0.5 * np.exp(-0.0005 * (wavelengths - 650)**2))
+            response = response * absorption
+        
+        return np.maximum(response, 0)
+    
     def _apply_wavelength_calibration(self, wavelength):
         """Apply wavelength calibration polynomial"""
         a, b, c = self.calibration_data['wavelength_coeffs']
@@ -432,21 +1645,17 @@ class SpectralEngine:
     
     def _add_measurement_noise(self, intensity):
         """Add realistic measurement noise"""
-        # Dark current noise (Poisson)
-        dark_noise = np.random.poisson(self.dark_current * 1000) / 1000
-        
-        # Readout noise (Gaussian)
-        readout_noise = np.random.normal(0, self.readout_noise)
-        
-        # Photometric noise (proportional to sqrt(intensity))
-        if intensity > 0:
-            photometric_noise = np.random.normal(0, self.photometric_noise * math.sqrt(intensity))
-        else:
-            photometric_noise = 0
-        
-        noisy_intensity = intensity + dark_noise + readout_noise + photometric_noise
-        
-        return max(0, noisy_intensity)
+        # Dark current (Poisson), readout (Gaussian) and photometric noise
+        # proportional to sqrt(intensity), drawn from the engine's seeded buffer
+        return self.noise.apply_single(
+            intensity, self.dark_current, self.readout_noise, self.photometric_noise
+        )
+    
+    def _add_measurement_noise_array(self, intensities):
+        """Vectorized version of _add_measurement_noise for an array of intensities"""
+        return self.noise.apply(
+            intensities, self.dark_current, self.readout_noise, self.photometric_noise
+        )
     
     def perform_self_test(self):
         """Perform instrument self-test"""
@@ -465,7 +1674,7 @@ class SpectralEngine:
         return {
             'passed': all_passed,
             'tests': tests,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self.clock.now().isoformat()
         }
     
     def _test_wavelength_range(self):
@@ -483,7 +1692,7 @@ class SpectralEngine:
         """Test lamp functionality"""
         try:
             self.is_lamp_on = True
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
             measurement = self.measure_single()
             self.is_lamp_on = False
             return measurement['intensity'] > 0
@@ -495,11 +1704,11 @@ class SpectralEngine:
         try:
             # Measure with lamp off (should get low signal)
             self.is_lamp_on = False
-            dark_measurement = self.measure_single()
+            dark_measurement = self._measure_dark()
             
             # Measure with lamp on (should get higher signal)
             self.is_lamp_on = True
-            time.sleep(0.2)
+            self.clock.sleep(0.2)
             light_measurement = self.measure_single()
             self.is_lamp_on = False
             
@@ -528,4 +1737,17 @@ class SpectralEngine:
             os.unlink(temp_file)
             return loaded == test_data
         except:
-            return False
\ No newline at end of file
+            return False
+
+
+def _acquire_segment(responses, seeds, block_size, noise_parameters):
+    """Process pool worker: add measurement noise to the noise-free responses of one scan segment
+    
+    Every block_size points draw from their own stream in `seeds`, so the noise
+    of a point does not depend on how the scan was split into segments.
+    """
+    intensities = np.empty(len(responses))
+    for i, seed in enumerate(seeds):
+        block = slice(i * block_size, (i + 1) * block_size)
+        intensities[block] = NoiseGenerator(seed, block_size).apply(responses[block], *noise_parameters)
+    return intensities
@@ -0,0 +1,202 @@
+import json
+import struct
+import zlib
+import numpy as np
+
+# Binary container used by SpectralEngine.save_data/load_data
+#
+#   header   32 bytes: magic, version, flags, TOC offset and length (HEADER_FORMAT)
+#   sections raw little-endian arrays or UTF-8 JSON, each starting 8-byte aligned
+#   TOC      JSON list of section entries (name, kind, offset, length, dtype,
+#            shape, compression, attrs), written last so sections can be streamed
+#
+# Uncompressed array sections can be memory-mapped in place.
+
+MAGIC = b'SPECTOS\x00'
+VERSION = 1
+HEADER_FORMAT = '<8sHHIQQ'  # magic, version, flags, reserved, toc_offset, toc_length
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ALIGNMENT = 8
+
+FLAG_COMPRESSED = 0x1  # at least one section is zlib-compressed
+
+
+def is_spectral_file(path):
+    """True if the file starts with the binary container magic"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class SpectralFileWriter:
+    """Writes named JSON and array sections into a binary container
+
+    With `compress` set, sections are zlib-compressed (compression level
+    `level`). Use as a context manager or call close() to write the TOC.
+    """
+
+    def __init__(self, path, compress=False, level=6):
+        self.path = path
+        self.compress = compress
+        self.level = level
+        self.toc = []
+        self.flags = 0
+        self._file = open(path, 'wb')
+        self._file.write(b'\0' * HEADER_SIZE)  # Patched in close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add_json(self, name, obj):
+        """Add a JSON-serializable object as a section"""
+        self._add(name, 'json', json.dumps(obj).encode('utf-8'))
+
+    def add_array(self, name, array, attrs=None):
+        """Add a numpy array as a section of raw little-endian values"""
+        array = np.asarray(array)
+        dtype = array.dtype.newbyteorder('<') if array.dtype.byteorder == '>' else array.dtype
+        data = np.ascontiguousarray(array, dtype=dtype).tobytes()
+        self._add(name, 'array', data, dtype=dtype.str, shape=list(array.shape), attrs=attrs)
+
+    def add_stream(self, name, chunks, dtype='|u1', attrs=None, compress=None):
+        """Add an array section from an iterable of byte chunks, without holding it in memory
+
+        `compress` overrides the writer setting, e.g. False to keep a section
+        mappable in a compressed file.
+        """
+        compress = self.compress if compress is None else compress
+        compressor = zlib.compressobj(self.level) if compress else None
+        offset = self._start_section(name)
+        raw_length = 0
+        for chunk in chunks:
+            raw_length += len(chunk)
+            self._file.write(compressor.compress(chunk) if compressor else chunk)
+        if compressor:
+            self._file.write(compressor.flush())
+
+        dtype = np.dtype(dtype)
+        self._end_section(
+            name, 'array', offset, raw_length, 'zlib' if compressor else None,
+            dtype=dtype.str, shape=[raw_length // dtype.itemsize], attrs=attrs
+        )
+
+    def _add(self, name, kind, data, dtype=None, shape=None, attrs=None):
+        raw_length = len(data)
+        compression = None
+        if self.compress:
+            data = zlib.compress(data, self.level)
+            compression = 'zlib'
+
+        offset = self._start_section(name)
+        self._file.write(data)
+        self._end_section(name, kind, offset, raw_length, compression, dtype, shape, attrs)
+
+    def _start_section(self, name):
+        """Check the name and pad to the next section start, returns its offset"""
+        if any(entry['name'] == name for entry in self.toc):
+            raise ValueError(f"Duplicate section: {name}")
+
+        # Align the section start so arrays can be mapped without copying
+        position = self._file.tell()
+        padding = -position % ALIGNMENT
+        self._file.write(b'\0' * padding)
+        return position + padding
+
+    def _end_section(self, name, kind, offset, raw_length, compression,
+                     dtype=None, shape=None, attrs=None):
+        if compression is not None:
+            self.flags |= FLAG_COMPRESSED
+        entry = {
+            'name': name,
+            'kind': kind,
+            'offset': offset,
+            'length': self._file.tell() - offset,
+            'raw_length': raw_length,
+            'compression': compression
+        }
+        if dtype is not None:
+            entry['dtype'] = dtype
+            entry['shape'] = shape
+        if attrs:
+            entry['attrs'] = attrs
+        self.toc.append(entry)
+
+    def close(self):
+        """Write the TOC and the header"""
+        if self._file is None:
+            return
+        toc = json.dumps(self.toc).encode('utf-8')
+        toc_offset = self._file.tell()
+        self._file.write(toc)
+        self._file.seek(0)
+        self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, self.flags, 0, toc_offset, len(toc)))
+        self._file.close()
+        self._file = None
+
+
+class SpectralFileReader:
+    """Reads sections of a binary container by name, without loading the rest"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise ValueError(f"{path} is too short to be a spectral data file")
+            magic, version, flags, _, toc_offset, toc_length = struct.unpack(HEADER_FORMAT, header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a spectral data file")
+            if version > VERSION:
+                raise ValueError(f"Unsupported file version {version} (newest supported: {VERSION})")
+            f.seek(toc_offset)
+            toc = f.read(toc_length)
+
+        self.version = version
+        self.flags = flags
+        self.toc = {entry['name']: entry for entry in json.loads(toc.decode('utf-8'))}
+
+    def names(self):
+        """Section names in file order"""
+        return list(self.toc)
+
+    def __contains__(self, name):
+        return name in self.toc
+
+    def entry(self, name):
+        """TOC entry of a section (offset, length, dtype, shape, compression, attrs)"""
+        return self.toc[name]
+
+    def attrs(self, name):
+        """Attributes stored with a section"""
+        return self.toc[name].get('attrs', {})
+
+    def read_bytes(self, name):
+        """Decompressed contents of a section"""
+        entry = self.toc[name]
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            data = f.read(entry['length'])
+        if entry['compression'] == 'zlib':
+            data = zlib.decompress(data)
+        elif entry['compression'] is not None:
+            raise ValueError(f"Unknown compression: {entry['compression']}")
+        return data
+
+    def read_json(self, name):
+        return json.loads(self.read_bytes(name).decode('utf-8'))
+
+    def read_array(self, name):
+        """Section as a numpy array (a fresh, writable copy)"""
+        entry = self.toc[name]
+        if entry['kind'] != 'array':
+            raise ValueError(f"Section {name} is not an array")
+        dtype = np.dtype(entry['dtype'])
+        if entry['compression'] is None:
+            with open(self.path, 'rb') as f:
+                f.seek(entry['offset'])
+                array = np.fromfile(f, dtype=dtype, count=entry['raw_length'] // dtype.itemsize)
+        else:
+            array = np.frombuffer(self.read_bytes(name), dtype=dtype).copy()
+        return array.reshape(entry['shape'])
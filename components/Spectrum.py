@@ -0,0 +1,239 @@
+import math
+import numpy as np
+
+# Canonical instrument wavelength axis shared by every spectrum
+GRID_ORIGIN = 190.0   # nm, wavelength of grid index 0
+GRID_STEP = 0.1       # nm between neighbouring grid points
+GRID_DIVISOR = 10     # 1 / GRID_STEP, wavelengths are computed as a division to avoid drift
+
+
+def grid_index(wavelength):
+    """Nearest grid index of a wavelength"""
+    return int(round((wavelength - GRID_ORIGIN) * GRID_DIVISOR))
+
+
+def grid_wavelengths(indices):
+    """Wavelengths of grid indices (scalar or array)"""
+    return (GRID_ORIGIN * GRID_DIVISOR + indices) / GRID_DIVISOR
+
+
+class Spectrum:
+    """Intensities on the canonical wavelength axis, indexed by integer grid position
+
+    Point i of the spectrum sits at grid index start_index + i * stride. Because
+    every spectrum shares the same axis, aligning or slicing two spectra is pure
+    index arithmetic and never depends on float equality. Missing points are NaN.
+    Dict-style access by wavelength is kept for code written against the old
+    float-keyed dicts.
+    """
+    __slots__ = ('start_index', 'stride', 'intensities')
+
+    def __init__(self, start_index=0, intensities=(), stride=1):
+        if stride < 1:
+            raise ValueError("Stride must be at least 1")
+        self.start_index = int(start_index)
+        self.stride = int(stride)
+        self.intensities = np.asarray(intensities, dtype=np.float64)
+
+    @classmethod
+    def from_arrays(cls, wavelengths, intensities):
+        """Build a spectrum from wavelength/intensity arrays, snapping wavelengths to the grid"""
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        intensities = np.asarray(intensities, dtype=np.float64)
+        if len(wavelengths) == 0:
+            return cls()
+
+        indices = np.rint((wavelengths - GRID_ORIGIN) * GRID_DIVISOR).astype(np.int64)
+        order = np.argsort(indices, kind='stable')
+        indices, intensities = indices[order], intensities[order]
+        start_index = int(indices[0])
+
+        # Regularly spaced points keep their stride, anything else is placed on a stride-1 axis
+        steps = np.diff(indices)
+        if len(steps) and steps[0] > 0 and np.all(steps == steps[0]):
+            return cls(start_index, intensities, int(steps[0]))
+        if len(steps) == 0:
+            return cls(start_index, intensities)
+
+        values = np.full(int(indices[-1]) - start_index + 1, np.nan)
+        values[indices - start_index] = intensities
+        return cls(start_index, values)
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Build a spectrum from a {wavelength: intensity} dict (keys may be strings after JSON)"""
+        if not mapping:
+            return cls()
+        wavelengths = [float(wl) for wl in mapping.keys()]
+        return cls.from_arrays(wavelengths, list(mapping.values()))
+
+    def copy(self):
+        """Independent copy, e.g. to keep a spectrum that may later be changed in place"""
+        return Spectrum(self.start_index, self.intensities.copy(), self.stride)
+
+    # Axis
+
+    def __len__(self):
+        return len(self.intensities)
+
+    @property
+    def stop_index(self):
+        """Grid index one stride past the last point"""
+        return self.start_index + len(self.intensities) * self.stride
+
+    @property
+    def indices(self):
+        return self.start_index + np.arange(len(self.intensities)) * self.stride
+
+    @property
+    def wavelengths(self):
+        return grid_wavelengths(self.indices)
+
+    @property
+    def start_wavelength(self):
+        return grid_wavelengths(self.start_index)
+
+    @property
+    def end_wavelength(self):
+        return grid_wavelengths(self.stop_index - self.stride)
+
+    def _position(self, wavelength):
+        """Array position of a wavelength, or None if it is not a point of this spectrum"""
+        offset = grid_index(wavelength) - self.start_index
+        if offset < 0 or offset % self.stride:
+            return None
+        position = offset // self.stride
+        if position >= len(self.intensities):
+            return None
+        return position
+
+    # Alignment and slicing
+
+    def slice(self, start_wl=None, end_wl=None):
+        """View of the points between two wavelengths (inclusive), without copying"""
+        first = 0
+        last = len(self.intensities)
+        if start_wl is not None:
+            first = max(0, -(-(grid_index(start_wl) - self.start_index) // self.stride))
+        if end_wl is not None:
+            last = min(last, (grid_index(end_wl) - self.start_index) // self.stride + 1)
+        last = max(first, last)
+        return Spectrum(self.start_index + first * self.stride, self.intensities[first:last], self.stride)
+
+    def align(self, other):
+        """Overlapping points of two spectra as (start_index, stride, self_values, other_values)
+
+        Works in O(1) by slicing when both spectra share stride and phase on the
+        grid. Returns None when they do not overlap or their points do not coincide.
+        """
+        if self.stride != other.stride or (self.start_index - other.start_index) % self.stride:
+            return None
+        stride = self.stride
+        start = max(self.start_index, other.start_index)
+        stop = min(self.stop_index, other.stop_index)
+        if stop <= start:
+            return None
+
+        count = (stop - start) // stride
+        first_self = (start - self.start_index) // stride
+        first_other = (start - other.start_index) // stride
+        return (
+            start, stride,
+            self.intensities[first_self:first_self + count],
+            other.intensities[first_other:first_other + count]
+        )
+
+    def interpolate(self, wavelengths):
+        """Values at arbitrary wavelengths by linear interpolation, NaN outside the spectrum"""
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        valid = ~np.isnan(self.intensities)
+        known_wavelengths = self.wavelengths[valid]
+        if not len(known_wavelengths):
+            return np.full(wavelengths.shape, np.nan)
+        return np.interp(
+            wavelengths, known_wavelengths, self.intensities[valid], left=np.nan, right=np.nan
+        )
+
+    # Dict-style compatibility
+
+    def __contains__(self, wavelength):
+        position = self._position(wavelength)
+        return position is not None and not math.isnan(self.intensities[position])
+
+    def __getitem__(self, wavelength):
+        position = self._position(wavelength)
+        if position is None or math.isnan(self.intensities[position]):
+            raise KeyError(wavelength)
+        return float(self.intensities[position])
+
+    def __setitem__(self, wavelength, intensity):
+        index = grid_index(wavelength)
+        if not len(self.intensities):
+            self.start_index = index
+            self.stride = 1
+            self.intensities = np.array([intensity], dtype=np.float64)
+            return
+
+        if (index - self.start_index) % self.stride:
+            self._restride()
+        start = min(self.start_index, index)
+        stop = max(self.stop_index, index + self.stride)
+        if start != self.start_index or stop != self.stop_index:
+            # Grow the array, new points in between are missing (NaN)
+            values = np.full((stop - start) // self.stride, np.nan)
+            offset = (self.start_index - start) // self.stride
+            values[offset:offset + len(self.intensities)] = self.intensities
+            self.start_index = start
+            self.intensities = values
+        self.intensities[(index - self.start_index) // self.stride] = intensity
+
+    def _restride(self):
+        """Convert to stride 1 so points between the current ones can be set"""
+        values = np.full(self.stop_index - self.stride - self.start_index + 1, np.nan)
+        values[::self.stride] = self.intensities
+        self.intensities = values
+        self.stride = 1
+
+    def get(self, wavelength, default=None):
+        try:
+            return self[wavelength]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [wl for wl, _ in self.items()]
+
+    def items(self):
+        valid = ~np.isnan(self.intensities)
+        return list(zip(self.wavelengths[valid].tolist(), self.intensities[valid].tolist()))
+
+    def __repr__(self):
+        if not len(self):
+            return "Spectrum(empty)"
+        return (f"Spectrum({self.start_wavelength}-{self.end_wavelength}nm, "
+                f"{len(self)} points, stride={self.stride})")
+
+    # Serialization
+
+    def to_dict(self):
+        """Convert to a JSON-serializable dict"""
+        return {
+            'start_index': self.start_index,
+            'stride': self.stride,
+            'grid_origin': GRID_ORIGIN,
+            'grid_step': GRID_STEP,
+            # NaN is not valid JSON, missing points are stored as null
+            'intensities': [None if math.isnan(v) else v for v in self.intensities.tolist()]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a spectrum from to_dict() output or a legacy {wavelength: intensity} dict"""
+        if data is None:
+            return cls()
+        if isinstance(data, Spectrum):
+            return data
+        if 'start_index' in data and 'intensities' in data:
+            values = [np.nan if v is None else v for v in data['intensities']]
+            return cls(data['start_index'], values, data.get('stride', 1))
+        return cls.from_mapping(data)
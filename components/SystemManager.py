@@ -1,5 +1,7 @@
+import asyncio
 import threading
 import time
+from components.JobManager import JobManager
 
 class SystemManager:
     def __init__(self):
@@ -8,16 +10,25 @@ class SystemManager:
         self.system_log = []
         self.tasks = []
         self.lock = threading.Lock()
+        self.jobs = JobManager(log=self.log)  # Background jobs (long acquisitions)
         
-    def start(self):
-        """Start the system manager"""
+    def start(self, threaded=True):
+        """Start the system manager
+        
+        With threaded=False no scheduler thread is started; the owner runs
+        run_async() on its event loop instead.
+        """
         self.running = True
         self.log("System Manager: Starting...")
         
         # Initialize task scheduler thread
-        self.scheduler_thread = threading.Thread(target=self._scheduler_loop)
-        self.scheduler_thread.daemon = True
-        self.scheduler_thread.start()
+        if threaded:
+            self.scheduler_thread = threading.Thread(target=self._scheduler_loop)
+            self.scheduler_thread.daemon = True
+            self.scheduler_thread.start()
+            
+        # Start background job worker
+        self.jobs.start()
         
         self.log("System Manager: Started successfully")
         
@@ -25,6 +36,7 @@ class SystemManager:
         """Stop the system manager"""
         self.log("System Manager: Stopping...")
         self.running = False
+        self.jobs.stop()
         if hasattr(self, 'scheduler_thread'):
             self.scheduler_thread.join(timeout=2)
         self.log("System Manager: Stopped")
@@ -49,29 +61,38 @@ class SystemManager:
     def _scheduler_loop(self):
         """Main scheduler loop for system tasks"""
         while self.running:
-            with self.lock:
-                # Process tasks
-                tasks_to_remove = []
-                for i, task in enumerate(self.tasks):
-                    if task['next_run'] <= time.time():
-                        try:
-                            task['function'](*task['args'], **task['kwargs'])
-                        except Exception as e:
-                            self.log(f"Scheduler: Task failed: {e}")
-                            
-                        if task['interval']:
-                            task['next_run'] = time.time() + task['interval']
-                        else:
-                            tasks_to_remove.append(i)
-                            
-                # Remove completed one-time tasks
-                for i in reversed(tasks_to_remove):
-                    self.tasks.pop(i)
-                    
+            self._run_due_tasks()
             time.sleep(0.1)
             
+    async def run_async(self):
+        """Scheduler loop as a coroutine, ticks interleave with other event loop tasks"""
+        while self.running:
+            self._run_due_tasks()
+            await asyncio.sleep(0.1)
+            
+    def _run_due_tasks(self):
+        """Run every task that is due, one scheduler tick"""
+        with self.lock:
+            # Process tasks
+            tasks_to_remove = []
+            for i, task in enumerate(self.tasks):
+                if task['next_run'] <= time.time():
+                    try:
+                        task['function'](*task['args'], **task['kwargs'])
+                    except Exception as e:
+                        self.log(f"Scheduler: Task failed: {e}")
+                        
+                    if task['interval']:
+                        task['next_run'] = time.time() + task['interval']
+                    else:
+                        tasks_to_remove.append(i)
+                        
+            # Remove completed one-time tasks
+            for i in reversed(tasks_to_remove):
+                self.tasks.pop(i)
+            
     def schedule_task(self, func, interval=None, delay=0, *args, **kwargs):
-        """Schedule a task to run periodically or once"""
+        """Schedule a task to run periodically or once, returns the task dict"""
         task = {
             'function': func,
             'interval': interval,
@@ -84,6 +105,7 @@ class SystemManager:
             self.tasks.append(task)
             
         self.log(f"Scheduler: Task '{func.__name__}' scheduled")
+        return task
         
     def get_system_status(self):
         """Get current system status"""
@@ -91,6 +113,7 @@ class SystemManager:
             'running': self.running,
             'components': list(self.components.keys()),
             'active_tasks': len(self.tasks),
+            'active_jobs': sum(1 for job in self.jobs.list() if not job.done),
             'log_entries': len(self.system_log)
         }
         return status
\ No newline at end of file
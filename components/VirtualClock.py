@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from enum import Enum
+
+class ClockMode(Enum):
+    """Enum for instrument clock modes"""
+    REALTIME = "realtime"        # delays take their real duration
+    ACCELERATED = "accelerated"  # delays run N times faster than real time
+    INSTANT = "instant"          # delays return immediately, time is simulated
+
+class VirtualClock:
+    """Pluggable instrument clock used for all engine delays and timestamps
+
+    Instrument time always advances by the full simulated delay, so elapsed
+    times reported by the engine stay realistic whatever the mode. Only the
+    wall-clock cost of a delay changes: 1x in realtime mode, 1/N in
+    accelerated mode and none in instant mode.
+    """
+
+    # Real seconds at the end of sleep_until that are busy-waited for precision
+    SPIN_TIME = 0.002
+
+    def __init__(self, mode=ClockMode.REALTIME, factor=1.0):
+        self.lock = threading.Lock()
+        self._epoch = time.time()            # wall time at instrument time zero
+        self._base_instrument = 0.0          # instrument time at the last rebase
+        self._base_real = time.monotonic()   # real monotonic time at the last rebase
+        self.mode = ClockMode.REALTIME
+        self.factor = 1.0
+        self.set_mode(mode, factor)
+
+    def set_mode(self, mode, factor=None):
+        """Switch clock mode without making instrument time jump"""
+        if isinstance(mode, str):
+            mode = ClockMode(mode)
+
+        if mode == ClockMode.ACCELERATED:
+            factor = factor if factor is not None else self.factor
+            if factor <= 0:
+                raise ValueError("Acceleration factor must be positive")
+        else:
+            factor = 1.0
+
+        with self.lock:
+            self._base_instrument = self._monotonic_unlocked()
+            self._base_real = time.monotonic()
+            self.mode = mode
+            self.factor = float(factor)
+
+    def set_mode_from_spec(self, spec):
+        """Set mode from a string: 'realtime', 'instant' or 'x<N>' for accelerated"""
+        spec = spec.strip().lower()
+        if spec.startswith('x'):
+            try:
+                factor = float(spec[1:])
+            except ValueError:
+                raise ValueError(f"Invalid acceleration factor: {spec}")
+            self.set_mode(ClockMode.ACCELERATED, factor)
+        else:
+            try:
+                self.set_mode(ClockMode(spec))
+            except ValueError:
+                raise ValueError(f"Unknown clock mode: {spec}")
+
+    def describe(self):
+        """Short description of the current mode"""
+        if self.mode == ClockMode.ACCELERATED:
+            return f"accelerated (x{self.factor:g})"
+        return self.mode.value
+
+    def _monotonic_unlocked(self):
+        if self.mode == ClockMode.INSTANT:
+            return self._base_instrument
+        return self._base_instrument + (time.monotonic() - self._base_real) * self.factor
+
+    def monotonic(self):
+        """Instrument seconds elapsed since the clock was created"""
+        with self.lock:
+            return self._monotonic_unlocked()
+
+    def time(self):
+        """Instrument time as epoch seconds"""
+        return self._epoch + self.monotonic()
+
+    def now(self):
+        """Instrument time as a datetime"""
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds):
+        """Let `seconds` of instrument time pass"""
+        if seconds <= 0:
+            return
+        if self.mode == ClockMode.INSTANT:
+            with self.lock:
+                self._base_instrument += seconds
+        else:
+            time.sleep(seconds / self.factor)
+
+    def sleep_until(self, deadline):
+        """Sleep until the instrument monotonic time reaches `deadline`
+
+        Outside instant mode the last SPIN_TIME real seconds are busy-waited,
+        since time.sleep can overshoot by a millisecond or more.
+        """
+        remaining = deadline - self.monotonic()
+        if self.mode == ClockMode.INSTANT:
+            self.sleep(remaining)
+            return
+
+        coarse = remaining - self.SPIN_TIME * self.factor
+        if coarse > 0:
+            self.sleep(coarse)
+        while self.mode != ClockMode.INSTANT and self.monotonic() < deadline:
+            pass
+        if self.mode == ClockMode.INSTANT:
+            # Mode switched while waiting
+            self.sleep(deadline - self.monotonic())
+
+    async def sleep_async(self, seconds):
+        """Coroutine version of sleep that yields to the event loop"""
+        if seconds <= 0 or self.mode == ClockMode.INSTANT:
+            self.sleep(seconds)
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(seconds / self.factor)
+
+    async def sleep_until_async(self, deadline):
+        """Coroutine version of sleep_until
+
+        The event loop must not be blocked, so there is no busy-wait at the end
+        and wake-ups are only as precise as the loop's timer.
+        """
+        await self.sleep_async(deadline - self.monotonic())
@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# Tests import the components package from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.SpectralEngine import SpectralEngine
+from components.VirtualClock import VirtualClock, ClockMode
+
+
+@pytest.fixture
+def engine():
+    """Initialized, seeded engine on an instant clock, lamp on"""
+    engine = SpectralEngine(clock=VirtualClock(ClockMode.INSTANT), seed=1)
+    engine.initialize()
+    return engine
@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+
+from Kernel import Kernel
+from components.CommandInterface import CommandInterface
+from components.JobManager import Job
+from components.VirtualClock import ClockMode
+
+
+def screen(kernel):
+    return '\n'.join(kernel.monitor.get_display())
+
+
+@pytest.fixture
+def kernel(engine):
+    kernel = Kernel()
+    kernel.spectral_engine = engine
+    kernel.system_manager.start(threaded=False)
+    kernel.system_manager.jobs.instrument = engine
+    kernel.command_interface = CommandInterface(kernel.monitor, kernel.system_manager, engine, None)
+    # Long enough to interrupt, short enough for a test
+    engine.clock.set_mode(ClockMode.ACCELERATED, 20)
+    yield kernel
+    kernel.system_manager.stop()
+
+
+async def wait_idle(interface, timeout=10):
+    await asyncio.wait_for(asyncio.shield(interface.task), timeout)
+
+
+@pytest.mark.parametrize('command', ['mkinetic 60 1 500 600', 'burst 100000 1000'])
+def test_stop_cancels_foreground_job(kernel, command):
+    interface = kernel.command_interface
+    jobs = kernel.system_manager.jobs
+
+    async def session():
+        await interface.process_command_async(command)
+        await asyncio.sleep(0.3)
+        job = jobs.current
+        assert job is not None and job.status == Job.RUNNING
+        await interface.process_command_async('stop')
+        await wait_idle(interface)
+        return job
+
+    job = asyncio.run(session())
+    assert job.status == Job.CANCELLED
+    assert f"'{command.split()[0]}' cancelled" in screen(kernel)
+    assert not jobs.instrument_lock.locked()
+    assert not kernel.spectral_engine.is_scanning
+
+
+def test_stop_keeps_partial_scan(kernel):
+    interface = kernel.command_interface
+
+    async def session():
+        await interface.process_command_async('scan 400 500')
+        await asyncio.sleep(0.3)
+        await interface.process_command_async('stop')
+        await wait_idle(interface)
+
+    asyncio.run(session())
+    assert 0 < len(kernel.spectral_engine.scan_history[-1]) < 1001
+    assert not kernel.system_manager.jobs.instrument_lock.locked()
+
+
+def test_quick_command_preempts_scan(kernel):
+    interface = kernel.command_interface
+    engine = kernel.spectral_engine
+
+    async def session():
+        await interface.process_command_async('scan 400 450')
+        await asyncio.sleep(0.2)
+        await asyncio.wait_for(interface.process_command_async('measure'), 5)
+        assert interface.is_busy()
+        await interface.process_command_async('lamp off')
+        await wait_idle(interface)
+
+    asyncio.run(session())
+    text = screen(kernel)
+    assert "Measurement at" in text
+    assert "Error: Instrument busy" in text
+    assert engine.is_lamp_on
+    assert len(engine.scan_history[-1]) == 501
+
+
+def test_exit_waits_for_running_scan(kernel):
+    interface = kernel.command_interface
+    engine = kernel.spectral_engine
+    engine.clock.set_mode(ClockMode.ACCELERATED, 500)
+
+    async def session():
+        await interface.process_command_async('scan 400 500')
+        await kernel._finish_command()
+        assert not interface.is_busy()
+
+    asyncio.run(session())
+    assert "Waiting for 'scan' to finish" in screen(kernel)
+    assert len(engine.scan_history[-1]) == 1001
+
+
+def test_interrupt_while_exiting_stops_scan(kernel):
+    interface = kernel.command_interface
+    engine = kernel.spectral_engine
+
+    async def session():
+        await interface.process_command_async('scan 400 500')
+        exiting = asyncio.ensure_future(kernel._finish_command())
+        await asyncio.sleep(0.3)
+        kernel._interrupted()
+        await asyncio.wait_for(exiting, 10)
+
+    asyncio.run(session())
+    assert 0 < len(engine.scan_history[-1]) < 1001
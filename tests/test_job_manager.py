@@ -0,0 +1,126 @@
+import threading
+import pytest
+
+from components.JobManager import Job, JobCancelled, JobManager
+
+
+class Instrument:
+    """Stand-in for the engine's save_state()/restore_state()"""
+
+    def __init__(self):
+        self.wavelength = 500.0
+
+    def save_state(self):
+        return self.wavelength
+
+    def restore_state(self, state):
+        self.wavelength = state
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(log=lambda message: None, instrument=Instrument())
+    manager.start()
+    yield manager
+    manager.stop()
+
+
+def test_jobs_run_by_priority(manager):
+    gate = threading.Event()
+    order = []
+    blocker = manager.submit('blocker', lambda job: gate.wait(5))
+    low = manager.submit('low', lambda job: order.append('low'), priority=JobManager.PRIORITY_LOW)
+    high = manager.submit('high', lambda job: order.append('high'), priority=JobManager.PRIORITY_HIGH)
+    gate.set()
+    assert low.wait(5)
+    assert order == ['high', 'low']
+    assert blocker.status == high.status == Job.DONE
+
+
+def test_higher_priority_job_preempts_at_checkpoint(manager):
+    started = threading.Event()
+    release = threading.Event()
+    events = []
+
+    def long_job(job):
+        manager.instrument.wavelength = 400.0
+        started.set()
+        release.wait(5)
+        for i in range(3):
+            events.append(('long', i, manager.instrument.wavelength))
+            job.checkpoint((i + 1) / 3, i)
+        return 'long'
+
+    def quick_job(job):
+        events.append(('quick', job.manager.current.name))
+        manager.instrument.wavelength = 650.0
+        return 'quick'
+
+    long = manager.submit('long', long_job)
+    assert started.wait(5)
+    quick = manager.submit('quick', quick_job, priority=JobManager.PRIORITY_HIGH)
+    release.set()
+    assert long.wait(5)
+
+    # The quick job ran at the first checkpoint, the instrument state was restored afterwards
+    assert events == [('long', 0, 400.0), ('quick', 'quick'), ('long', 1, 400.0), ('long', 2, 400.0)]
+    assert quick.result == 'quick'
+    assert long.result == 'long'
+    assert long.progress == 1.0
+    assert manager.current is None
+
+
+def test_cancel_takes_effect_at_checkpoint(manager):
+    started = threading.Event()
+    checkpoints = []
+
+    def endless(job):
+        started.set()
+        while True:
+            checkpoints.append(job.progress)
+            job.checkpoint(0.5, 'partial')
+
+    job = manager.submit('endless', endless)
+    assert started.wait(5)
+    assert manager.cancel(job.id)
+    assert job.wait(5)
+    assert job.status == Job.CANCELLED
+    assert job.partial == 'partial'
+    # The worker released the instrument and keeps running jobs
+    assert not manager.instrument_lock.locked()
+    assert manager.submit('next', lambda job: 'ok').wait(5)
+
+
+def test_cancel_queued_and_finished_jobs(manager):
+    gate = threading.Event()
+    ran = []
+    blocker = manager.submit('blocker', lambda job: gate.wait(5))
+    queued = manager.submit('queued', lambda job: ran.append(job.id))
+    assert queued.cancel()
+    gate.set()
+    assert queued.wait(5)
+    assert queued.status == Job.CANCELLED
+    assert ran == []
+    assert blocker.wait(5)
+    assert not blocker.cancel()
+    assert not manager.cancel(12345)
+
+
+def test_failed_job_keeps_error(manager):
+    def broken(job):
+        raise RuntimeError("Lamp is off")
+
+    job = manager.submit('broken', broken)
+    assert job.wait(5)
+    assert job.status == Job.FAILED
+    assert str(job.error) == "Lamp is off"
+    assert "Lamp is off" in job.describe()
+
+
+def test_checkpoint_raises_once_cancelled():
+    job = Job(1, 'manual', lambda job: None)
+    job.checkpoint(0.25)
+    job.cancel()
+    with pytest.raises(JobCancelled):
+        job.checkpoint(0.5)
+    assert job.progress == 0.5
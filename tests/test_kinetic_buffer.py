@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from components.KineticBuffer import KineticBuffer
+
+
+def fill(buffer, count):
+    for i in range(count):
+        buffer.append(float(i), 500.0, 100.0 + i)
+
+
+def test_window_is_contiguous_after_wrap():
+    buffer = KineticBuffer(capacity=8)
+    fill(buffer, 13)
+    assert len(buffer) == 8
+    assert buffer.total == 13
+    window = buffer.window()
+    assert window.base is not None  # a view, not a copy
+    assert buffer.times.tolist() == [float(i) for i in range(5, 13)]
+    assert buffer.window(3)[3].tolist() == [110.0, 111.0, 112.0]
+    assert buffer[0]['time'] == 5.0
+    assert buffer[-1]['intensity'] == 112.0
+
+
+def test_eviction_without_spill_loses_history():
+    buffer = KineticBuffer(capacity=4)
+    fill(buffer, 6)
+    with pytest.raises(RuntimeError):
+        buffer.history()
+
+
+def test_spill_keeps_full_history(tmp_path):
+    buffer = KineticBuffer(capacity=8, spill_path=str(tmp_path / 'kinetic.bin'), spill_block=3)
+    fill(buffer, 30)
+    assert buffer.spilled > 0
+    history = buffer.history()
+    assert history.shape == (len(KineticBuffer.COLUMNS), 30)
+    assert history[0].tolist() == [float(i) for i in range(30)]
+    assert history[3].tolist() == [100.0 + i for i in range(30)]
+
+    buffer.flush()
+    assert buffer.read_spilled().shape == (30, len(KineticBuffer.COLUMNS))
+
+
+def test_spill_never_overwrites_existing_file(tmp_path):
+    path = tmp_path / 'kinetic.bin'
+    path.write_bytes(b'keep')
+    buffer = KineticBuffer(capacity=2, spill_path=str(path))
+    assert buffer.spill_path == str(tmp_path / 'kinetic-1.bin')
+    assert path.read_bytes() == b'keep'
+
+
+def test_since_returns_points_appended_later():
+    buffer = KineticBuffer(capacity=4)
+    fill(buffer, 3)
+    points, total = buffer.since(1)
+    assert total == 3
+    assert points[0].tolist() == [1.0, 2.0]
+    fill(buffer, 6)
+    # Points evicted in between are skipped
+    points, total = buffer.since(total)
+    assert total == 9
+    assert points[0].tolist() == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_from_columns_round_trip():
+    buffer = KineticBuffer(capacity=4)
+    fill(buffer, 6)
+    restored = KineticBuffer.from_columns(buffer.window())
+    np.testing.assert_array_equal(restored.window(), buffer.window())
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+import pytest
+
+from components.MeasurementLog import MeasurementLog
+from components.SessionJournal import SessionJournal
+from components.SpectralEngine import SpectralEngine
+from components.VirtualClock import VirtualClock, ClockMode
+
+
+def quiet(message):
+    pass
+
+
+def fresh_engine():
+    return SpectralEngine(clock=VirtualClock(ClockMode.INSTANT))
+
+
+def truncate(path, count):
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - count)
+
+
+@pytest.fixture
+def journaled(engine, tmp_path):
+    """Journal with two scans, the second one in the last record"""
+    path = str(tmp_path / 'session.journal')
+    journal = SessionJournal(engine, path, log=quiet)
+    journal.sync()
+    scans = []
+    for start in (400, 500):
+        scans.append(engine.scan_full_range(start, start + 20))
+        journal.sync()
+    journal.close()
+    return path, scans
+
+
+def test_journal_replay(journaled):
+    path, scans = journaled
+    engine = fresh_engine()
+    counts = SessionJournal.replay(path, engine)
+    assert counts['scans'] == 2
+    for restored, scan in zip(engine.scan_history, scans):
+        np.testing.assert_array_equal(restored.intensities, scan.intensities)
+        np.testing.assert_array_equal(restored.time_offsets, scan.time_offsets)
+
+
+def test_journal_replay_stops_at_torn_tail(journaled):
+    path, scans = journaled
+    truncate(path, 5)
+    engine = fresh_engine()
+    assert SessionJournal.replay(path, engine)['scans'] == 1
+    np.testing.assert_array_equal(engine.scan_history[0].intensities, scans[0].intensities)
+
+
+def test_journal_replay_stops_at_corrupt_record(journaled):
+    path, scans = journaled
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    assert SessionJournal.replay(path, fresh_engine())['scans'] == 1
+
+
+def test_measurement_log_recovers_scans(engine, tmp_path):
+    path = str(tmp_path / 'session.wal')
+    log = MeasurementLog(path, log=quiet)
+    engine.attach_measurement_log(log)
+    scan = engine.scan_full_range(400, 450, sample_name='blank')
+    engine.measure_single()
+    log.close()
+
+    runs = MeasurementLog.recover(path)
+    assert [run['type'] for run in runs] == ['single', 'scan']
+    assert runs[1]['complete']
+    np.testing.assert_array_equal(runs[1]['rows'][:, 2], scan.intensities)
+
+    restored = fresh_engine()
+    restored.recover_measurements(path)
+    record = restored.scan_history[-1]
+    np.testing.assert_array_equal(record.intensities, scan.intensities)
+    np.testing.assert_array_equal(record.time_offsets, scan.time_offsets)
+    assert record.sample_name == 'blank'
+
+
+def test_measurement_log_torn_tail_is_dropped_and_appended_after(tmp_path):
+    path = str(tmp_path / 'session.wal')
+    log = MeasurementLog(path, log=quiet)
+    run_id = log.begin_run('kinetic', duration=10, interval=1)
+    log.points(run_id, *np.arange(10.0).reshape(5, 2))
+    log.end_run(run_id, 2)
+    log.close()
+
+    # Crash while writing the END frame: the run is kept, marked interrupted
+    truncate(path, 3)
+    runs = MeasurementLog.recover(path)
+    assert len(runs) == 1
+    assert not runs[0]['complete']
+    assert runs[0]['rows'].shape == (2, 5)
+
+    # Reopening drops the torn frame and continues after the intact ones
+    log = MeasurementLog(path, log=quiet)
+    log.single(1.0, 500.0, 500.1, 42.0)
+    assert log.begin_run('scan') == run_id + 1
+    log.close()
+    runs = MeasurementLog.recover(path)
+    assert [run['type'] for run in runs] == ['single', 'kinetic', 'scan']
+    assert runs[0]['rows'].tolist() == [[1.0, 500.0, 500.1, 42.0]]
+    assert runs[1]['rows'].shape == (2, 5)
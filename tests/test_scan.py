@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from components.ScanRecord import ScanRecord
+from components.Spectrum import Spectrum, grid_index, grid_wavelengths
+
+
+def test_grid_round_trip_without_drift():
+    indices = np.arange(0, 9101)
+    wavelengths = grid_wavelengths(indices)
+    assert wavelengths[0] == 190.0
+    assert wavelengths[-1] == 1100.0
+    assert [grid_index(wl) for wl in wavelengths[::700]] == indices[::700].tolist()
+    # Accumulating steps would drift, the grid computes every point exactly
+    assert grid_wavelengths(2100) == 400.0
+
+
+def test_spectrum_from_arrays_keeps_stride():
+    spectrum = Spectrum.from_arrays([400.0, 400.5, 401.0, 401.5], [1, 2, 3, 4])
+    assert spectrum.stride == 5
+    assert spectrum.start_wavelength == 400.0
+    assert spectrum.end_wavelength == 401.5
+    assert spectrum[400.5] == 2.0
+    assert 400.1 not in spectrum
+
+
+def test_spectrum_irregular_points_are_nan_filled():
+    spectrum = Spectrum.from_arrays([400.0, 400.1, 400.4], [1, 2, 3])
+    assert spectrum.stride == 1
+    assert len(spectrum) == 5
+    assert np.isnan(spectrum.intensities[2])
+    assert spectrum.keys() == [400.0, 400.1, 400.4]
+
+
+def test_spectrum_align_and_slice():
+    a = Spectrum(grid_index(400.0), np.arange(11.0))
+    b = Spectrum(grid_index(400.5), np.arange(100.0, 111.0))
+    start, stride, values_a, values_b = a.align(b)
+    assert grid_wavelengths(start) == 400.5
+    assert stride == 1
+    assert values_a.tolist() == [5.0, 6.0, 7.0, 8.0, 9.0, 10.0]
+    assert values_b.tolist() == [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]
+    assert a.slice(400.2, 400.4).intensities.tolist() == [2.0, 3.0, 4.0]
+    # Different phase on the grid does not align
+    assert Spectrum(grid_index(400.0), [1.0, 2.0], stride=2).align(
+        Spectrum(grid_index(400.1), [1.0, 2.0], stride=2)) is None
+
+
+def test_spectrum_dict_round_trip():
+    spectrum = Spectrum.from_arrays([400.0, 400.1, 400.3], [1.0, 2.0, 3.0])
+    restored = Spectrum.from_dict(spectrum.to_dict())
+    assert restored.start_index == spectrum.start_index
+    np.testing.assert_array_equal(restored.intensities, spectrum.intensities)
+    # Legacy files are keyed by wavelength strings
+    legacy = Spectrum.from_dict({'400.0': 1.0, '400.1': 2.0})
+    assert legacy[400.1] == 2.0
+
+
+def test_scan_record_dict_round_trip():
+    record = ScanRecord(
+        400.0, 400.2, 0.1, [400.0, 400.1, 400.2], [400.01, 400.11, 400.21], [5.0, 7.0, 6.0],
+        1000.0, [0, 100000, 200000], timestamp='2026-01-01T00:00:00', sample_name='blank'
+    )
+    restored = ScanRecord.from_dict(record.to_dict())
+    for column in ScanRecord.COLUMNS:
+        np.testing.assert_array_equal(getattr(restored, column), getattr(record, column))
+    assert restored.sample_name == 'blank'
+    assert restored['data'][1]['intensity'] == 7.0
+    assert record.summary.max_wavelength == 400.1
+
+    # Legacy list-of-dicts scans are still read
+    legacy = ScanRecord.from_dict({
+        'start_wavelength': 400.0, 'end_wavelength': 400.2, 'step_size': 0.1,
+        'data': [point for point in record['data']]
+    })
+    np.testing.assert_array_equal(legacy.intensities, record.intensities)
+
+
+def test_scan_covers_snapped_grid_range(engine):
+    record = engine.scan_full_range(400.04, 500.0)
+    assert record.start_wavelength == 400.0
+    assert len(record) == 1001
+    np.testing.assert_array_equal(record.wavelengths, grid_wavelengths(np.arange(2100, 3101)))
+    assert engine.scan_history[-1] is record
+    assert np.all(np.diff(record.time_offsets) > 0)
+
+
+def test_scan_paths_give_identical_results(engine):
+    engine.set_seed(1)
+    vectorized = engine.scan_full_range(400, 450)
+    engine.set_seed(1)
+    per_point = engine.scan_full_range(400, 450, vectorized=False)
+    np.testing.assert_array_equal(vectorized.intensities, per_point.intensities)
+
+
+def test_segmented_scan_does_not_depend_on_segment_count(engine):
+    results = [engine.scan_full_range(400, 700, segments=segments, seed=3).intensities
+               for segments in (1, 3, 8)]
+    np.testing.assert_array_equal(results[0], results[1])
+    np.testing.assert_array_equal(results[0], results[2])
+
+
+def test_scan_iter_streams_and_stores(engine):
+    chunks = engine.scan_iter(400, 410, chunk=7)
+    sizes = []
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            sizes.append(len(next(chunks)))
+    assert sum(sizes) == 101
+    assert stop.value.value is engine.scan_history[-1]
+
+
+def test_scan_rejects_bad_range(engine):
+    with pytest.raises(ValueError):
+        engine.scan_full_range(500, 400)
+    with pytest.raises(ValueError):
+        engine.scan_full_range(100, 400)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from components.SpectralArchive import SpectralArchive
+from components.SpectralEngine import SpectralEngine
+from components.SpectralFile import SpectralFileReader, SpectralFileWriter, is_spectral_file
+from components.VirtualClock import VirtualClock, ClockMode
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_sections_round_trip(tmp_path, compress):
+    path = str(tmp_path / 'data.spec')
+    array = np.arange(12, dtype=np.int64).reshape(3, 4)
+    with SpectralFileWriter(path, compress) as writer:
+        writer.add_json('meta', {'name': 'blank', 'values': [1, 2]})
+        writer.add_array('array', array, {'unit': 'nm'})
+        writer.add_stream('stream', [b'abc', b'def'])
+
+    assert is_spectral_file(path)
+    reader = SpectralFileReader(path)
+    assert reader.names() == ['meta', 'array', 'stream']
+    assert reader.read_json('meta') == {'name': 'blank', 'values': [1, 2]}
+    np.testing.assert_array_equal(reader.read_array('array'), array)
+    assert reader.attrs('array') == {'unit': 'nm'}
+    assert reader.read_bytes('stream') == b'abcdef'
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text('{"metadata": {}}' + ' ' * 64)
+    assert not is_spectral_file(str(path))
+    with pytest.raises(ValueError):
+        SpectralFileReader(str(path))
+
+
+@pytest.mark.parametrize('extension', ['.spec', '.json'])
+def test_engine_save_and_load(engine, tmp_path, extension):
+    engine.calibrate_reference(400, 450)
+    scan = engine.scan_full_range(400, 450, sample_name='blank')
+    engine.kinetic_scan(3, 1)
+    path = str(tmp_path / ('session' + extension))
+    engine.save_data(path)
+
+    loaded = SpectralEngine(clock=VirtualClock(ClockMode.INSTANT))
+    loaded.load_data(path)
+    np.testing.assert_array_equal(
+        loaded.reference_spectrum.intensities, engine.reference_spectrum.intensities
+    )
+    assert loaded.calibration_data == engine.calibration_data
+    restored = loaded.scan_history[-1]
+    np.testing.assert_array_equal(restored.intensities, scan.intensities)
+    np.testing.assert_array_equal(restored.time_offsets, scan.time_offsets)
+    assert restored.sample_name == 'blank'
+    assert len(loaded.kinetic_data) == len(engine.kinetic_data)
+
+
+def test_archive_round_trip(engine, tmp_path):
+    scans = [engine.scan_full_range(400, 420, sample_name=name) for name in ('a', 'b', 'a')]
+    path = str(tmp_path / 'archive.spec')
+    assert engine.export_archive(path) == 3
+
+    with SpectralArchive(path) as archive:
+        assert len(archive) == 3
+        assert archive.query(sample_name='a') == [0, 2]
+        assert archive.query(sample_name='missing') == []
+        for scan_id, scan in enumerate(scans):
+            record = archive.get(scan_id)
+            np.testing.assert_array_equal(record.intensities, scan.intensities)
+            np.testing.assert_array_equal(record.time_offsets, scan.time_offsets)
+            assert record.sample_name == scan.sample_name
+        assert archive.describe(1)['num_points'] == len(scans[1])
+        with pytest.raises(KeyError):
+            archive.get(3)
+
+    with pytest.raises(ValueError):
+        archive.get(0)
+    with pytest.raises(ValueError):
+        archive.query()
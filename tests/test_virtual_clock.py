@@ -0,0 +1,68 @@
+import asyncio
+import time
+import pytest
+
+from components.VirtualClock import VirtualClock, ClockMode
+
+
+def test_instant_mode_advances_without_waiting():
+    clock = VirtualClock(ClockMode.INSTANT)
+    start = time.monotonic()
+    clock.sleep(3600)
+    clock.sleep_until(clock.monotonic() + 60)
+    assert time.monotonic() - start < 0.5
+    assert clock.monotonic() == pytest.approx(3660)
+
+
+def test_instant_mode_time_and_now_follow_instrument_time():
+    clock = VirtualClock(ClockMode.INSTANT)
+    before = clock.time()
+    clock.sleep(86400)
+    assert clock.time() - before == pytest.approx(86400)
+    assert clock.now().timestamp() == pytest.approx(clock.time())
+
+
+def test_accelerated_mode_scales_real_time():
+    clock = VirtualClock(ClockMode.ACCELERATED, 100)
+    start_real = time.monotonic()
+    start = clock.monotonic()
+    clock.sleep(5)
+    real = time.monotonic() - start_real
+    assert 0.04 <= real < 1.0
+    assert clock.monotonic() - start >= 5
+
+
+def test_sleep_until_is_precise_in_realtime():
+    clock = VirtualClock()
+    deadline = clock.monotonic() + 0.02
+    clock.sleep_until(deadline)
+    assert 0 <= clock.monotonic() - deadline < 0.005
+
+
+def test_mode_switch_keeps_time_continuous():
+    clock = VirtualClock(ClockMode.INSTANT)
+    clock.sleep(100)
+    clock.set_mode(ClockMode.ACCELERATED, 10)
+    assert clock.monotonic() == pytest.approx(100, abs=0.1)
+    clock.set_mode(ClockMode.REALTIME)
+    assert clock.factor == 1.0
+    assert clock.monotonic() == pytest.approx(100, abs=0.1)
+
+
+def test_mode_spec():
+    clock = VirtualClock()
+    clock.set_mode_from_spec('x50')
+    assert clock.mode == ClockMode.ACCELERATED
+    assert clock.describe() == 'accelerated (x50)'
+    clock.set_mode_from_spec('instant')
+    assert clock.describe() == 'instant'
+    with pytest.raises(ValueError):
+        clock.set_mode_from_spec('sideways')
+    with pytest.raises(ValueError):
+        clock.set_mode_from_spec('x0')
+
+
+def test_async_sleep_advances_instant_clock():
+    clock = VirtualClock(ClockMode.INSTANT)
+    asyncio.run(clock.sleep_until_async(clock.monotonic() + 30))
+    assert clock.monotonic() == pytest.approx(30)